@@ -1,12 +1,30 @@
-from flask import Flask, jsonify
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, jsonify, request, g, Response
 from flask_cors import CORS
-from pymongo import MongoClient
+from werkzeug.middleware.proxy_fix import ProxyFix
+from pymongo.errors import PyMongoError
 from core.config.config import config, Config
 from modules.users.models.user import User
 from modules.orders.models.order import Order
 from modules.products.models.product import Product
 from modules.orders.models.cart import CartModel
 from modules.blog.models.blog import Blog
+from modules.stats.models.rollup import StatsRollup
+from modules.stats.models.activity import ActivityEvents
+from modules.stats.models.analytics import OrderAnalytics
+from shared.utils.passwords import PasswordHasher
+from shared.utils.json_provider import MongoJSONProvider
+from shared.utils.indexes import ensure_indexes_in_background, missing_indexes
+from core.database.registry import index_registry
+from core.database.client import connect, catalog_read_preference, DatabaseUnavailable
+from shared.utils.pool_metrics import PoolMetrics
+from shared.utils.metrics import Histogram, CommandMetrics, DEFAULT_BUCKETS, gauge, counter
+from shared.utils.health import DependencyStatus, start_monitor, build_info
+from shared.utils.activity import activity_log
+from shared.utils.images import image_pipeline
+from shared.decorators.ratelimit import rate_limiter
 from modules.auth.routes.auth import auth_bp
 from modules.auth.routes.admin import admin_bp
 from modules.products.routes.product import product_bp
@@ -14,10 +32,23 @@ from modules.orders.routes.cart import cart_bp
 from modules.blog.routes.blog import blog_bp
 import os
 import logging
+import threading
 from datetime import datetime
 
+# Endpoints that answer without MongoDB (they report its status instead of failing)
+DATABASE_OPTIONAL = {'api_info', 'test_cors'}
+# Endpoints that must never wait on a connection attempt
+DATABASE_SKIPPED = {'health_live', 'metrics', 'product.get_image_variant', 'health_check', 'api_health', 'health_ready'}
+# Probes among them start this process's connection in the background and report DependencyStatus
+DATABASE_PROBES = {'health_check', 'api_health', 'health_ready'}
+
 def create_app(config_name=None):
-    """Application factory pattern"""
+    """Application factory pattern.
+
+    Nothing here touches MongoDB: each process connects on its first request
+    (after a prefork server has forked), see init_database.
+    """
+    started = time.perf_counter()
     
     # Create Flask app
     app = Flask(__name__)
@@ -27,6 +58,9 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
     app.config["JWT_TOKEN_LOCATION"] = ["headers"]
     
+    # Serialize ObjectId/datetime/Decimal128 natively (orjson)
+    app.json = MongoJSONProvider(app)
+    
     # Initialize configuration
     config[config_name].init_app(app)
     
@@ -35,33 +69,202 @@ def create_app(config_name=None):
         logging.basicConfig(level=logging.INFO)
         app.logger.setLevel(logging.INFO)
     
+    CORS(app, origins="*", supports_credentials=True)
+    
+    # request.remote_addr is the client, not the proxy, only for the configured number of proxy hops
+    if Config.TRUSTED_PROXY_COUNT:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXY_COUNT, x_proto=Config.TRUSTED_PROXY_COUNT)
+    
+    # Image variants are served from disk, the pools start with the first job of each process
+    image_pipeline.configure(Config.IMAGE_CACHE_DIR, Config.IMAGE_SOURCE_ROOT, Config.IMAGE_URL_PREFIX, Config.IMAGE_WORKERS,
+                             Config.IMAGE_MAX_PENDING, Config.IMAGE_MAX_SOURCE_MB * 1024 * 1024, Config.IMAGE_FETCH_TIMEOUT,
+                             Config.IMAGE_QUALITY, logger=app.logger, allowed_hosts=Config.IMAGE_ALLOWED_HOSTS)
+    
+    # Register components
+    register_metrics(app)
+    init_database(app)
+    register_blueprints(app)
+    register_error_handlers(app)
+    register_routes(app)
+    
+    app.build_info = build_info(Config.APP_VERSION, Config.BUILD_COMMIT, Config.BUILD_TIME, Config.BUILD_COMMIT_FILE)
+    
+    # Cold-start timings, completed by the first request of each process
+    app.startup_timings = {
+        'import_ms': round((started - _IMPORT_STARTED) * 1000, 1),
+        'create_app_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
     return app
 
 def init_database(app):
-    """Initialize database connection and models"""
-    try:
-        # Connect to MongoDB
-        client = MongoClient(Config.MONGODB_URI)
+    """Connect to MongoDB lazily, once per process, on the first request that needs it"""
+    app.db_pid = None
+    app.db_failed_at = None
+    app.db_connecting = None
+    app.db_lock = threading.Lock()
+    app.dependency_status = DependencyStatus(Config.HEALTH_CHECK_INTERVAL)
+    app.process_started = time.monotonic()
+    
+    def after_fork():
+        # A lock held by another thread at fork time would stay locked forever in the child,
+        # and the parent's uptime and dependency status are not this worker's
+        app.db_lock = threading.Lock()
+        app.db_connecting = None
+        app.dependency_status = DependencyStatus(Config.HEALTH_CHECK_INTERVAL)
+        app.process_started = time.monotonic()
+    os.register_at_fork(after_in_child=after_fork)
+    
+    @app.before_request
+    def require_database():
+        if request.endpoint in DATABASE_SKIPPED:
+            if request.endpoint in DATABASE_PROBES:
+                connect_in_background(app)
+            return None
+        try:
+            ensure_database(app)
+        except DatabaseUnavailable:
+            if request.endpoint in DATABASE_OPTIONAL:
+                return None
+            response = jsonify({
+                'success': False,
+                'error': 'Service unavailable',
+                'message': 'Database is temporarily unavailable, please retry.'
+            })
+            response.headers['Retry-After'] = str(int(Config.MONGO_CONNECT_BACKOFF_MAX))
+            return response, 503
+    
+    @app.after_request
+    def record_first_request(response):
+        if app.startup_timings.get('pid') != os.getpid() and 'request_started' in g:
+            app.startup_timings['pid'] = os.getpid()
+            app.startup_timings['first_request_ms'] = round((time.perf_counter() - g.request_started) * 1000, 1)
+            app.logger.info(f'Cold start (pid {os.getpid()}): {app.startup_timings}')
+        return response
+
+def connect_in_background(app):
+    """Run ensure_database on a thread unless this process is connected or already trying"""
+    pid = os.getpid()
+    if app.db_pid == pid or app.db_connecting == pid:
+        return
+    app.db_connecting = pid
+    def run():
+        try:
+            ensure_database(app)
+        except DatabaseUnavailable:
+            # Logged and recorded in dependency_status by ensure_database
+            pass
+        finally:
+            app.db_connecting = None
+    threading.Thread(target=run, name='database-connect', daemon=True).start()
+
+def ensure_database(app):
+    """Create this process's client and models, raises DatabaseUnavailable.
+
+    After a failed connect, requests fail fast for MONGO_CONNECT_BACKOFF_MAX
+    seconds instead of each waiting through the retries again.
+    """
+    pid = os.getpid()
+    if app.db_pid == pid:
+        return
+    with app.db_lock:
+        if app.db_pid == pid:
+            return
+        if app.db_failed_at and time.monotonic() - app.db_failed_at < Config.MONGO_CONNECT_BACKOFF_MAX:
+            raise DatabaseUnavailable('MongoDB connection failed recently')
+        started = time.perf_counter()
+        # Pool size, timeouts and read preference from Config.MONGO_*
+        pool_metrics = PoolMetrics()
+        listeners = [pool_metrics] + ([app.command_metrics] if app.command_metrics else [])
+        try:
+            client = connect(event_listeners=listeners, logger=app.logger)
+        except DatabaseUnavailable as e:
+            app.db_failed_at = time.monotonic()
+            app.dependency_status.record_failure(e)
+            app.logger.error(f'Failed to connect to MongoDB: {str(e)}')
+            raise
         db = client[Config.DATABASE_NAME]
+        app.logger.info(f'Successfully connected to MongoDB: {Config.DATABASE_NAME} (pid {pid})')
         
-        # Test connection
-        client.admin.command('ping')
-        app.logger.info(f'Successfully connected to MongoDB: {Config.DATABASE_NAME}')
-        
-        # Initialize models
-        app.user_model = User(db)
-        app.order_model = Order(db)
-        app.product_model = Product(db)
+        # Initialize models (constructors do no I/O)
+        app.user_model = User(db, cache_size=Config.USER_CACHE_SIZE, cache_ttl=Config.USER_CACHE_TTL, hasher=PasswordHasher(
+            rounds=Config.BCRYPT_ROUNDS,
+            workers=Config.PASSWORD_HASH_WORKERS,
+            max_pending=Config.PASSWORD_HASH_MAX_PENDING,
+            timeout=Config.PASSWORD_HASH_TIMEOUT
+        ))
+        app.order_model = Order(db, order_number_block=Config.ORDER_NUMBER_BLOCK_SIZE)
+        app.product_model = Product(db, read_preference=catalog_read_preference(), images=image_pipeline)
         app.cart_model = CartModel(db)
-        app.blog_model = Blog(db)
+        app.blog_model = Blog(db, read_preference=catalog_read_preference(), cache_size=Config.BLOG_CACHE_SIZE, cache_ttl=Config.BLOG_CACHE_TTL)
+        app.stats_model = StatsRollup(db)
+        app.activity_model = ActivityEvents(db)
+        app.analytics_model = OrderAnalytics(db)
         app.db = db
         app.mongo_client = client
+        app.pool_metrics = pool_metrics
+        
+        # Capped before any index build can create activity_log as a plain collection
+        try:
+            app.activity_model.ensure_capped(Config.ACTIVITY_LOG_SIZE_MB, Config.ACTIVITY_LOG_MAX_DOCS)
+        except PyMongoError as e:
+            app.logger.warning(f'Could not create the capped activity log: {e}')
+        activity_log.configure(Config.ACTIVITY_LOG_BUFFER, Config.ACTIVITY_LOG_BATCH_SIZE, Config.ACTIVITY_LOG_FLUSH_INTERVAL,
+                               Config.ACTIVITY_LOG_BLOCK_TIMEOUT, app.logger)
+        activity_log.start(app.activity_model.collection)
+        
+        # Declared indexes: build without blocking startup, or just report what is missing
+        if Config.ENSURE_INDEXES:
+            ensure_indexes_in_background(db, index_registry(), app.logger)
+        else:
+            for name, keys in missing_indexes(db, index_registry()).items():
+                app.logger.warning(f'Missing indexes on {name}: {keys}')
         
-        return True
+        # Probes read this instead of pinging MongoDB themselves
+        start_monitor(client, app.dependency_status, app.logger)
         
-    except Exception as e:
-        app.logger.error(f'Failed to connect to MongoDB: {str(e)}')
-        return False
+        app.startup_timings['db_connect_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        app.db_failed_at = None
+        app.db_pid = pid
+
+def register_metrics(app):
+    """Per-endpoint request latency and MongoDB command metrics, served at /api/metrics"""
+    mode = Config.METRICS_MODE
+    app.request_metrics = Histogram('http_request_duration_seconds', 'Request latency by endpoint and status (per process)',
+                                    ('endpoint', 'method', 'status'), DEFAULT_BUCKETS if mode == 'full' else None)
+    app.command_metrics = CommandMetrics() if mode == 'full' else None
+    
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+    
+    if mode != 'off':
+        @app.after_request
+        def record_latency(response):
+            if 'request_started' in g:
+                labels = (request.endpoint or 'unmatched', request.method, str(response.status_code))
+                app.request_metrics.observe(labels, time.perf_counter() - g.request_started)
+            return response
+    
+    @app.route('/api/metrics')
+    def metrics():
+        """Prometheus scrape endpoint"""
+        if Config.METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {Config.METRICS_TOKEN}':
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+        lines = app.request_metrics.render()
+        if app.command_metrics:
+            lines += app.command_metrics.render()
+        pool = app.pool_metrics.stats() if app.db_pid == os.getpid() else {}
+        for field, help_text in (('open', 'Open connections'), ('in_use', 'Connections checked out'), ('waiting', 'Checkouts waiting for a connection')):
+            lines += gauge(f'mongodb_pool_{field}_connections', f'{help_text} (per process)', ('server',),
+                           {(server,): stats[field] for server, stats in pool.items()})
+        limits = rate_limiter.stats()
+        lines += counter('auth_rate_limit_checks_total', 'Auth rate limit checks by rule and outcome (per process)', ('rule', 'outcome'),
+                       {(rule, outcome): counts[outcome] for rule, counts in limits.items() for outcome in ('allowed', 'limited')})
+        activity = activity_log.stats()
+        lines += gauge('activity_log_buffered_events', 'Activity events waiting to be written (per process)', (), {(): activity['buffered']})
+        for field in ('written', 'dropped'):
+            lines += counter(f'activity_log_{field}_events_total', f'Activity events {field} since start (per process)', (), {(): activity[field]})
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
 
 def register_blueprints(app):
     """Register all blueprints"""
@@ -124,33 +327,53 @@ def register_routes(app):
             'message': 'Flower Corner API is running! 🌸',
             'status': 'OK',
             'timestamp': datetime.utcnow().isoformat(),
-            'version': '1.0.0',
+            'version': app.build_info['version'],
             'environment': os.getenv('FLASK_ENV', 'development')
         })
     
+    def uptime():
+        return round(time.monotonic() - app.process_started, 1)
+    
     @app.route('/api/health')
     def api_health():
-        """Detailed health check for API"""
-        try:
-            # Test database connection
-            app.mongo_client.admin.command('ping')
-            db_status = 'Connected'
-        except:
-            db_status = 'Disconnected'
-        
+        """Detailed health check for API (database state from the background monitor, no ping here)"""
+        database = app.dependency_status.snapshot()
         return jsonify({
             'api_status': 'OK',
-            'database_status': db_status,
+            'database_status': 'Connected' if database['status'] == 'up' and not database['stale'] else 'Disconnected',
+            'database': database,
             'timestamp': datetime.utcnow().isoformat(),
-            'uptime': 'N/A'  # TODO: Implement uptime tracking
+            'uptime': uptime(),
+            'pid': os.getpid(),
+            'build': app.build_info,
+            'startup': app.startup_timings
         })
     
+    @app.route('/api/health/live')
+    def health_live():
+        """Liveness probe: the process answers, nothing else is checked"""
+        return jsonify({'status': 'OK', 'uptime': uptime()})
+    
+    @app.route('/api/health/ready')
+    def health_ready():
+        """Readiness probe: 503 until the background monitor has a fresh successful ping"""
+        database = app.dependency_status.snapshot()
+        ready = app.dependency_status.ready()
+        body = {
+            'status': 'ready' if ready else 'not_ready',
+            'database': database,
+            'pool': app.pool_metrics.stats() if app.db_pid == os.getpid() else {},
+            'uptime': uptime()
+        }
+        return jsonify(body), 200 if ready else 503
+    
     @app.route('/api/info')
     def api_info():
         """API information endpoint"""
         return jsonify({
             'name': 'Flower Corner API',
-            'version': '1.0.0',
+            'version': app.build_info['version'],
+            'build': app.build_info,
             'description': 'Backend API for Flower Corner e-commerce website',
             'author': 'Flower Corner Team',
             'endpoints': {
@@ -165,6 +388,8 @@ def register_routes(app):
                 'health': [
                     'GET /',
                     'GET /api/health',
+                    'GET /api/health/live',
+                    'GET /api/health/ready',
                     'GET /api/info'
                 ]
             }
@@ -174,21 +399,9 @@ def register_routes(app):
     def test_cors():
         return jsonify({'ok': True, 'message': 'CORS test success'})
 
-# Create Flask application
+# Create Flask application (gunicorn app:app); MongoDB is connected per worker on first use
 app = create_app()
 
-CORS(app, origins="*", supports_credentials=True)
-
-# Initialize database
-if not init_database(app):
-    print("❌ Failed to initialize database. Please check MongoDB connection.")
-    exit(1)
-
-# Register components
-register_blueprints(app)
-register_error_handlers(app)
-register_routes(app)
-
 if __name__ == '__main__':
     print("🌸 Starting No.07 Floral Backend API...")
     print(f"📊 Environment: {os.getenv('FLASK_ENV', 'development')}")
@@ -0,0 +1,203 @@
+"""
+ASGI entry point serving the read-heavy public routes on the async (motor) data layer.
+
+The Flask app (app.py) keeps every route, including these. Point a reverse proxy's
+GET /api/products*, /api/blogs* and /api/health at this server so catalog reads
+are served concurrently from one event loop per worker, instead of one blocked
+thread per in-flight MongoDB query.
+
+Catalog responses are cached per worker for RESPONSE_CACHE_TTL seconds and are
+never invalidated early: admin writes go through the Flask app, whose tag
+invalidation only reaches its own process. After an edit, these routes can
+serve the old product or post for up to RESPONSE_CACHE_TTL seconds (lower it
+to shorten that window, 0 turns the cache off). The admin pages read from the
+Flask app, so editors see their changes at once.
+
+Usage (from backend/): uvicorn asgi:app --host 0.0.0.0 --port 5004 --workers 4
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from datetime import datetime
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+from core.config.config import Config
+from core.database.client import client_options, catalog_read_preference
+from modules.products.models.async_product import AsyncProduct
+from modules.blog.models.async_blog import AsyncBlog
+from shared.utils.cache import TaggedCache
+from shared.utils.health import DependencyStatus, build_info
+from shared.utils.json_provider import dumps_bytes
+from shared.utils.pagination import parse_limit, wants_total
+
+# TTL only, no tags: nothing in this process writes, so nothing here can invalidate early
+response_cache = TaggedCache(Config.RESPONSE_CACHE_SIZE, Config.RESPONSE_CACHE_TTL)
+
+def json_response(data, status=200):
+    return Response(dumps_bytes(data) + b'\n', status_code=status, media_type='application/json')
+
+def error_response(message, status=400):
+    return json_response({'success': False, 'error': message}, status)
+
+def cached(view):
+    """Cache 200 responses by path and query string with a strong ETag, answer If-None-Match with 304"""
+    async def endpoint(request):
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+        entry = response_cache.get(key)
+        if entry is None:
+            response = await view(request)
+            if response.status_code != 200:
+                return response
+            entry = (response.body, hashlib.sha1(response.body).hexdigest())
+            response_cache.set(key, entry, [])
+        body, etag = entry
+        headers = {'ETag': f'"{etag}"', 'Cache-Control': f'public, max-age={Config.RESPONSE_CACHE_MAX_AGE}'}
+        if request.headers.get('if-none-match') == headers['ETag']:
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type='application/json', headers=headers)
+    return endpoint
+
+def models(request):
+    return request.app.state
+
+@cached
+async def get_products(request):
+    args = request.query_params
+    search, category = args.get('search', ''), args.get('category', '')
+    try:
+        projection = models(request).product_model.projection(args.get('view'), args.get('fields'), 'list')
+    except ValueError as e:
+        return error_response(str(e))
+    if 'cursor' in args:
+        # Cursor mode: ?cursor= (empty) for the first page, then next_cursor
+        try:
+            return json_response(await models(request).product_model.get_products_page(
+                args.get('cursor') or None, parse_limit(args.get('per_page'), 20), search, category, wants_total(args, False), projection))
+        except ValueError:
+            return error_response('Invalid cursor')
+    page, per_page = int(args.get('page', 1)), int(args.get('per_page', 100))
+    skip = (page - 1) * per_page
+    return json_response(await models(request).product_model.get_all_products(skip, per_page, search, category, wants_total(args, True), projection))
+
+@cached
+async def get_product(request):
+    args = request.query_params
+    try:
+        projection = models(request).product_model.projection(args.get('view'), args.get('fields'))
+        return json_response(await models(request).product_model.get_product_by_id(request.path_params['product_id'], projection))
+    except (ValueError, InvalidId) as e:
+        return error_response(str(e))
+
+@cached
+async def get_blogs(request):
+    args = request.query_params
+    try:
+        projection = models(request).blog_model.projection(args.get('view'), args.get('fields'), 'list')
+    except ValueError as e:
+        return error_response(str(e))
+    if 'cursor' in args:
+        try:
+            return json_response(await models(request).blog_model.get_blogs_page(
+                args.get('cursor') or None, parse_limit(args.get('per_page'), 20), args.get('search', ''), args.get('status', ''), wants_total(args, False), projection))
+        except ValueError:
+            return error_response('Invalid cursor')
+    return json_response(await models(request).blog_model.get_all_blogs(with_total=wants_total(args, True), projection=projection))
+
+@cached
+async def get_featured_blogs(request):
+    args = request.query_params
+    try:
+        projection = models(request).blog_model.projection(args.get('view'), args.get('fields'), 'list')
+    except ValueError as e:
+        return error_response(str(e))
+    blogs = await models(request).blog_model.get_featured_blogs(int(args.get('limit', 3)), projection)
+    return json_response({'success': True, 'data': blogs})
+
+@cached
+async def get_blog(request):
+    args = request.query_params
+    try:
+        projection = models(request).blog_model.projection(args.get('view'), args.get('fields'))
+        result = await models(request).blog_model.get_blog_by_id(request.path_params['blog_id'], projection)
+        return json_response(result, 200 if result['success'] else 404)
+    except (ValueError, InvalidId) as e:
+        return error_response(str(e))
+
+async def monitor_database(client, status):
+    """Background ping feeding the health endpoints, probes never wait on MongoDB"""
+    while True:
+        started = time.perf_counter()
+        try:
+            await client.admin.command('ping')
+            status.record_success((time.perf_counter() - started) * 1000)
+        except Exception as e:
+            status.record_failure(e)
+        await asyncio.sleep(status.interval)
+
+def uptime(request):
+    return round(time.monotonic() - request.app.state.started_at, 1)
+
+async def api_health(request):
+    database = request.app.state.dependency_status.snapshot()
+    return json_response({
+        'api_status': 'OK',
+        'database_status': 'Connected' if database['status'] == 'up' and not database['stale'] else 'Disconnected',
+        'database': database,
+        'timestamp': datetime.utcnow().isoformat(),
+        'uptime': uptime(request),
+        'pid': os.getpid(),
+        'build': request.app.state.build_info,
+        'server': 'asgi'
+    })
+
+async def health_live(request):
+    return json_response({'status': 'OK', 'uptime': uptime(request)})
+
+async def health_ready(request):
+    status = request.app.state.dependency_status
+    ready = status.ready()
+    return json_response({'status': 'ready' if ready else 'not_ready', 'database': status.snapshot(), 'uptime': uptime(request)}, 200 if ready else 503)
+
+def create_asgi_app(mongodb_uri=None, database_name=None):
+    """Starlette app with the async models, the motor client is opened per worker on startup"""
+    async def startup():
+        client = AsyncIOMotorClient(mongodb_uri or Config.MONGODB_URI, **client_options())
+        db = client[database_name or Config.DATABASE_NAME]
+        app.state.mongo_client = client
+        app.state.product_model = AsyncProduct(db, read_preference=catalog_read_preference())
+        app.state.blog_model = AsyncBlog(db, read_preference=catalog_read_preference(), cache_size=Config.BLOG_CACHE_SIZE, cache_ttl=Config.BLOG_CACHE_TTL)
+        app.state.started_at = time.monotonic()
+        app.state.build_info = build_info(Config.APP_VERSION, Config.BUILD_COMMIT, Config.BUILD_TIME, Config.BUILD_COMMIT_FILE)
+        app.state.dependency_status = DependencyStatus(Config.HEALTH_CHECK_INTERVAL)
+        app.state.monitor = asyncio.create_task(monitor_database(client, app.state.dependency_status))
+
+    async def shutdown():
+        app.state.monitor.cancel()
+        app.state.mongo_client.close()
+
+    app = Starlette(routes=[
+        Route('/api/products', get_products),
+        Route('/api/products/{product_id}', get_product),
+        Route('/api/blogs', get_blogs),
+        Route('/api/blogs/featured', get_featured_blogs),
+        Route('/api/blogs/{blog_id}', get_blog),
+        Route('/api/health', api_health),
+        Route('/api/health/live', health_live),
+        Route('/api/health/ready', health_ready)
+    ], middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_credentials=True, allow_methods=['GET'], allow_headers=['*'])
+    ], on_startup=[startup], on_shutdown=[shutdown])
+    return app
+
+app = create_asgi_app()
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run('asgi:app', host='0.0.0.0', port=int(os.getenv('ASGI_PORT', 5004)), workers=int(os.getenv('ASGI_WORKERS', 1)))
@@ -4,6 +4,8 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 class Config:
     """Flask application configuration"""
     
@@ -11,11 +13,129 @@ class Config:
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
     DATABASE_NAME = os.getenv('DATABASE_NAME', 'flower_shop')
     
+    # MongoDB connection pool (per process: total connections = workers x MONGO_MAX_POOL_SIZE)
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 30000))
+    # Lazy per-process connect: ping attempts and exponential backoff (seconds) between them
+    MONGO_CONNECT_RETRIES = int(os.getenv('MONGO_CONNECT_RETRIES', 4))
+    MONGO_CONNECT_BACKOFF = float(os.getenv('MONGO_CONNECT_BACKOFF', 0.5))
+    MONGO_CONNECT_BACKOFF_MAX = float(os.getenv('MONGO_CONNECT_BACKOFF_MAX', 8))
+    # Comma separated, e.g. "zstd,snappy,zlib" (zstd/snappy need their python packages)
+    MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', '')
+    # primary | primaryPreferred | secondary | secondaryPreferred | nearest
+    MONGO_READ_PREFERENCE = os.getenv('MONGO_READ_PREFERENCE', 'primary')
+    # Catalog reads (products, blogs). The admin pages and the response cache refill after a write read the same
+    # collections, so anything but primary can serve, and cache for RESPONSE_CACHE_TTL, data a secondary has not caught up on
+    MONGO_CATALOG_READ_PREFERENCE = os.getenv('MONGO_CATALOG_READ_PREFERENCE', 'primary')
+    
     # JWT Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-secret-key-here')
     JWT_REFRESH_SECRET_KEY = os.getenv('JWT_REFRESH_SECRET_KEY', 'your-refresh-secret-key-here')
     JWT_EXPIRATION_HOURS = int(os.getenv('JWT_EXPIRATION_HOURS', 24))
     
+    # Reverse proxies in front of the app that append to X-Forwarded-For (0: clients connect directly).
+    # ProxyFix trusts only that many trailing hops for request.remote_addr and the scheme, app-wide
+    TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+    
+    # Password hashing (bcrypt cost factor, worker processes, max queued calls before 503)
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 32))
+    PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    
+    # Auth rate limits (token buckets, "count/seconds", empty or 0 disables a rule)
+    #   memory - per process: with N workers a client gets up to N times each rate
+    #   shared - one table for every worker on the host (named shared memory, Linux/macOS)
+    # A check costs ~2 µs (memory) / ~7 µs (shared), a login (IP + account) ~7 µs in all, see scripts/bench_ratelimit.py
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+    RATE_LIMIT_SHARED_NAME = os.getenv('RATE_LIMIT_SHARED_NAME', 'flower_shop_ratelimit')
+    RATE_LIMIT_SHARED_SLOTS = int(os.getenv('RATE_LIMIT_SHARED_SLOTS', 65536))
+    RATE_LIMIT_LOGIN_IP = os.getenv('RATE_LIMIT_LOGIN_IP', '20/60')
+    RATE_LIMIT_LOGIN_ACCOUNT = os.getenv('RATE_LIMIT_LOGIN_ACCOUNT', '5/60')
+    RATE_LIMIT_REGISTER_IP = os.getenv('RATE_LIMIT_REGISTER_IP', '5/600')
+    RATE_LIMIT_CHANGE_PASSWORD_IP = os.getenv('RATE_LIMIT_CHANGE_PASSWORD_IP', '10/300')
+    RATE_LIMIT_CHANGE_PASSWORD_ACCOUNT = os.getenv('RATE_LIMIT_CHANGE_PASSWORD_ACCOUNT', '5/300')
+    RATE_LIMIT_REFRESH_TOKEN_IP = os.getenv('RATE_LIMIT_REFRESH_TOKEN_IP', '30/60')
+    
+    # Authenticated user cache (per process, bounded LRU with TTL in seconds)
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 10000))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))
+    
+    # Public catalog response cache (products, blogs)
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 2000))
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 60))
+    RESPONSE_CACHE_MAX_AGE = int(os.getenv('RESPONSE_CACHE_MAX_AGE', 30))
+    # Most read blog posts kept as documents (per process, LRU with TTL in seconds). Only the worker that writes
+    # a post clears it, the others serve the old version until it expires: capped at the response cache's TTL
+    BLOG_CACHE_SIZE = int(os.getenv('BLOG_CACHE_SIZE', 128))
+    BLOG_CACHE_TTL = min(int(os.getenv('BLOG_CACHE_TTL', RESPONSE_CACHE_TTL)), RESPONSE_CACHE_TTL)
+    
+    # Orders Configuration
+    # Order numbers reserved per process in one round trip to the counters collection
+    ORDER_NUMBER_BLOCK_SIZE = int(os.getenv('ORDER_NUMBER_BLOCK_SIZE', 20))
+    
+    # Indexes declared by the models: build them in the background at startup,
+    # or only check they exist (when builds are run from a deploy step instead)
+    ENSURE_INDEXES = os.getenv('ENSURE_INDEXES', 'True').lower() == 'true'
+    
+    # /api/metrics (Prometheus text format, per process):
+    #   full  - latency histograms per endpoint and per MongoDB command
+    #           (~12 µs per request plus ~4 µs per MongoDB command, see scripts/bench_metrics.py)
+    #   light - request count and total latency per endpoint, no command listener (~11 µs per request)
+    #   off   - nothing recorded (~2 µs per request)
+    METRICS_MODE = os.getenv('METRICS_MODE', 'full')
+    # When set, scrapers must send "Authorization: Bearer <token>"
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    
+    # Build info reported by /api/health and /api/info; without BUILD_COMMIT the commit is read from
+    # BUILD_COMMIT_FILE, written by the build (e.g. git rev-parse --short HEAD > backend/BUILD_COMMIT)
+    APP_VERSION = os.getenv('APP_VERSION', '1.0.0')
+    BUILD_COMMIT = os.getenv('BUILD_COMMIT', '')
+    BUILD_COMMIT_FILE = os.getenv('BUILD_COMMIT_FILE', os.path.join(BACKEND_DIR, 'BUILD_COMMIT'))
+    BUILD_TIME = os.getenv('BUILD_TIME', '')
+    
+    # Seconds between background MongoDB pings feeding /api/health/ready
+    HEALTH_CHECK_INTERVAL = float(os.getenv('HEALTH_CHECK_INTERVAL', 5))
+    
+    # Activity log (per process ring buffer flushed to the capped activity_log collection)
+    ACTIVITY_LOG_BUFFER = int(os.getenv('ACTIVITY_LOG_BUFFER', 10000))
+    ACTIVITY_LOG_BATCH_SIZE = int(os.getenv('ACTIVITY_LOG_BATCH_SIZE', 500))
+    ACTIVITY_LOG_FLUSH_INTERVAL = float(os.getenv('ACTIVITY_LOG_FLUSH_INTERVAL', 1.0))
+    # Seconds a request waits for room when the buffer is full before the event is dropped
+    ACTIVITY_LOG_BLOCK_TIMEOUT = float(os.getenv('ACTIVITY_LOG_BLOCK_TIMEOUT', 0.05))
+    ACTIVITY_LOG_SIZE_MB = int(os.getenv('ACTIVITY_LOG_SIZE_MB', 64))
+    ACTIVITY_LOG_MAX_DOCS = int(os.getenv('ACTIVITY_LOG_MAX_DOCS', 0))
+    
+    # Bulk product import / order status updates: rows per bulk_write, upload cap, error details kept
+    BULK_BATCH_SIZE = int(os.getenv('BULK_BATCH_SIZE', 500))
+    BULK_MAX_ROWS = int(os.getenv('BULK_MAX_ROWS', 50000))
+    BULK_MAX_ERRORS = int(os.getenv('BULK_MAX_ERRORS', 1000))
+    # Documents per cursor batch for the streaming NDJSON/CSV exports (bounds their memory)
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    # Order analytics: whole-hour UTC offset of the reported days/weeks/months (Vietnam is +7), longest range in days
+    ANALYTICS_UTC_OFFSET = int(os.getenv('ANALYTICS_UTC_OFFSET', 7))
+    ANALYTICS_MAX_DAYS = int(os.getenv('ANALYTICS_MAX_DAYS', 1100))
+    
+    # Product image variants (card/detail/zoom, WebP + JPEG) in a content-addressed disk cache
+    IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', os.path.join(BACKEND_DIR, 'image_cache'))
+    # Site paths such as /images/x.jpg are read from the frontend's public directory
+    IMAGE_SOURCE_ROOT = os.getenv('IMAGE_SOURCE_ROOT', os.path.join(os.path.dirname(BACKEND_DIR), 'public'))
+    # Prefix of the variant URLs stored on products (e.g. https://api.example.com/api/images behind a CDN)
+    IMAGE_URL_PREFIX = os.getenv('IMAGE_URL_PREFIX', '/api/images')
+    IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))
+    IMAGE_MAX_PENDING = int(os.getenv('IMAGE_MAX_PENDING', 256))
+    IMAGE_MAX_SOURCE_MB = int(os.getenv('IMAGE_MAX_SOURCE_MB', 20))
+    IMAGE_FETCH_TIMEOUT = int(os.getenv('IMAGE_FETCH_TIMEOUT', 10))
+    # Comma separated hosts remote images may be fetched from (empty: any host with public addresses)
+    IMAGE_ALLOWED_HOSTS = [host for host in os.getenv('IMAGE_ALLOWED_HOSTS', '').split(',') if host.strip()]
+    IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', 80))
+    
     # Flask Configuration
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
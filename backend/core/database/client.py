@@ -0,0 +1,65 @@
+import random
+import time
+from pymongo import MongoClient, ReadPreference
+from pymongo.errors import PyMongoError
+from core.config.config import Config
+
+class DatabaseUnavailable(Exception):
+    """MongoDB could not be reached after retrying, requests needing it answer 503"""
+
+READ_PREFERENCES = {
+    'primary': ReadPreference.PRIMARY,
+    'primaryPreferred': ReadPreference.PRIMARY_PREFERRED,
+    'secondary': ReadPreference.SECONDARY,
+    'secondaryPreferred': ReadPreference.SECONDARY_PREFERRED,
+    'nearest': ReadPreference.NEAREST
+}
+
+def read_preference(name):
+    try:
+        return READ_PREFERENCES[name]
+    except KeyError:
+        raise ValueError(f"Unknown read preference: {name}")
+
+def client_options(config=Config):
+    """MongoClient/AsyncIOMotorClient keyword arguments from the MONGO_* settings"""
+    options = {
+        'maxPoolSize': config.MONGO_MAX_POOL_SIZE,
+        'minPoolSize': config.MONGO_MIN_POOL_SIZE,
+        'waitQueueTimeoutMS': config.MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+        'serverSelectionTimeoutMS': config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        'connectTimeoutMS': config.MONGO_CONNECT_TIMEOUT_MS,
+        'socketTimeoutMS': config.MONGO_SOCKET_TIMEOUT_MS or None,
+        'readPreference': read_preference(config.MONGO_READ_PREFERENCE).mongos_mode
+    }
+    compressors = [c.strip() for c in config.MONGO_COMPRESSORS.split(',') if c.strip()]
+    if compressors:
+        options['compressors'] = compressors
+    return options
+
+def create_client(event_listeners=(), config=Config):
+    return MongoClient(config.MONGODB_URI, event_listeners=list(event_listeners), **client_options(config))
+
+def connect(event_listeners=(), logger=None, config=Config):
+    """Create a client and ping it, retrying with exponential backoff and jitter.
+
+    Raises DatabaseUnavailable after MONGO_CONNECT_RETRIES failed attempts.
+    """
+    delay = config.MONGO_CONNECT_BACKOFF
+    for attempt in range(1, config.MONGO_CONNECT_RETRIES + 1):
+        client = create_client(event_listeners, config)
+        try:
+            client.admin.command('ping')
+            return client
+        except PyMongoError as e:
+            client.close()
+            if attempt == config.MONGO_CONNECT_RETRIES:
+                raise DatabaseUnavailable(str(e))
+            wait = min(delay, config.MONGO_CONNECT_BACKOFF_MAX) * random.uniform(0.5, 1.0)
+            if logger:
+                logger.warning(f'MongoDB ping failed (attempt {attempt}/{config.MONGO_CONNECT_RETRIES}), retrying in {wait:.1f}s: {e}')
+            time.sleep(wait)
+            delay *= 2
+
+def catalog_read_preference(config=Config):
+    return read_preference(config.MONGO_CATALOG_READ_PREFERENCE)
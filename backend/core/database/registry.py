@@ -0,0 +1,20 @@
+from modules.users.models.user import User
+from modules.orders.models.order import Order
+from modules.orders.models.cart import CartModel
+from modules.products.models.product import Product
+from modules.blog.models.blog import Blog
+from modules.stats.models.activity import ActivityEvents
+from modules.stats.models.analytics import OrderAnalytics
+
+# Models that declare COLLECTION, INDEXES and QUERIES
+MODELS = [User, Order, CartModel, Product, Blog, ActivityEvents, OrderAnalytics]
+
+def index_registry():
+    """{collection: [IndexModel]} for every registered model"""
+    return {model.COLLECTION: model.INDEXES for model in MODELS}
+
+def canonical_queries():
+    """(collection, query name, filter, sort, limit) for every registered model (limit None when not declared)"""
+    for model in MODELS:
+        for name, (query, sort, *limit) in model.QUERIES.items():
+            yield model.COLLECTION, name, query, sort, limit[0] if limit else None
@@ -0,0 +1,8 @@
+"""
+Load-test suite: seeds a throwaway database, starts the app against it and
+replays a weighted mix of real routes (see scenarios.py), then reports
+throughput and latency percentiles per route and compares against a saved
+baseline.
+
+Usage (from backend/): python -m loadtest --help
+"""
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Seed a load-test database, start the API against it and replay the weighted request mix.
+
+Seeding drops and refills the target database, so it refuses any database
+whose name does not contain "loadtest". Results go to loadtest/results/;
+--save-baseline stores the run as the reference and --compare fails (exit 1)
+when a route's p95/p99, its error rate or total throughput regressed beyond
+--threshold.
+
+Usage (from backend/):
+  python -m loadtest --save-baseline                 # seed, start `python app.py`, run, store baseline
+  python -m loadtest --skip-seed --compare           # later: same run, compared with the baseline
+  python -m loadtest --start-mongod --users 10000 --orders 50000 --concurrency 64 --duration 120
+  python -m loadtest --server-cmd "gunicorn -w 4 --threads 8 -b :{port} app:app" --compare
+  python -m loadtest --base-url http://localhost:5003 --skip-seed   # an already running server
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+from core.config.config import Config
+from shared.utils.health import build_info
+from loadtest import runner, report
+from loadtest.seed import seed, VOLUMES
+from loadtest.scenarios import parse_mix
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, 'baselines', 'baseline.json')
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog='python -m loadtest', description=__doc__.split('\n')[1])
+    parser.add_argument('--mongodb-uri', default=Config.MONGODB_URI)
+    parser.add_argument('--database', default='flower_shop_loadtest')
+    parser.add_argument('--start-mongod', action='store_true', help='run a throwaway mongod instead of using --mongodb-uri')
+    parser.add_argument('--mongod-port', type=int, default=27099)
+    parser.add_argument('--skip-seed', action='store_true', help='reuse the data already in --database')
+    for name, count in VOLUMES.items():
+        parser.add_argument(f'--{name}', type=int, default=count, help=f'{name} to seed (default {count})')
+    parser.add_argument('--base-url', help='test a running server instead of starting one')
+    parser.add_argument('--server-cmd', default='{python} app.py', help='command started from backend/, {port} and {python} are substituted')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--concurrency', type=int, default=32, help='virtual users (threads)')
+    parser.add_argument('--duration', type=int, default=60, help='measured seconds')
+    parser.add_argument('--warmup', type=int, default=5, help='seconds of load before measuring')
+    parser.add_argument('--mix', default='', help='scenario weights, e.g. "catalog=50,login=0"')
+    parser.add_argument('--seed-value', type=int, default=7)
+    parser.add_argument('--output', help='result file (default loadtest/results/<timestamp>.json)')
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE)
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.15, help='allowed relative regression (0.15 = 15%%)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    if not args.skip_seed and 'loadtest' not in args.database:
+        sys.exit(f"❌ Refusing to seed '{args.database}': seeding drops its collections (use a *loadtest* database)")
+
+    workdir = tempfile.mkdtemp(prefix='loadtest-')
+    mongod = server = None
+    try:
+        mongodb_uri = args.mongodb_uri
+        if args.start_mongod:
+            mongod = runner.start_mongod(args.mongod_port, os.path.join(workdir, 'db'), os.path.join(workdir, 'mongod.log'))
+            mongodb_uri = f'mongodb://127.0.0.1:{args.mongod_port}/'
+            print(f"🗄️  mongod started on port {args.mongod_port} ({workdir})")
+        client = MongoClient(mongodb_uri)
+        db = client[args.database]
+        volumes = {name: getattr(args, name) for name in VOLUMES}
+        if not args.skip_seed:
+            print(f"🌱 Seeding {args.database}: {volumes}")
+            counts = seed(db, rounds=Config.BCRYPT_ROUNDS, seed_value=args.seed_value, **volumes)
+            print(f"✅ Seeded {counts}")
+        else:
+            volumes = {name: db[name].estimated_document_count() for name in VOLUMES}
+        ctx = runner.load_context(db)
+        client.close()
+
+        base_url = args.base_url
+        if not base_url:
+            log_path = os.path.join(workdir, 'server.log')
+            env = {'MONGODB_URI': mongodb_uri, 'DATABASE_NAME': args.database, 'FLASK_ENV': 'production',
+                   'FLASK_DEBUG': 'False', 'BCRYPT_ROUNDS': str(Config.BCRYPT_ROUNDS),
+                   # Every virtual user logs in from 127.0.0.1: the auth rate limits would turn the mix into 429s
+                   'RATE_LIMIT_ENABLED': 'False'}
+            server = runner.start_server(args.server_cmd.replace('{port}', str(args.port)), args.port, env, log_path)
+            base_url = f'http://127.0.0.1:{args.port}'
+            print(f"🚀 Server started: {args.server_cmd} (log {log_path})")
+        runner.wait_until_ready(base_url)
+
+        print(f"🌸 {args.concurrency} virtual users, {args.warmup}s warm-up + {args.duration}s, mix {weights}")
+        samples, elapsed = runner.run(base_url, ctx, weights, args.concurrency, args.duration, args.warmup, args.seed_value)
+    except RuntimeError as e:
+        sys.exit(f"❌ {e}")
+    finally:
+        runner.stop(server)
+        runner.stop(mongod)
+
+    meta = {
+        'started_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'build': build_info(Config.APP_VERSION, Config.BUILD_COMMIT, build_file=Config.BUILD_COMMIT_FILE),
+        'server': args.base_url or args.server_cmd,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'mix': weights,
+        'volumes': volumes
+    }
+    result = report.summarize(samples, elapsed, meta)
+    report.print_report(result)
+
+    output = args.output or os.path.join(HERE, 'results', f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json")
+    report.save(result, output)
+    print(f"💾 Results saved to {output}")
+    if args.save_baseline:
+        report.save(result, args.save_baseline)
+        print(f"📌 Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.compare):
+            sys.exit(f"❌ No baseline at {args.compare}, run with --save-baseline first")
+        baseline = report.load(args.compare)
+        for key, (before, after) in report.comparable(result, baseline).items():
+            print(f"⚠️  {key} differs from the baseline: {before} -> {after}")
+        regressions = report.compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) against {args.compare} (threshold {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"✅ No regressions against {args.compare} (threshold {args.threshold:.0%})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import json
+import os
+from collections import defaultdict
+
+def _percentile(latencies, p):
+    return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0.0
+
+def _stats(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(_percentile(latencies, 0.50), 2),
+        'p95_ms': round(_percentile(latencies, 0.95), 2),
+        'p99_ms': round(_percentile(latencies, 0.99), 2),
+        'max_ms': round(latencies[-1], 2) if latencies else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0
+    }
+
+def summarize(samples, elapsed, meta):
+    """{'meta': ..., 'total': stats, 'routes': {route: stats}} from (route, ms, ok) samples"""
+    latencies, errors = defaultdict(list), defaultdict(int)
+    for route, ms, ok in samples:
+        latencies[route].append(ms)
+        if not ok:
+            errors[route] += 1
+    return {
+        'meta': dict(meta, seconds=round(elapsed, 2)),
+        'total': _stats([ms for _, ms, _ in samples], sum(errors.values()), elapsed),
+        'routes': {route: _stats(latencies[route], errors[route], elapsed) for route in sorted(latencies)}
+    }
+
+def print_report(result):
+    total = result['total']
+    print(f"\n{'route':40} {'req':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for route, stats in result['routes'].items():
+        print(f"{route:40} {stats['requests']:7d} {stats['rps']:8.1f} {stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} {stats['errors']:5d}")
+    print(f"{'TOTAL':40} {total['requests']:7d} {total['rps']:8.1f} {total['p50_ms']:8.1f} {total['p95_ms']:8.1f} {total['p99_ms']:8.1f} {total['errors']:5d}")
+    print("(latencies in ms)")
+
+def save(result, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def _error_rate(stats):
+    return stats['errors'] / stats['requests'] if stats['requests'] else 0.0
+
+def compare(result, baseline, threshold=0.15, min_ms=2.0):
+    """Regressions of `result` against `baseline`, as printable lines.
+
+    A route regresses when its p95 or p99 grows by more than `threshold` (and
+    by at least `min_ms`, so sub-millisecond jitter on cached routes does not
+    count), when its error rate grows, or when total throughput drops by more
+    than `threshold`. Routes missing from either run are reported, not failed.
+    """
+    regressions = []
+    for route, stats in result['routes'].items():
+        before = baseline['routes'].get(route)
+        if before is None:
+            print(f"🆕 {route}: not in baseline")
+            continue
+        for key in ('p95_ms', 'p99_ms'):
+            if stats[key] > before[key] * (1 + threshold) and stats[key] - before[key] >= min_ms:
+                regressions.append(f"{route}: {key} {before[key]:.1f} -> {stats[key]:.1f} ms (+{(stats[key] / before[key] - 1) * 100 if before[key] else 100:.0f}%)")
+        if _error_rate(stats) > _error_rate(before) + 0.001:
+            regressions.append(f"{route}: error rate {_error_rate(before):.2%} -> {_error_rate(stats):.2%}")
+    for route in baseline['routes'].keys() - result['routes'].keys():
+        print(f"➖ {route}: in baseline, not exercised by this run")
+    before, after = baseline['total']['rps'], result['total']['rps']
+    if before and after < before * (1 - threshold):
+        regressions.append(f"throughput {before:.1f} -> {after:.1f} req/s ({(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+def comparable(result, baseline):
+    """Settings that differ between the runs (the comparison is only fair when this is empty)"""
+    keys = ('concurrency', 'duration', 'mix', 'volumes', 'server')
+    return {key: (baseline['meta'].get(key), result['meta'].get(key)) for key in keys
+            if baseline['meta'].get(key) != result['meta'].get(key)}
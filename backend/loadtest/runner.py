@@ -0,0 +1,159 @@
+import os
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+import requests
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from loadtest.seed import PASSWORD, ADMIN_EMAIL, email_for
+from loadtest.scenarios import SCENARIOS
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Seeded accounts the virtual users log in as (see seed._users)
+LOGIN_ACCOUNTS = 100
+
+class VirtualUser:
+    """One client thread: its own HTTP session, token and random stream.
+
+    Samples are (route, ms, ok) and only kept once `record_after` (the end of
+    the warm-up) has passed.
+    """
+
+    def __init__(self, base_url, index, seed_value, timeout=30):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.rng = random.Random(seed_value * 1000 + index)
+        self.email = email_for(index % LOGIN_ACCOUNTS)
+        self.timeout = timeout
+        self.auth = {}
+        self.samples = []
+        self.record_after = float('inf')
+
+    def call(self, route, method, path, **kwargs):
+        """Send one request, returns the JSON body of a successful response (None otherwise)"""
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        finished = time.perf_counter()
+        if started >= self.record_after:
+            self.samples.append((route, (finished - started) * 1000, ok))
+        if not ok:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    def login(self, email=None):
+        body = self.call('POST /api/auth/login', 'POST', '/api/auth/login',
+                         json={'email': email or self.email, 'password': PASSWORD}) or {}
+        if not body.get('access_token'):
+            raise RuntimeError(f'Login failed for {email or self.email}, is the database seeded?')
+        return {'Authorization': f"Bearer {body['access_token']}"}
+
+def load_context(db, sample=500):
+    """Ids the scenarios pick from, read straight from the database"""
+    product_ids = [str(p['_id']) for p in db.products.aggregate([{'$match': {'is_active': True}}, {'$sample': {'size': sample}}, {'$project': {'_id': 1}}])]
+    # Posts are read by slug, like the post page does (by id for posts seeded before slugs)
+    blog_ids = [b.get('slug') or str(b['_id']) for b in db.blogs.aggregate([{'$match': {'status': 'published'}}, {'$sample': {'size': sample}}, {'$project': {'slug': 1}}])]
+    if not product_ids:
+        raise RuntimeError('No active products in the database, seed it first')
+    return {'product_ids': product_ids, 'blog_ids': blog_ids}
+
+def run(base_url, ctx, weights, concurrency=32, duration=60, warmup=5, seed_value=7):
+    """Replay the weighted mix from `concurrency` threads for `warmup` + `duration` seconds.
+
+    Returns (samples, measured seconds). Scenarios are picked per iteration, so
+    the mix converges on the weights; tokens are fetched before the clock starts.
+    """
+    names = [name for name, weight in weights.items() if weight > 0]
+    mix = [weights[name] for name in names]
+    ctx = dict(ctx, admin_auth=VirtualUser(base_url, 0, seed_value).login(ADMIN_EMAIL))
+    users = [VirtualUser(base_url, i, seed_value) for i in range(concurrency)]
+    for user in users:
+        user.auth = user.login()
+
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+    errors = []
+
+    def work(user):
+        user.record_after = measure_from
+        while time.perf_counter() < deadline:
+            name = user.rng.choices(names, mix)[0]
+            try:
+                SCENARIOS[name](user, ctx)
+            except Exception as e:  # a broken scenario must not silently shrink the load
+                errors.append(f'{name}: {e!r}')
+                return
+
+    threads = [threading.Thread(target=work, args=(user,), name=f'vu-{i}', daemon=True) for i, user in enumerate(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise RuntimeError(f'Scenario failed: {errors[0]}')
+    elapsed = time.perf_counter() - measure_from
+    return [sample for user in users for sample in user.samples], elapsed
+
+def wait_until_ready(base_url, timeout=60, process=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f'Server exited with code {process.returncode}')
+        try:
+            if requests.get(f'{base_url}/api/health/ready', timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f'{base_url} not ready after {timeout}s')
+
+def start_server(command, port, env, log_path, timeout=60):
+    """Start the API (`command` run from backend/) on `port`, wait for /api/health/ready"""
+    log = open(log_path, 'w')
+    process = subprocess.Popen(shlex.split(command.replace('{python}', shlex.quote(sys.executable))), cwd=BACKEND_DIR,
+                               env=dict(os.environ, PORT=str(port), **env), stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_until_ready(f'http://127.0.0.1:{port}', timeout, process)
+    except Exception:
+        stop(process)
+        raise
+    return process
+
+def start_mongod(port, dbpath, log_path, timeout=30):
+    """Throwaway mongod for the run (needs the `mongod` binary on PATH)"""
+    os.makedirs(dbpath, exist_ok=True)
+    process = subprocess.Popen(['mongod', '--dbpath', dbpath, '--port', str(port), '--bind_ip', '127.0.0.1', '--logpath', log_path])
+    client = MongoClient(f'mongodb://127.0.0.1:{port}/', serverSelectionTimeoutMS=1000)
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                client.admin.command('ping')
+                return process
+            except PyMongoError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    stop(process)
+                    raise RuntimeError(f'mongod did not start, see {log_path}')
+                time.sleep(0.5)
+    finally:
+        client.close()
+
+def stop(process, timeout=10):
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
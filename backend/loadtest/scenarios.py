@@ -0,0 +1,100 @@
+"""
+Weighted request mix replayed by the runner.
+
+Each scenario is one user journey: a function taking the virtual user's client
+(`client.call(route, method, path, ...)` records latency under `route`, the
+path template, so /api/products/<id> aggregates across ids) and the shared run
+context. Weights are relative; edit WEIGHTS or pass --mix to change the mix.
+"""
+
+from loadtest.seed import PASSWORD, FLOWERS, COLORS, CATEGORIES
+
+WEIGHTS = {
+    'catalog': 30,
+    'search': 10,
+    'blog': 15,
+    'login': 5,
+    'cart': 20,
+    'checkout': 12,
+    'admin_dashboard': 8
+}
+
+def catalog(client, ctx):
+    rng = client.rng
+    first = client.call('GET /api/products?cursor', 'GET', '/api/products', params={'cursor': '', 'per_page': 20, 'view': 'card'})
+    next_cursor = (((first or {}).get('data') or {}).get('pagination') or {}).get('next_cursor')
+    if next_cursor and rng.random() < 0.5:
+        client.call('GET /api/products?cursor', 'GET', '/api/products', params={'cursor': next_cursor, 'per_page': 20, 'view': 'card'})
+    client.call('GET /api/products?category', 'GET', '/api/products',
+                params={'cursor': '', 'per_page': 20, 'view': 'card', 'category': rng.choice(CATEGORIES)})
+    for product_id in rng.sample(ctx['product_ids'], min(2, len(ctx['product_ids']))):
+        client.call('GET /api/products/<id>', 'GET', f'/api/products/{product_id}', params={'view': 'detail'})
+
+def search(client, ctx):
+    rng = client.rng
+    term = f'{rng.choice(FLOWERS)} {rng.choice(COLORS)}'
+    # Search-as-you-type: a prefix of the last word, then the whole term
+    client.call('GET /api/products?search', 'GET', '/api/products', params={'search': term[:-2], 'per_page': 20, 'view': 'card'})
+    client.call('GET /api/products?search', 'GET', '/api/products', params={'search': term, 'per_page': 20, 'view': 'card'})
+
+def blog(client, ctx):
+    rng = client.rng
+    client.call('GET /api/blogs', 'GET', '/api/blogs', params={'cursor': '', 'per_page': 12, 'view': 'card', 'status': 'published'})
+    client.call('GET /api/blogs/featured', 'GET', '/api/blogs/featured')
+    if ctx['blog_ids']:
+        client.call('GET /api/blogs/<id>', 'GET', f"/api/blogs/{rng.choice(ctx['blog_ids'])}", params={'view': 'article'})
+
+def login(client, ctx):
+    client.call('POST /api/auth/login', 'POST', '/api/auth/login', json={'email': client.email, 'password': PASSWORD})
+
+def cart(client, ctx):
+    rng = client.rng
+    product_id, other_id = rng.choice(ctx['product_ids']), rng.choice(ctx['product_ids'])
+    auth = client.auth
+    client.call('POST /api/cart', 'POST', '/api/cart', headers=auth, json={'product_id': product_id, 'quantity': 1})
+    client.call('POST /api/cart', 'POST', '/api/cart', headers=auth, json={'product_id': other_id, 'quantity': rng.randint(1, 3)})
+    client.call('PUT /api/cart/<id>', 'PUT', f'/api/cart/{product_id}', headers=auth, json={'quantity': rng.randint(1, 5)})
+    client.call('GET /api/cart', 'GET', '/api/cart', headers=auth)
+    client.call('DELETE /api/cart/<id>', 'DELETE', f'/api/cart/{other_id}', headers=auth)
+
+def checkout(client, ctx):
+    rng = client.rng
+    auth = client.auth
+    client.call('POST /api/cart', 'POST', '/api/cart', headers=auth, json={'product_id': rng.choice(ctx['product_ids']), 'quantity': 1})
+    body = client.call('GET /api/cart', 'GET', '/api/cart', headers=auth) or {}
+    items = body.get('data') or []
+    total = sum((item.get('product') or {}).get('price', 0) * item.get('quantity', 0) for item in items)
+    client.call('POST /api/admin/orders', 'POST', '/api/admin/orders', headers=auth,
+                json={'total_amount': total, 'payment_method': rng.choice(['cod', 'bank_transfer']), 'items': items})
+    client.call('POST /api/cart', 'POST', '/api/cart', headers=auth, json={'items': []})
+    client.call('GET /api/admin/my-orders', 'GET', '/api/admin/my-orders', headers=auth, params={'limit': 10})
+
+def admin_dashboard(client, ctx):
+    auth = ctx['admin_auth']
+    client.call('GET /api/admin/dashboard-stats', 'GET', '/api/admin/dashboard-stats', headers=auth)
+    client.call('GET /api/admin/recent-activity', 'GET', '/api/admin/recent-activity', headers=auth)
+    client.call('GET /api/admin/analytics', 'GET', '/api/admin/analytics', headers=auth, params={'granularity': 'month'})
+    client.call('GET /api/admin/orders', 'GET', '/api/admin/orders', headers=auth, params={'limit': 20})
+    client.call('GET /api/admin/users', 'GET', '/api/admin/users', headers=auth, params={'per_page': 10})
+
+SCENARIOS = {
+    'catalog': catalog,
+    'search': search,
+    'blog': blog,
+    'login': login,
+    'cart': cart,
+    'checkout': checkout,
+    'admin_dashboard': admin_dashboard
+}
+
+def parse_mix(text):
+    """'catalog=50,cart=20' -> weights, scenarios left out keep their default weight (0 disables one)"""
+    weights = dict(WEIGHTS)
+    for part in filter(None, (p.strip() for p in (text or '').split(','))):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise ValueError(f'Unknown scenario: {name} (choose from {", ".join(SCENARIOS)})')
+        weights[name] = int(weight)
+    if not any(weights.values()):
+        raise ValueError('Every scenario has weight 0')
+    return weights
@@ -0,0 +1,134 @@
+import random
+from datetime import datetime, timedelta
+from bson import ObjectId
+from shared.utils.passwords import PasswordHasher
+from shared.utils.search import search_fields
+from shared.utils.richtext import render_content, slugify
+from shared.utils.indexes import ensure_indexes
+from core.database.registry import index_registry
+from modules.stats.models.rollup import StatsRollup
+from modules.stats.models.activity import ActivityEvents
+from modules.stats.models.analytics import OrderAnalytics
+
+PASSWORD = 'loadtest123'
+ADMIN_EMAIL = 'admin@loadtest.local'
+CATEGORIES = ['hoa-cuoi', 'hoa-sinh-nhat', 'hoa-khai-truong', 'hoa-chia-buon', 'lan-ho-diep', 'bo-hoa']
+FLOWERS = ['Hoa hồng', 'Hoa lan', 'Hoa ly', 'Hoa cúc', 'Hướng dương', 'Cẩm tú cầu', 'Tulip', 'Baby']
+COLORS = ['đỏ', 'trắng', 'hồng', 'vàng', 'tím', 'cam', 'xanh']
+STYLES = ['bó', 'giỏ', 'lẵng', 'hộp', 'kệ']
+STATUSES = ['pending', 'confirmed', 'shipping', 'delivered', 'cancelled']
+VOLUMES = {'users': 2000, 'products': 1000, 'blogs': 200, 'orders': 5000}
+BATCH = 1000
+
+def email_for(i):
+    return f'user{i}@loadtest.local'
+
+def _batches(docs):
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _created_at(rng, now, days=365):
+    return now - timedelta(seconds=rng.randint(0, days * 86400))
+
+def _users(rng, count, password_hash, now):
+    for i in range(count):
+        created = _created_at(rng, now)
+        user = {
+            'full_name': f'Khách hàng {i}', 'email': email_for(i), 'phone': f'09{i:08d}',
+            'password_hash': password_hash, 'role': 'user', 'is_active': rng.random() > 0.05,
+            'email_verified': False, 'phone_verified': False, 'created_at': created, 'updated_at': created,
+            'last_login': None, 'login_count': 0
+        }
+        # Accounts the runner logs in with stay active
+        if i < 100:
+            user['is_active'] = True
+        user.update(search_fields(user['full_name'], user['email'], user['phone']))
+        yield user
+
+def _products(rng, count, now):
+    for i in range(count):
+        name = f'{rng.choice(STYLES).capitalize()} {rng.choice(FLOWERS).lower()} {rng.choice(COLORS)} #{i}'
+        description = f'{name} - {rng.choice(FLOWERS)} tươi, giao nhanh trong ngày. ' * rng.randint(2, 6)
+        created = _created_at(rng, now)
+        product = {
+            'name': name, 'description': description, 'price': float(rng.randrange(150, 3000) * 1000),
+            'category': rng.choice(CATEGORIES), 'images': [f'https://picsum.photos/seed/p{i}/600/600'],
+            'is_active': rng.random() > 0.1, 'created_at': created, 'updated_at': created
+        }
+        product.update(search_fields(product['name'], product['description']))
+        yield product
+
+def _blogs(rng, count, now):
+    for i in range(count):
+        title = f'Ý nghĩa {rng.choice(FLOWERS).lower()} {rng.choice(COLORS)} ({i})'
+        content = f'<p>{title}. Cách chọn và chăm sóc hoa cho từng dịp.</p>' * rng.randint(10, 40)
+        created = _created_at(rng, now)
+        tags = rng.sample(CATEGORIES, 2)
+        blog = {
+            'title': title, 'slug': slugify(title), 'content': content, 'image': f'https://picsum.photos/seed/b{i}/800/450',
+            'author': 'N07.floral', 'status': 'published' if rng.random() > 0.2 else 'draft', 'tags': tags,
+            'is_featured': rng.random() < 0.05, 'created_at': created, 'updated_at': created
+        }
+        rendered = render_content(content)
+        blog['excerpt'] = rendered.pop('text_excerpt')
+        blog.update(rendered)
+        blog.update(search_fields(blog['title'], blog['excerpt'], blog['content'], blog['tags']))
+        yield blog
+
+def _orders(rng, count, customers, now):
+    for i in range(count):
+        customer_id, name, phone = rng.choice(customers)
+        yield {
+            'order_number': f'DH{i + 1:06d}', 'customer_name': name, 'customer_phone': phone, 'customer_id': customer_id,
+            'total_amount': float(rng.randrange(150, 5000) * 1000), 'status': rng.choice(STATUSES),
+            'payment_method': rng.choice(['cod', 'bank_transfer', 'momo']), 'created_at': _created_at(rng, now, 180)
+        }
+
+def seed(db, users=VOLUMES['users'], products=VOLUMES['products'], blogs=VOLUMES['blogs'], orders=VOLUMES['orders'],
+         rounds=12, seed_value=7):
+    """Drop and refill `db` with generated data; returns {collection: count}.
+
+    Documents are bulk inserted in the shape the models write (search tokens
+    included). Every account shares one password hashed once at `rounds`, so
+    seeding stays fast while logins still pay the real bcrypt cost. Indexes are
+    built and the dashboard rollup and analytics buckets recomputed afterwards,
+    as on a live database.
+    """
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    for name in ('users', 'products', 'blogs', 'orders', 'carts', 'counters', 'stats_rollup', ActivityEvents.COLLECTION,
+                 OrderAnalytics.COLLECTION):
+        db.drop_collection(name)
+
+    password_hash = PasswordHasher(rounds=rounds, workers=0).hash(PASSWORD)
+    admin = {
+        'full_name': 'Load Test Admin', 'email': ADMIN_EMAIL, 'phone': '0900000000', 'password_hash': password_hash,
+        'role': 'admin', 'is_active': True, 'email_verified': True, 'phone_verified': False,
+        'created_at': now, 'updated_at': now, 'last_login': None, 'login_count': 0
+    }
+    admin.update(search_fields(admin['full_name'], admin['email'], admin['phone']))
+    db.users.insert_one(admin)
+
+    customers = []
+    for batch in _batches(_users(rng, users, password_hash, now)):
+        result = db.users.insert_many(batch, ordered=False)
+        customers.extend((str(_id), doc['full_name'], doc['phone']) for _id, doc in zip(result.inserted_ids, batch))
+    for batch in _batches(_products(rng, products, now)):
+        db.products.insert_many(batch, ordered=False)
+    for batch in _batches(_blogs(rng, blogs, now)):
+        db.blogs.insert_many(batch, ordered=False)
+    customers = customers or [(str(ObjectId()), 'Khách vãng lai', '0911111111')]
+    for batch in _batches(_orders(rng, orders, customers, now)):
+        db.orders.insert_many(batch, ordered=False)
+
+    ActivityEvents(db).ensure_capped()
+    ensure_indexes(db, index_registry())
+    StatsRollup(db).recompute()
+    OrderAnalytics(db).rebuild()
+    return {name: db[name].estimated_document_count() for name in ('users', 'products', 'blogs', 'orders')}
@@ -2,6 +2,13 @@ from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime, timedelta
 from modules.auth.routes.auth import token_required
 from bson.objectid import ObjectId
+from shared.utils.pagination import parse_limit, parse_date, keyset_page, cached_count, cursor_pagination, wants_total
+from shared.utils.search import ranked_search, SEARCH_PROJECTION
+from shared.decorators.cache import response_cache
+from shared.utils.helpers import log_user_activity, get_client_ip
+from shared.utils.export import EXPORT_FORMATS, export_response
+from modules.stats.models.analytics import GRANULARITIES
+from core.config.config import Config
 import logging
 
 admin_bp = Blueprint('admin', __name__)
@@ -22,60 +29,142 @@ def admin_required(f):
 @admin_required
 def get_dashboard_stats(current_user):
     try:
-        user_model, order_model = get_model('user'), get_model('order')
-        total_users = user_model.collection.count_documents({})
-        admin_count = user_model.collection.count_documents({'role': 'admin'})
-        active_users = user_model.collection.count_documents({'is_active': True})
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_registrations = user_model.collection.count_documents({'created_at': {'$gte': today}})
-        week_ago = datetime.now() - timedelta(days=7)
-        recent_logins = user_model.collection.count_documents({'last_login': {'$gte': week_ago}})
-        revenue = next(order_model.collection.aggregate([
-            {"$match": {"status": "completed"}},
-            {"$group": {"_id": None, "total": {"$sum": "$total_amount"}}}
-        ]), {}).get('total', 0)
-        pending_revenue = next(order_model.collection.aggregate([
-            {"$match": {"status": "pending"}},
-            {"$group": {"_id": None, "total": {"$sum": "$total_amount"}}}
-        ]), {}).get('total', 0)
-        return jsonify({'success': True, 'data': {
-                'total_users': total_users,
-                'admin_users': admin_count,
-                'active_users': active_users,
-                'today_registrations': today_registrations,
-                'recent_logins': recent_logins,
-                'revenue': revenue,
-                'pending_revenue': pending_revenue,
-            'growth': {'users_growth': 25, 'activity_growth': 12, 'registrations_growth': 100}
-        }})
+        # Đọc từ stats_rollup (cập nhật dần khi có user/đơn hàng mới)
+        return jsonify({'success': True, 'data': get_model('stats').get_dashboard()})
     except Exception as e:
         logging.error(f"Dashboard stats error: {str(e)}")
         return jsonify({'success': False, 'message': 'Lỗi khi lấy thống kê dashboard'}), 500
 
+def analytics_range(granularity, date_from, date_to, today):
+    """[start, end) theo giờ địa phương; mặc định 30 ngày, 12 tuần hoặc 12 tháng gần nhất (tính cả kỳ hiện tại)"""
+    end = (date_to or today).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    if date_from:
+        return date_from.replace(hour=0, minute=0, second=0, microsecond=0), end
+    last = end - timedelta(days=1)
+    if granularity == 'day':
+        return last - timedelta(days=29), end
+    if granularity == 'week':
+        return last - timedelta(days=last.weekday() + 7 * 11), end
+    months = last.year * 12 + last.month - 1 - 11
+    return datetime(months // 12, months % 12 + 1, 1), end
+
+@admin_bp.route('/analytics', methods=['GET'])
+@admin_required
+def get_analytics(current_user):
+    """Doanh thu, số đơn và giá trị đơn trung bình theo ngày/tuần/tháng: ?granularity=&date_from=&date_to=&utc_offset=
+
+    Đọc từ order_buckets (gộp theo giờ, cập nhật dần khi tạo/đổi trạng thái đơn hàng).
+    """
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        return jsonify({'success': False, 'message': 'granularity phải là day, week hoặc month'}), 400
+    try:
+        utc_offset = int(request.args.get('utc_offset', Config.ANALYTICS_UTC_OFFSET))
+        if not -12 <= utc_offset <= 14:
+            raise ValueError(utc_offset)
+        start, end = analytics_range(granularity, parse_date(request.args.get('date_from')),
+                                     parse_date(request.args.get('date_to')),
+                                     datetime.utcnow() + timedelta(hours=utc_offset))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Tham số không hợp lệ'}), 400
+    if start >= end or (end - start).days > Config.ANALYTICS_MAX_DAYS:
+        return jsonify({'success': False, 'message': f'Khoảng thời gian phải từ 1 đến {Config.ANALYTICS_MAX_DAYS} ngày'}), 400
+    try:
+        shift = timedelta(hours=utc_offset)
+        result = get_model('analytics').series(granularity, start - shift, end - shift, utc_offset)
+        return jsonify({'success': True, 'data': {
+            'granularity': granularity,
+            'utc_offset': utc_offset,
+            'from': start.date().isoformat(),
+            'to': (end - timedelta(days=1)).date().isoformat(),
+            **result
+        }})
+    except Exception as e:
+        logging.error(f"Analytics error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Lỗi khi lấy số liệu doanh thu'}), 500
+
+# How each activity_log action is shown on the dashboard: description, icon, color
+ACTIVITY_DISPLAY = {
+    'register': ('đã đăng ký tài khoản mới', 'UserPlus', 'text-blue-600'),
+    'login': ('đã đăng nhập vào hệ thống', 'LogIn', 'text-green-600'),
+    'order_created': ('đã đặt đơn hàng mới', 'ShoppingCart', 'text-purple-600'),
+    'order_status_changed': ('đã cập nhật trạng thái đơn hàng', 'Package', 'text-orange-600'),
+    'user_status_changed': ('đã thay đổi trạng thái tài khoản', 'UserCog', 'text-yellow-600'),
+    'user_deleted': ('đã xóa tài khoản', 'UserMinus', 'text-red-600'),
+    'orders_bulk_status_changed': ('đã cập nhật trạng thái nhiều đơn hàng', 'PackageCheck', 'text-orange-600'),
+    'products_imported': ('đã nhập sản phẩm hàng loạt', 'Upload', 'text-indigo-600'),
+    'data_exported': ('đã xuất dữ liệu', 'Download', 'text-gray-600')
+}
+
+def format_activity(event):
+    description, icon, color = ACTIVITY_DISPLAY.get(event.get('action'), (event.get('action', ''), 'Activity', 'text-gray-600'))
+    return {'id': str(event['_id']), 'type': event.get('action'), 'user': event.get('user_name') or '',
+        'description': description, 'details': event.get('details'),
+        'timestamp': event['timestamp'].isoformat() if event.get('timestamp') else None,
+        'icon': icon, 'iconColor': color}
+
 @admin_bp.route('/recent-activity', methods=['GET'])
 @admin_required
 def get_recent_activity(current_user):
+    """Hoạt động gần đây từ activity_log (một truy vấn theo index timestamp)"""
     try:
-        user_model = get_model('user')
-        recent_users = list(user_model.collection.find({}, {
-            'full_name': 1, 'email': 1, 'role': 1, 'created_at': 1, 'last_login': 1, 'login_count': 1
-        }).sort('created_at', -1).limit(10))
-        activities = []
-        for user in recent_users:
-            activities.append({'id': str(user['_id']) + '_register', 'type': 'register', 'user': user['full_name'],
-                'description': 'đã đăng ký tài khoản mới', 'timestamp': user.get('created_at').isoformat() if user.get('created_at') else None,
-                'icon': 'UserPlus', 'iconColor': 'text-blue-600'})
-            if user.get('last_login'):
-                activities.append({'id': str(user['_id']) + '_login', 'type': 'login', 'user': user['full_name'],
-                    'description': 'đã đăng nhập vào hệ thống', 'timestamp': user['last_login'].isoformat(),
-                    'icon': 'LogIn', 'iconColor': 'text-green-600'})
-        activities.sort(key=lambda x: x['timestamp'] or '', reverse=True)
-        return jsonify({'success': True, 'data': activities[:15]})
+        limit = parse_limit(request.args.get('limit'), 15)
+        events = get_model('activity').recent(limit, request.args.get('type') or None)
+        return jsonify({'success': True, 'data': [format_activity(event) for event in events]})
     except Exception as e:
         logging.error(f"Recent activity error: {str(e)}")
         return jsonify({'success': False, 'message': 'Lỗi khi lấy hoạt động gần đây'}), 500
 
+@admin_bp.route('/cache-stats', methods=['GET'])
+@admin_required
+def get_cache_stats(current_user):
+    """Thống kê hit/miss của cache trong process hiện tại"""
+    return jsonify({'success': True, 'data': {
+        'user_cache': get_model('user').session_cache.stats(),
+        'response_cache': response_cache.stats()
+    }})
+
+@admin_bp.route('/pool-stats', methods=['GET'])
+@admin_required
+def get_pool_stats(current_user):
+    """Connection pool của MongoDB trong process hiện tại: thời gian checkout, hàng đợi, kết nối đang dùng"""
+    options = current_app.mongo_client.options.pool_options
+    return jsonify({'success': True, 'data': {
+        'max_pool_size': options.max_pool_size,
+        'min_pool_size': options.min_pool_size,
+        'wait_queue_timeout': options.wait_queue_timeout,
+        'servers': current_app.pool_metrics.stats()
+    }})
+
 # Users Management
+USER_LIST_PROJECTION = {'password_hash': 0, **SEARCH_PROJECTION}
+
+def format_user(user):
+    return {
+        'id': str(user['_id']),
+        'full_name': user.get('full_name', ''),
+        'email': user.get('email', ''),
+        'phone': user.get('phone', ''),
+        'role': user.get('role', 'user'),
+        'is_active': user.get('is_active', True),
+        'created_at': user.get('created_at'),
+        'last_login': user.get('last_login'),
+        'login_count': user.get('login_count', 0)
+    }
+
+USER_EXPORT_COLUMNS = ('id', 'full_name', 'email', 'phone', 'role', 'is_active', 'created_at', 'last_login', 'login_count')
+
+def build_user_query(user_model, search='', role='', status=''):
+    """Filter user theo từ khóa, role và trạng thái (active/inactive)"""
+    filter_query = {}
+    if search:
+        filter_query.update(user_model.search_query(search))
+    if role:
+        filter_query['role'] = role
+    if status:
+        filter_query['is_active'] = status == 'active'
+    return filter_query
+
 @admin_bp.route('/users', methods=['GET'])
 @admin_required
 def get_users(current_user):
@@ -90,57 +179,47 @@ def get_users(current_user):
         role_filter = request.args.get('role', '')
         status_filter = request.args.get('status', '')
         
-        # Tạo filter query
-        filter_query = {}
-        
-        if search:
-            filter_query['$or'] = [
-                {'full_name': {'$regex': search, '$options': 'i'}},
-                {'email': {'$regex': search, '$options': 'i'}},
-                {'phone': {'$regex': search, '$options': 'i'}}
-            ]
+        filter_query = build_user_query(user_model, search, role_filter, status_filter)
         
-        if role_filter:
-            filter_query['role'] = role_filter
-            
-        if status_filter:
-            filter_query['is_active'] = status_filter == 'active'
+        # Chế độ cursor: ?cursor= (rỗng) cho trang đầu, sau đó dùng next_cursor
+        if 'cursor' in request.args:
+            try:
+                users, next_cursor = keyset_page(user_model.collection, filter_query, parse_limit(per_page),
+                                                 request.args.get('cursor') or None, projection=USER_LIST_PROJECTION)
+            except ValueError:
+                return jsonify({'success': False, 'message': 'Cursor không hợp lệ'}), 400
+            total = cached_count(user_model.collection, filter_query) if wants_total(request.args, False) else None
+            return jsonify({
+                'success': True,
+                'data': {
+                    'users': [format_user(user) for user in users],
+                    'pagination': cursor_pagination(parse_limit(per_page), next_cursor, total)
+                }
+            })
         
         # Đếm tổng số
-        total = user_model.collection.count_documents(filter_query)
+        total = cached_count(user_model.collection, filter_query) if wants_total(request.args, True) else None
         
         # Lấy users với phân trang
         skip = (page - 1) * per_page
-        users = list(user_model.collection.find(
-            filter_query,
-            {'password_hash': 0}  # Không trả về password_hash
-        ).skip(skip).limit(per_page).sort('created_at', -1))
+        if search:
+            # Sắp xếp theo mức độ liên quan khi có từ khóa tìm kiếm
+            users = ranked_search(user_model.collection, filter_query, search, skip, per_page, USER_LIST_PROJECTION)
+        else:
+            users = list(user_model.collection.find(
+                filter_query,
+                USER_LIST_PROJECTION  # Không trả về password_hash
+            ).skip(skip).limit(per_page).sort('created_at', -1))
         
-        # Format dữ liệu
-        formatted_users = []
-        for user in users:
-            formatted_users.append({
-                'id': str(user['_id']),
-                'full_name': user.get('full_name', ''),
-                'email': user.get('email', ''),
-                'phone': user.get('phone', ''),
-                'role': user.get('role', 'user'),
-                'is_active': user.get('is_active', True),
-                'created_at': user.get('created_at').isoformat() if user.get('created_at') else None,
-                'last_login': user.get('last_login').isoformat() if user.get('last_login') else None,
-                'login_count': user.get('login_count', 0)
-            })
+        pagination = {'current_page': page, 'per_page': per_page}
+        if total is not None:
+            pagination.update({'total': total, 'total_pages': (total + per_page - 1) // per_page})
         
         return jsonify({
             'success': True,
             'data': {
-                'users': formatted_users,
-                'pagination': {
-                    'current_page': page,
-                    'per_page': per_page,
-                    'total': total,
-                    'total_pages': (total + per_page - 1) // per_page
-                }
+                'users': [format_user(user) for user in users],
+                'pagination': pagination
             }
         })
         
@@ -151,6 +230,27 @@ def get_users(current_user):
             'message': 'Lỗi khi lấy danh sách users'
         }), 500
 
+@admin_bp.route('/users/export', methods=['GET'])
+@admin_required
+def export_users(current_user):
+    """Xuất toàn bộ users (NDJSON hoặc CSV) theo dạng stream: ?format=&search=&role=&status=&date_from=&date_to="""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'message': 'format phải là csv hoặc ndjson'}), 400
+    try:
+        date_from = parse_date(request.args.get('date_from'))
+        date_to = parse_date(request.args.get('date_to'), end_of_day=True)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Tham số không hợp lệ'}), 400
+    user_model = get_model('user')
+    filter_query = build_user_query(user_model, request.args.get('search', ''), request.args.get('role', ''), request.args.get('status', ''))
+    if date_from or date_to:
+        filter_query['created_at'] = {key: value for key, value in (('$gte', date_from), ('$lte', date_to)) if value}
+    log_user_activity(current_user['_id'], 'data_exported', {'export': 'users', 'format': fmt, **request.args.to_dict()},
+                      get_client_ip(request), current_user.get('full_name'))
+    cursor = user_model.collection.find(filter_query, USER_LIST_PROJECTION).sort([('created_at', -1), ('_id', -1)]).batch_size(Config.EXPORT_BATCH_SIZE)
+    return export_response((format_user(user) for user in cursor), fmt, USER_EXPORT_COLUMNS, 'users')
+
 # Toggle User Status
 @admin_bp.route('/users/<user_id>/status', methods=['PUT'])
 @admin_required
@@ -186,7 +286,12 @@ def toggle_user_status(current_user, user_id):
             }
         )
         
+        user_model.invalidate_cached_user(user_id)
+        
         if result.modified_count:
+            user_model.stats.user_active_changed(new_status)
+            log_user_activity(current_user['_id'], 'user_status_changed', {'user_id': user_id, 'is_active': new_status},
+                              get_client_ip(request), current_user.get('full_name'))
             return jsonify({
                 'success': True,
                 'message': f'Đã {"kích hoạt" if new_status else "vô hiệu hóa"} user',
@@ -235,8 +340,12 @@ def delete_user(current_user, user_id):
             }), 400
         
         result = user_model.collection.delete_one({'_id': ObjectId(user_id)})
+        user_model.invalidate_cached_user(user_id)
         
         if result.deleted_count:
+            user_model.stats.user_removed(user)
+            log_user_activity(current_user['_id'], 'user_deleted', {'user_id': user_id, 'email': user.get('email')},
+                              get_client_ip(request), current_user.get('full_name'))
             return jsonify({
                 'success': True,
                 'message': 'Đã xóa user thành công'
@@ -270,17 +379,7 @@ def get_user_detail(current_user, user_id):
             }), 404
         
         # Format dữ liệu (loại bỏ password)
-        user_data = {
-            'id': str(user['_id']),
-            'full_name': user.get('full_name', ''),
-            'email': user.get('email', ''),
-            'phone': user.get('phone', ''),
-            'role': user.get('role', 'user'),
-            'is_active': user.get('is_active', True),
-            'created_at': user.get('created_at').isoformat() if user.get('created_at') else None,
-            'last_login': user.get('last_login').isoformat() if user.get('last_login') else None,
-            'login_count': user.get('login_count', 0)
-        }
+        user_data = format_user(user)
         
         return jsonify({
             'success': True,
@@ -295,17 +394,54 @@ def get_user_detail(current_user, user_id):
         }), 500
 
 # Orders Management
+ORDER_STATUSES = ("pending", "processing", "completed", "cancelled")
+
+def parse_order_filters(args):
+    """Đọc tham số phân trang cursor và filter đơn hàng từ query string"""
+    return {
+        "limit": parse_limit(args.get("limit")),
+        "cursor": args.get("cursor") or None,
+        "status": args.get("status") or None,
+        "date_from": parse_date(args.get("date_from")),
+        "date_to": parse_date(args.get("date_to"), end_of_day=True)
+    }
+
 @admin_bp.route("/orders", methods=["GET"])
 @admin_required
 def get_orders(current_user):
-    """Lấy danh sách đơn hàng"""
+    """Lấy danh sách đơn hàng (phân trang theo cursor)"""
+    try:
+        filters = parse_order_filters(request.args)
+    except ValueError:
+        return jsonify({"success": False, "message": "Tham số không hợp lệ"}), 400
     try:
         order_model = get_model('order')
-        orders = order_model.get_all_orders()
-        return jsonify({"success": True, "data": {"orders": orders}})
+        result = order_model.get_all_orders(**filters)
+        return jsonify({"success": True, "data": result})
+    except ValueError:
+        return jsonify({"success": False, "message": "Cursor không hợp lệ"}), 400
     except Exception as e:
         return jsonify({"success": False, "message": "Lỗi khi lấy đơn hàng"}), 500
 
+ORDER_EXPORT_COLUMNS = ("id", "order_number", "created_at", "status", "total_amount", "payment_method",
+                        "customer_id", "user_full_name", "user_phone", "user_email", "updated_at")
+
+@admin_bp.route("/orders/export", methods=["GET"])
+@admin_required
+def export_orders(current_user):
+    """Xuất đơn hàng (NDJSON hoặc CSV) theo dạng stream: ?format=&status=&date_from=&date_to="""
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"success": False, "message": "format phải là csv hoặc ndjson"}), 400
+    try:
+        filters = parse_order_filters(request.args)
+    except ValueError:
+        return jsonify({"success": False, "message": "Tham số không hợp lệ"}), 400
+    log_user_activity(current_user['_id'], 'data_exported', {'export': 'orders', 'format': fmt, **request.args.to_dict()},
+                      get_client_ip(request), current_user.get('full_name'))
+    orders = get_model('order').export_orders(filters["status"], filters["date_from"], filters["date_to"], Config.EXPORT_BATCH_SIZE)
+    return export_response(orders, fmt, ORDER_EXPORT_COLUMNS, "orders")
+
 @admin_bp.route("/orders", methods=["POST"])
 @token_required
 def create_order(current_user):
@@ -318,6 +454,8 @@ def create_order(current_user):
         data["customer_phone"] = current_user.get("phone", "")
         data["customer_id"] = str(current_user["_id"])
         order_id = order_model.create_order(data)
+        log_user_activity(current_user['_id'], 'order_created', {'order_id': order_id, 'total_amount': data.get('total_amount', 0)},
+                          get_client_ip(request), data["customer_name"])
         return jsonify({"success": True, "message": "Đơn hàng đã được tạo", "order_id": order_id})
     except Exception as e:
         return jsonify({"success": False, "message": "Lỗi khi tạo đơn hàng"}), 500
@@ -326,17 +464,17 @@ def create_order(current_user):
 @token_required
 def get_my_orders(current_user):
     """Lấy danh sách đơn hàng của chính user đang đăng nhập"""
+    try:
+        filters = parse_order_filters(request.args)
+    except ValueError:
+        return jsonify({"success": False, "message": "Tham số không hợp lệ"}), 400
     try:
         order_model = get_model('order')
-        user_id = str(current_user['_id'])
         # Lấy các đơn hàng có customer_id là user hiện tại
-        orders = list(order_model.collection.find({"customer_id": user_id}).sort("created_at", -1))
-        for order in orders:
-            order["id"] = str(order["_id"])
-            del order["_id"]
-            # Đảm bảo luôn trả về trường items (danh sách sản phẩm)
-            order["items"] = order.get("items", [])
-        return jsonify({"success": True, "data": {"orders": orders}})
+        result = order_model.get_customer_orders(str(current_user['_id']), **filters)
+        return jsonify({"success": True, "data": result})
+    except ValueError:
+        return jsonify({"success": False, "message": "Cursor không hợp lệ"}), 400
     except Exception as e:
         return jsonify({"success": False, "message": "Lỗi khi lấy đơn hàng"}), 500
 
@@ -347,13 +485,55 @@ def update_order_status(current_user, order_id):
     try:
         data = request.get_json()
         new_status = data.get("status")
-        if new_status not in ["pending", "processing", "completed", "cancelled"]:
+        if new_status not in ORDER_STATUSES:
             return jsonify({"success": False, "message": "Trạng thái không hợp lệ"}), 400
         order_model = get_model('order')
         success = order_model.update_order_status(order_id, new_status)
         if success:
+            log_user_activity(current_user['_id'], 'order_status_changed', {'order_id': order_id, 'status': new_status},
+                              get_client_ip(request), current_user.get('full_name'))
             return jsonify({"success": True, "message": "Cập nhật trạng thái đơn hàng thành công"})
         else:
             return jsonify({"success": False, "message": "Không tìm thấy đơn hàng hoặc không cập nhật được"}), 404
     except Exception as e:
         return jsonify({"success": False, "message": "Lỗi khi cập nhật trạng thái đơn hàng"}), 500
+
+@admin_bp.route("/orders/bulk-status", methods=["POST"])
+@admin_required
+def bulk_update_order_status(current_user):
+    """Cập nhật trạng thái nhiều đơn hàng: {"status", "ids": [...]} hoặc {"status", "filter": {status, date_from, date_to}}"""
+    data = request.get_json(silent=True) or {}
+    new_status, from_status = data.get("status"), data.get("from_status") or None
+    ids, filters = data.get("ids"), data.get("filter")
+    if new_status not in ORDER_STATUSES or (from_status and from_status not in ORDER_STATUSES):
+        return jsonify({"success": False, "message": "Trạng thái không hợp lệ"}), 400
+    if (ids is None) == (filters is None):
+        return jsonify({"success": False, "message": "Cần đúng một trong hai: ids hoặc filter"}), 400
+    try:
+        if ids is not None:
+            if not isinstance(ids, list) or len(ids) > Config.BULK_MAX_ROWS:
+                return jsonify({"success": False, "message": f"ids phải là danh sách tối đa {Config.BULK_MAX_ROWS} phần tử"}), 400
+            query = None
+        else:
+            if not isinstance(filters, dict):
+                return jsonify({"success": False, "message": "filter không hợp lệ"}), 400
+            query = get_model('order').build_query(
+                status=filters.get("status") or None,
+                date_from=parse_date(filters.get("date_from")),
+                date_to=parse_date(filters.get("date_to"), end_of_day=True))
+            # An empty filter would move every order in the shop
+            if not query and not from_status:
+                return jsonify({"success": False, "message": "filter không được để trống"}), 400
+    except ValueError:
+        return jsonify({"success": False, "message": "Tham số không hợp lệ"}), 400
+    try:
+        result = get_model('order').bulk_update_status(new_status, ids, query, from_status,
+                                                       Config.BULK_BATCH_SIZE, Config.BULK_MAX_ERRORS)
+        if result["updated"]:
+            log_user_activity(current_user['_id'], 'orders_bulk_status_changed',
+                              {'status': new_status, 'updated': result["updated"]},
+                              get_client_ip(request), current_user.get('full_name'))
+        return jsonify({"success": True, "data": result})
+    except Exception as e:
+        logging.error(f"Bulk order status error: {str(e)}")
+        return jsonify({"success": False, "message": "Lỗi khi cập nhật trạng thái đơn hàng"}), 500
@@ -3,6 +3,9 @@ import jwt
 from datetime import datetime, timedelta
 from core.config.config import Config
 from functools import wraps
+from shared.utils.passwords import PasswordHasherBusy
+from shared.utils.helpers import log_user_activity, get_client_ip
+from shared.decorators.ratelimit import rate_limited, client_ip, json_email, current_user_id
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -21,7 +24,7 @@ def token_required(f):
             return jsonify({'message': 'Token không được cung cấp'}), 401
         try:
             data = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=['HS256'])
-            current_user = get_model('user').find_by_id(data['user_id'])
+            current_user = get_model('user').find_session_user(data['user_id'])
             if not current_user or not current_user.get('is_active'):
                 return jsonify({'message': 'Tài khoản không tồn tại hoặc đã bị khóa'}), 401
         except jwt.ExpiredSignatureError:
@@ -31,6 +34,10 @@ def token_required(f):
         return f(current_user, *args, **kwargs)
     return decorated
 
+def busy_response():
+    """Trả về 503 khi hàng đợi băm mật khẩu đã đầy"""
+    return jsonify({'message': 'Hệ thống đang bận, vui lòng thử lại sau', 'success': False}), 503, {'Retry-After': '1'}
+
 def create_tokens(user_id, email, role):
     access_token = jwt.encode({
         'user_id': user_id,
@@ -47,6 +54,7 @@ def create_tokens(user_id, email, role):
     return access_token, refresh_token
 
 @auth_bp.route('/api/auth/register', methods=['POST'])
+@rate_limited(('register_ip', client_ip))
 def register():
     data = request.get_json()
     if not data:
@@ -61,14 +69,18 @@ def register():
         return jsonify({'message': 'Mật khẩu phải có ít nhất 6 ký tự'}), 400
     try:
         user_id = get_model('user').create_user(data)
+        log_user_activity(user_id, 'register', ip_address=get_client_ip(request), user_name=data['full_name'].strip())
         return jsonify({'message': f'Tài khoản {data["full_name"]} đã được tạo thành công!', 'user_id': user_id, 'success': True}), 201
     except ValueError as e:
         return jsonify({'message': str(e), 'success': False}), 400
+    except PasswordHasherBusy:
+        return busy_response()
     except Exception as e:
         current_app.logger.error(f'Register error: {str(e)}')
         return jsonify({'message': 'Có lỗi xảy ra khi tạo tài khoản.', 'success': False}), 500
 
 @auth_bp.route('/api/auth/login', methods=['POST'])
+@rate_limited(('login_ip', client_ip), ('login_account', json_email))
 def login():
     data = request.get_json()
     if not data:
@@ -79,14 +91,19 @@ def login():
     user = get_model('user').find_by_email(email)
     if not user or not user.get('is_active', True):
         return jsonify({'message': 'Invalid email or password'}), 401
-    if not get_model('user').verify_password(password, user['password_hash']):
-        return jsonify({'message': 'Invalid email or password'}), 401
+    try:
+        if not get_model('user').verify_password(password, user['password_hash']):
+            return jsonify({'message': 'Invalid email or password'}), 401
+        get_model('user').rehash_if_needed(str(user['_id']), password, user['password_hash'])
+    except PasswordHasherBusy:
+        return busy_response()
     get_model('user').update_last_login(str(user['_id']))
+    log_user_activity(user['_id'], 'login', ip_address=get_client_ip(request), user_name=user['full_name'])
     access_token, refresh_token = create_tokens(str(user['_id']), user['email'], user['role'])
     user_data = {k: user[k] for k in ['full_name', 'email', 'phone', 'role', 'is_active']}
     user_data['id'] = str(user['_id'])
-    user_data['created_at'] = user.get('created_at').isoformat() if user.get('created_at') else None
-    user_data['last_login'] = user.get('last_login').isoformat() if user.get('last_login') else None
+    user_data['created_at'] = user.get('created_at')
+    user_data['last_login'] = user.get('last_login')
     user_data['login_count'] = user.get('login_count', 0)
     return jsonify({'message': f'Welcome {user["full_name"]}!', 'access_token': access_token, 'refresh_token': refresh_token, 'user': user_data, 'success': True})
 
@@ -98,7 +115,9 @@ def verify_token(current_user):
     return jsonify({'message': 'Token hợp lệ', 'user': user_data})
 
 @auth_bp.route('/api/auth/change-password', methods=['POST'])
+@rate_limited(('change_password_ip', client_ip))
 @token_required
+@rate_limited(('change_password_account', current_user_id))
 def change_password(current_user):
     """Change user password"""
     try:
@@ -119,8 +138,9 @@ def change_password(current_user):
         # Get user model
         user_model = get_model('user')
         
-        # Verify current password
-        if not user_model.verify_password(current_password, current_user['password_hash']):
+        # Verify current password (the cached session user has no password hash)
+        user = user_model.find_by_id(str(current_user['_id']))
+        if not user or not user_model.verify_password(current_password, user['password_hash']):
             return jsonify({'message': 'Mật khẩu hiện tại không đúng'}), 400
         
         # Change password
@@ -132,6 +152,8 @@ def change_password(current_user):
         else:
             return jsonify({'message': 'Có lỗi xảy ra khi đổi mật khẩu', 'success': False}), 500
             
+    except PasswordHasherBusy:
+        return busy_response()
     except Exception as e:
         current_app.logger.error(f'Change password error: {str(e)}')
         return jsonify({'message': 'Có lỗi xảy ra khi đổi mật khẩu', 'success': False}), 500
@@ -141,6 +163,10 @@ def change_password(current_user):
 def get_profile(current_user):
     """Get user profile information"""
     try:
+        current_user = get_model('user').find_by_id(str(current_user['_id']))
+        if not current_user:
+            return jsonify({'message': 'Tài khoản không tồn tại', 'success': False}), 404
+        
         user_data = {
             'id': str(current_user['_id']),
             'full_name': current_user['full_name'],
@@ -150,9 +176,9 @@ def get_profile(current_user):
             'is_active': current_user['is_active'],
             'email_verified': current_user.get('email_verified', False),
             'phone_verified': current_user.get('phone_verified', False),
-            'created_at': current_user['created_at'].isoformat() if current_user.get('created_at') else None,
-            'updated_at': current_user['updated_at'].isoformat() if current_user.get('updated_at') else None,
-            'last_login': current_user.get('last_login').isoformat() if current_user.get('last_login') else None,
+            'created_at': current_user.get('created_at'),
+            'updated_at': current_user.get('updated_at'),
+            'last_login': current_user.get('last_login'),
             'login_count': current_user.get('login_count', 0)
         }
         
@@ -206,6 +232,7 @@ def update_profile(current_user):
         return jsonify({'message': 'Có lỗi xảy ra khi cập nhật thông tin', 'success': False}), 500
 
 @auth_bp.route('/api/auth/refresh-token', methods=['POST'])
+@rate_limited(('refresh_token_ip', client_ip))
 def refresh_token():
     """Refresh access token using refresh token"""
     try:
@@ -0,0 +1,43 @@
+from shared.utils.aio import keyset_page, cached_count, ranked_search
+from shared.utils.search import SEARCH_PROJECTION
+from shared.utils.cache import TTLCache
+from .blog import Blog
+
+class AsyncBlog(Blog):
+    """Read API of Blog on a motor database (queries, views and responses are shared)"""
+    def __init__(self, db, read_preference=None, cache_size=128, cache_ttl=60):
+        # Reads follow MONGO_CATALOG_READ_PREFERENCE (primary unless configured), writes always go to the primary
+        self.collection = db.get_collection(self.COLLECTION, read_preference=read_preference)
+        self.detail_cache = TTLCache(cache_size, cache_ttl)
+    async def get_all_blogs(self, skip=0, limit=100, search="", status="", with_total=True, projection=None):
+        projection = projection or SEARCH_PROJECTION
+        query = self.build_query(search, status)
+        total = await cached_count(self.collection, query) if with_total else None
+        if search:
+            docs = await ranked_search(self.collection, query, search, skip, limit, projection)
+        else:
+            docs = await self.collection.find(query, projection).skip(skip).limit(limit).sort("created_at", -1).to_list(None)
+        return self._page_response(docs, skip, limit, total)
+    async def get_blogs_page(self, cursor=None, limit=20, search="", status="", with_total=False, projection=None):
+        """Keyset page sorted on (created_at, _id), newest first"""
+        query = self.build_query(search, status)
+        docs, next_cursor = await keyset_page(self.collection, query, limit, cursor, projection=projection or SEARCH_PROJECTION)
+        total = await cached_count(self.collection, query) if with_total else None
+        return self._cursor_response(docs, limit, next_cursor, total)
+    async def get_blog_by_id(self, blog_id, projection=None):
+        projection = projection or SEARCH_PROJECTION
+        cache_key = (blog_id, repr(projection))
+        blog = self.detail_cache.get(cache_key)
+        if blog is None:
+            blog = await self.collection.find_one(self.lookup(blog_id), projection)
+            if blog is None:
+                return {"success": False, "error": "Blog not found"}
+            blog["id"] = str(blog.pop("_id"))
+            self.detail_cache.set(cache_key, blog)
+        return {"success": True, "data": blog}
+    async def get_featured_blogs(self, limit=3, projection=None):
+        cursor = self.collection.find({"status": "published", "is_featured": True}, projection or SEARCH_PROJECTION).limit(limit).sort("created_at", -1)
+        return [{"id": str(b.pop("_id")), **b} async for b in cursor]
+    async def get_published_blogs(self, limit=10, projection=None):
+        cursor = self.collection.find({"status": "published"}, projection or SEARCH_PROJECTION).limit(limit).sort("created_at", -1)
+        return [{"id": str(b.pop("_id")), **b} async for b in cursor]
@@ -1,9 +1,50 @@
 from datetime import datetime
+import re
 from bson import ObjectId
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from shared.utils.pagination import keyset_page, cached_count, cursor_pagination
+from shared.utils.search import search_fields, build_search_query, ranked_search, SEARCH_PROJECTION, SEARCH_SORT, SEARCH_CANDIDATES
+from shared.utils.projections import resolve_projection
+from shared.utils.cache import TTLCache
+from shared.utils.richtext import render_content, slugify
+
+# Path segments /api/blogs/<slug> cannot use
+RESERVED_SLUGS = {"featured"}
 
 class Blog:
-    def __init__(self, db):
-        self.collection = db.blogs
+    FIELDS = ("title", "slug", "content", "content_html", "toc", "excerpt", "reading_time", "word_count", "image", "author",
+              "status", "tags", "is_featured", "created_at", "updated_at")
+    VIEWS = {
+        "card": {"title": 1, "slug": 1, "excerpt": 1, "reading_time": 1, "image": 1, "created_at": 1},
+        "list": {"title": 1, "slug": 1, "excerpt": 1, "reading_time": 1, "image": 1, "author": 1, "status": 1, "tags": 1, "is_featured": 1, "created_at": 1, "updated_at": 1},
+        # What the post page renders: pre-rendered HTML and table of contents, not the source content
+        "article": {"content": 0, **SEARCH_PROJECTION},
+        "detail": SEARCH_PROJECTION
+    }
+    COLLECTION = "blogs"
+    INDEXES = [
+        IndexModel([("created_at", -1), ("_id", -1)]),
+        IndexModel([("status", 1), ("created_at", -1), ("_id", -1)]),
+        IndexModel([("status", 1), ("is_featured", 1), ("created_at", -1)]),
+        IndexModel("search_tokens"),
+        # Posts from before slugs have none, they must not collide on null
+        IndexModel("slug", unique=True, partialFilterExpression={"slug": {"$type": "string"}})
+    ]
+    # Queries the routes run, explained by scripts/index_report.py: name -> (filter, sort[, limit])
+    QUERIES = {
+        "newest": ({}, [("created_at", -1), ("_id", -1)]),
+        "published": ({"status": "published"}, [("created_at", -1)]),
+        "featured": ({"status": "published", "is_featured": True}, [("created_at", -1)]),
+        "by_slug": ({"slug": "hoa-cuoi"}, None),
+        # Candidate window of ranked search, for a word matching most posts
+        "search": (build_search_query("hoa"), SEARCH_SORT, SEARCH_CANDIDATES)
+    }
+    def __init__(self, db, read_preference=None, cache_size=128, cache_ttl=60):
+        # Reads follow MONGO_CATALOG_READ_PREFERENCE (primary unless configured), writes always go to the primary
+        self.collection = db.get_collection(self.COLLECTION, read_preference=read_preference)
+        # Most read posts, per process: (id or slug, projection) -> post; cleared by this process's writes
+        self.detail_cache = TTLCache(cache_size, cache_ttl)
     def create_blog(self, data):
         blog = {
             "title": data.get("title"),
@@ -17,37 +58,99 @@ class Blog:
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
-        return str(self.collection.insert_one(blog).inserted_id)
-    def get_all_blogs(self, skip=0, limit=100, search="", status=""):
+        blog.update(self.rendered_fields(blog["content"], blog["excerpt"]))
+        blog.update(search_fields(blog["title"], blog["excerpt"], blog["content"], blog["tags"]))
+        base = slugify(data.get("slug") or blog["title"]) or "bai-viet"
+        for _ in range(5):
+            blog["slug"] = self.unique_slug(base)
+            try:
+                blog_id = str(self.collection.insert_one(blog).inserted_id)
+                break
+            except DuplicateKeyError:
+                # Another post took the slug between the check and the insert
+                blog.pop("_id", None)
+        else:
+            raise ValueError(f"Could not find a free slug for {base}")
+        self.detail_cache.clear()
+        return blog_id
+    def rendered_fields(self, content, excerpt=""):
+        """Content HTML, table of contents, reading time and excerpt, computed once per write"""
+        rendered = render_content(content)
+        text_excerpt = rendered.pop("text_excerpt")
+        rendered["excerpt"] = excerpt or text_excerpt
+        return rendered
+    def unique_slug(self, base, blog_id=None):
+        """`base`, or `base-2`, `base-3`... whichever no other post uses"""
+        if ObjectId.is_valid(base):
+            # Would be read as a post id by get_blog_by_id
+            base = f"{base}-bai-viet"
+        query = {"slug": {"$regex": f"^{re.escape(base)}(-[0-9]+)?$"}}
+        if blog_id:
+            query["_id"] = {"$ne": ObjectId(blog_id)}
+        taken = {doc["slug"] for doc in self.collection.find(query, {"slug": 1})} | RESERVED_SLUGS
+        slug, n = base, 2
+        while slug in taken:
+            slug, n = f"{base}-{n}", n + 1
+        return slug
+    def projection(self, view=None, fields=None, default="detail"):
+        """Projection for ?view=card|list|detail or ?fields=a,b, `default` without either (raises ValueError)"""
+        return resolve_projection(self.VIEWS, self.FIELDS, view, fields, default)
+    def build_query(self, search="", status=""):
         query = {}
         if search:
-            query["$or"] = [
-                {"title": {"$regex": search, "$options": "i"}},
-                {"content": {"$regex": search, "$options": "i"}},
-                {"excerpt": {"$regex": search, "$options": "i"}}
-            ]
+            query.update(build_search_query(search))
         if status:
             query["status"] = status
-        total = self.collection.count_documents(query)
-        blogs = [{**b, "id": str(b.pop("_id"))} for b in self.collection.find(query).skip(skip).limit(limit).sort("created_at", -1)]
+        return query
+    def get_all_blogs(self, skip=0, limit=100, search="", status="", with_total=True, projection=None):
+        projection = projection or SEARCH_PROJECTION
+        query = self.build_query(search, status)
+        total = cached_count(self.collection, query) if with_total else None
+        if search:
+            docs = ranked_search(self.collection, query, search, skip, limit, projection)
+        else:
+            docs = self.collection.find(query, projection).skip(skip).limit(limit).sort("created_at", -1)
+        return self._page_response(docs, skip, limit, total)
+    def get_blogs_page(self, cursor=None, limit=20, search="", status="", with_total=False, projection=None):
+        """Keyset page sorted on (created_at, _id), newest first"""
+        query = self.build_query(search, status)
+        docs, next_cursor = keyset_page(self.collection, query, limit, cursor, projection=projection or SEARCH_PROJECTION)
+        total = cached_count(self.collection, query) if with_total else None
+        return self._cursor_response(docs, limit, next_cursor, total)
+    def _page_response(self, docs, skip, limit, total=None):
+        pagination = {"current_page": skip // limit + 1, "per_page": limit}
+        if total is not None:
+            pagination.update({"total": total, "total_pages": (total + limit - 1) // limit})
         return {
             "success": True,
             "data": {
-                "blogs": blogs,
-                "pagination": {
-                    "current_page": skip // limit + 1,
-                    "per_page": limit,
-                    "total": total,
-                    "total_pages": (total + limit - 1) // limit
-                }
+                "blogs": [{"id": str(b.pop("_id")), **b} for b in docs],
+                "pagination": pagination
             }
         }
-    def get_blog_by_id(self, blog_id):
-        blog = self.collection.find_one({"_id": ObjectId(blog_id)})
-        if blog:
+    def _cursor_response(self, docs, limit, next_cursor, total=None):
+        return {
+            "success": True,
+            "data": {
+                "blogs": [{"id": str(b.pop("_id")), **b} for b in docs],
+                "pagination": cursor_pagination(limit, next_cursor, total)
+            }
+        }
+    def lookup(self, key):
+        """Filter for a post id or slug"""
+        return {"_id": ObjectId(key)} if ObjectId.is_valid(key) else {"slug": key}
+    def get_blog_by_id(self, blog_id, projection=None):
+        """Post by id or slug: one indexed fetch, then served from the detail cache"""
+        projection = projection or SEARCH_PROJECTION
+        cache_key = (blog_id, repr(projection))
+        blog = self.detail_cache.get(cache_key)
+        if blog is None:
+            blog = self.collection.find_one(self.lookup(blog_id), projection)
+            if blog is None:
+                return {"success": False, "error": "Blog not found"}
             blog["id"] = str(blog.pop("_id"))
-            return {"success": True, "data": blog}
-        return {"success": False, "error": "Blog not found"}
+            self.detail_cache.set(cache_key, blog)
+        return {"success": True, "data": blog}
     def update_blog(self, blog_id, data):
         update_data = {
             "title": data.get("title"),
@@ -60,18 +163,32 @@ class Blog:
             "is_featured": data.get("is_featured", False),
             "updated_at": datetime.utcnow()
         }
-        result = self.collection.update_one({"_id": ObjectId(blog_id)}, {"$set": update_data})
-        if result.modified_count:
-            return {"success": True, "data": "Blog updated successfully"}
+        update_data.update(self.rendered_fields(update_data["content"], update_data["excerpt"]))
+        update_data.update(search_fields(update_data["title"], update_data["excerpt"], update_data["content"], update_data["tags"]))
+        current = self.collection.find_one({"_id": ObjectId(blog_id)}, {"slug": 1})
+        if current is None:
+            return {"success": False, "error": "Blog not found"}
+        # Slugs stay put when the title changes (links keep working) unless a new one is given
+        if data.get("slug") or not current.get("slug"):
+            update_data["slug"] = self.unique_slug(slugify(data.get("slug") or update_data["title"]) or "bai-viet", blog_id)
+        try:
+            blog = self.collection.find_one_and_update({"_id": ObjectId(blog_id)}, {"$set": update_data},
+                                                       projection={"slug": 1}, return_document=ReturnDocument.AFTER)
+        except DuplicateKeyError:
+            return {"success": False, "error": "Slug is already used by another blog"}
+        self.detail_cache.clear()
+        if blog:
+            return {"success": True, "data": "Blog updated successfully", "slug": blog.get("slug"), "previous_slug": current.get("slug")}
         return {"success": False, "error": "Blog not found"}
     def delete_blog(self, blog_id):
-        result = self.collection.delete_one({"_id": ObjectId(blog_id)})
-        if result.deleted_count:
-            return {"success": True, "data": "Blog deleted successfully"}
+        blog = self.collection.find_one_and_delete({"_id": ObjectId(blog_id)}, projection={"slug": 1})
+        self.detail_cache.clear()
+        if blog:
+            return {"success": True, "data": "Blog deleted successfully", "slug": blog.get("slug")}
         return {"success": False, "error": "Blog not found"}
-    def get_featured_blogs(self, limit=3):
-        blogs = [{**b, "id": str(b.pop("_id"))} for b in self.collection.find({"status": "published", "is_featured": True}).limit(limit).sort("created_at", -1)]
+    def get_featured_blogs(self, limit=3, projection=None):
+        blogs = [{"id": str(b.pop("_id")), **b} for b in self.collection.find({"status": "published", "is_featured": True}, projection or SEARCH_PROJECTION).limit(limit).sort("created_at", -1)]
         return blogs
-    def get_published_blogs(self, limit=10):
-        blogs = [{**b, "id": str(b.pop("_id"))} for b in self.collection.find({"status": "published"}).limit(limit).sort("created_at", -1)]
+    def get_published_blogs(self, limit=10, projection=None):
+        blogs = [{"id": str(b.pop("_id")), **b} for b in self.collection.find({"status": "published"}, projection or SEARCH_PROJECTION).limit(limit).sort("created_at", -1)]
         return blogs 
\ No newline at end of file
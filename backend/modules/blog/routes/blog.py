@@ -1,52 +1,103 @@
 from flask import Blueprint, request, jsonify, current_app
 from modules.auth.routes.admin import admin_required
+from shared.utils.pagination import parse_limit, wants_total
+from shared.decorators.cache import cached_response, response_cache
 
 blog_bp = Blueprint('blog', __name__)
 
 def get_model(name): return getattr(current_app, f"{name}_model")
 
 @blog_bp.route('/api/blogs', methods=['GET'])
+@cached_response('blogs:list')
 def get_blogs():
-    return jsonify(get_model('blog').get_all_blogs())
+    args = request.args
+    try:
+        projection = requested_projection(args, 'list')
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    if 'cursor' in args:
+        return get_blogs_page(args, projection)
+    return jsonify(get_model('blog').get_all_blogs(with_total=wants_total(args, True), projection=projection))
 
 @blog_bp.route('/api/blogs/<blog_id>', methods=['GET'])
+@cached_response('blogs:{blog_id}')
 def get_blog(blog_id):
-    return jsonify(get_model('blog').get_blog_by_id(blog_id))
+    """Bài viết theo id hoặc slug (?view=article: HTML đã render và mục lục, không kèm content gốc)"""
+    try:
+        projection = requested_projection(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    result = get_model('blog').get_blog_by_id(blog_id, projection)
+    # 404 is not cached: a slug looked up before its post exists must not stay "not found"
+    return jsonify(result), 200 if result["success"] else 404
 
 @blog_bp.route('/api/blogs/featured', methods=['GET'])
+@cached_response('blogs:list')
 def get_featured_blogs():
     """Lấy blog nổi bật cho trang chủ"""
     limit = int(request.args.get('limit', 3))
-    blogs = get_model('blog').get_featured_blogs(limit)
+    try:
+        projection = requested_projection(request.args, 'list')
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    blogs = get_model('blog').get_featured_blogs(limit, projection)
     return jsonify({
         "success": True,
         "data": blogs
     })
 
+def requested_projection(args, default='detail'):
+    """?view=card|list|detail or ?fields=a,b (`default` without either), raises ValueError for unknown names"""
+    return get_model('blog').projection(args.get('view'), args.get('fields'), default)
+
+def blog_tags(blog_id, result):
+    """Cache tags of a post: cached under its id and under its slugs (before and after the write)"""
+    return ['blogs:list', f'blogs:{blog_id}'] + [f'blogs:{result[key]}' for key in ('slug', 'previous_slug') if result.get(key)]
+
+def get_blogs_page(args, projection=None):
+    """Cursor mode: ?cursor= (empty) for the first page, then next_cursor"""
+    try:
+        return jsonify(get_model('blog').get_blogs_page(
+            args.get('cursor') or None, parse_limit(args.get('per_page'), 20), args.get('search', ''), args.get('status', ''), wants_total(args, False), projection))
+    except ValueError:
+        return jsonify({"success": False, "error": "Invalid cursor"}), 400
+
 # Admin endpoints
 @blog_bp.route('/api/admin/blogs', methods=['GET'])
 @admin_required
 def get_admin_blogs(current_user):
     """Lấy tất cả blog cho admin (bao gồm draft)"""
+    try:
+        projection = requested_projection(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    if 'cursor' in request.args:
+        return get_blogs_page(request.args, projection)
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 20))
     search = request.args.get('search', '')
     status = request.args.get('status', '')
     skip = (page - 1) * per_page
-    result = get_model('blog').get_all_blogs(skip, per_page, search, status)
+    result = get_model('blog').get_all_blogs(skip, per_page, search, status, wants_total(request.args, True), projection)
     return jsonify(result)
 
 @blog_bp.route('/api/admin/blogs', methods=['POST'])
 @admin_required
 def create_blog(current_user):
-    return jsonify(get_model('blog').create_blog(request.json))
+    result = get_model('blog').create_blog(request.json)
+    response_cache.invalidate('blogs:list')
+    return jsonify(result)
 
 @blog_bp.route('/api/admin/blogs/<blog_id>', methods=['PUT'])
 @admin_required
 def update_blog(current_user, blog_id):
-    return jsonify(get_model('blog').update_blog(blog_id, request.json))
+    result = get_model('blog').update_blog(blog_id, request.json)
+    response_cache.invalidate(*blog_tags(blog_id, result))
+    return jsonify(result)
 
 @blog_bp.route('/api/admin/blogs/<blog_id>', methods=['DELETE'])
 @admin_required
 def delete_blog(current_user, blog_id):
-    return jsonify(get_model('blog').delete_blog(blog_id)) 
\ No newline at end of file
+    result = get_model('blog').delete_blog(blog_id)
+    response_cache.invalidate(*blog_tags(blog_id, result))
+    return jsonify(result) 
\ No newline at end of file
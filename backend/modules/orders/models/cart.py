@@ -1,12 +1,127 @@
+from datetime import datetime
+from bson import ObjectId
+from pymongo import IndexModel
+from pymongo.errors import DuplicateKeyError
+
 class CartModel:
+    """One document per user: {user_id, items: [{product_id, quantity}], updated_at}.
+
+    Every item change is a single atomic update on that document, product names
+    and prices are not stored but joined from products when the cart is read.
+    """
+    COLLECTION = 'carts'
+    INDEXES = [IndexModel('user_id', unique=True)]
+    # Queries the routes run, explained by scripts/index_report.py: name -> (filter, sort)
+    QUERIES = {'by_user': ({'user_id': '000000000000000000000000'}, None)}
     def __init__(self, db):
-        self.collection = db.carts
+        self.collection = db[self.COLLECTION]
+        self.products = db.products
     def get_cart(self, user_id):
-        cart = self.collection.find_one({'user_id': user_id})
-        return cart or {'items': []}
+        """Items with current product name/price: the cart plus one $in query for its products"""
+        cart = self.collection.find_one({'user_id': user_id}, {'items': 1}) or {}
+        items = [item for item in map(self._normalize_item, cart.get('items', [])) if item]
+        ids = [ObjectId(item['product_id']) for item in items if ObjectId.is_valid(item['product_id'])]
+        products = {}
+        if ids:
+            fields = {'name': 1, 'price': 1, 'category': 1, 'images': {'$slice': 1}, 'is_active': 1}
+            products = {str(p['_id']): p for p in self.products.find({'_id': {'$in': ids}}, fields)}
+        data = []
+        for item in items:
+            product = products.get(item['product_id'])
+            if not product:
+                continue
+            data.append({
+                'id': item['product_id'],
+                'product': {
+                    'id': item['product_id'],
+                    'name': product.get('name'),
+                    'price': product.get('price', 0),
+                    'image': (product.get('images') or [''])[0],
+                    'category': product.get('category', ''),
+                    'is_active': product.get('is_active', True)
+                },
+                'quantity': item['quantity']
+            })
+        return {'success': True, 'data': data}
+    def add_to_cart(self, user_id, data):
+        product_id, quantity = self._parse_item(data)
+        now = datetime.utcnow()
+        # Already in the cart: bump the quantity in place
+        result = self.collection.update_one(
+            {'user_id': user_id, 'items.product_id': product_id},
+            {'$inc': {'items.$.quantity': quantity}, '$set': {'updated_at': now}}
+        )
+        if not result.matched_count:
+            try:
+                # Not in the cart (or no cart yet): append, creating the cart if needed
+                self.collection.update_one(
+                    {'user_id': user_id, 'items.product_id': {'$ne': product_id}},
+                    {'$push': {'items': {'product_id': product_id, 'quantity': quantity}}, '$set': {'updated_at': now}},
+                    upsert=True
+                )
+            except DuplicateKeyError:
+                # A concurrent request added the same product first, the unique user_id index refused a second cart
+                self.collection.update_one(
+                    {'user_id': user_id, 'items.product_id': product_id},
+                    {'$inc': {'items.$.quantity': quantity}, '$set': {'updated_at': now}}
+                )
+        return {'success': True, 'data': 'Item added to cart'}
+    def update_cart_item(self, user_id, product_id, data):
+        quantity = self._parse_quantity((data or {}).get('quantity'))
+        if quantity <= 0:
+            return self.remove_cart_item(user_id, product_id)
+        result = self.collection.update_one(
+            {'user_id': user_id, 'items.product_id': product_id},
+            {'$set': {'items.$.quantity': quantity, 'updated_at': datetime.utcnow()}}
+        )
+        if result.matched_count:
+            return {'success': True, 'data': 'Cart item updated'}
+        return {'success': False, 'error': 'Item not in cart'}
+    def remove_cart_item(self, user_id, product_id):
+        result = self.collection.update_one(
+            {'user_id': user_id, 'items.product_id': product_id},
+            {'$pull': {'items': {'product_id': product_id}}, '$set': {'updated_at': datetime.utcnow()}}
+        )
+        if result.modified_count:
+            return {'success': True, 'data': 'Item removed from cart'}
+        return {'success': False, 'error': 'Item not in cart'}
     def update_cart(self, user_id, items):
-        self.collection.update_one(
-            {'user_id': user_id},
-            {'$set': {'items': items if isinstance(items, list) else []}},
-            upsert=True
-        ) 
\ No newline at end of file
+        """Replace the whole cart (client-side sync), only product ids and quantities are kept"""
+        merged = {}
+        for item in items if isinstance(items, list) else []:
+            item = self._normalize_item(item)
+            if item and item['quantity'] > 0:
+                merged[item['product_id']] = merged.get(item['product_id'], 0) + item['quantity']
+        update = {'$set': {'items': [{'product_id': pid, 'quantity': qty} for pid, qty in merged.items()], 'updated_at': datetime.utcnow()}}
+        try:
+            self.collection.update_one({'user_id': user_id}, update, upsert=True)
+        except DuplicateKeyError:
+            # A concurrent request created the cart first: it exists now, so this is a plain update
+            self.collection.update_one({'user_id': user_id}, update, upsert=True)
+        return {'success': True, 'data': 'Cart updated'}
+    def _normalize_item(self, item):
+        # Carts synced by the old client stored whole product objects: {id, product: {id, ...}, quantity}
+        if not isinstance(item, dict):
+            return None
+        product_id = item.get('product_id') or (item.get('product') or {}).get('id')
+        if not product_id:
+            return None
+        try:
+            quantity = int(item.get('quantity', 1))
+        except (TypeError, ValueError):
+            quantity = 1
+        return {'product_id': str(product_id), 'quantity': quantity}
+    def _parse_item(self, data):
+        data = data or {}
+        product_id = data.get('product_id')
+        if not product_id:
+            raise ValueError('product_id is required')
+        quantity = self._parse_quantity(data.get('quantity', 1))
+        if quantity <= 0:
+            raise ValueError('quantity must be positive')
+        return str(product_id), quantity
+    def _parse_quantity(self, value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError('quantity must be an integer')
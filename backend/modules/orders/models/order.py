@@ -1,12 +1,35 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument, IndexModel, UpdateOne
+import re
+from modules.stats.models.rollup import StatsRollup
+from modules.stats.models.analytics import OrderAnalytics
+from shared.utils.pagination import keyset_page
+from shared.utils.counters import BlockCounter
+from shared.utils.bulk import batched
 
 class Order:
-    def __init__(self, db):
-        self.collection = db.orders
+    COLLECTION = "orders"
+    INDEXES = [
+        IndexModel([("created_at", -1), ("_id", -1)]),
+        IndexModel([("status", 1), ("created_at", -1), ("_id", -1)]),
+        IndexModel([("customer_id", 1), ("created_at", -1), ("_id", -1)]),
+        IndexModel("order_number")
+    ]
+    # Queries the routes run, explained by scripts/index_report.py: name -> (filter, sort)
+    QUERIES = {
+        "newest": ({}, [("created_at", -1), ("_id", -1)]),
+        "by_status": ({"status": "pending"}, [("created_at", -1), ("_id", -1)]),
+        "by_customer": ({"customer_id": "000000000000000000000000"}, [("created_at", -1), ("_id", -1)])
+    }
+    def __init__(self, db, order_number_block=20):
+        self.collection = db[self.COLLECTION]
         self.users = db.users
+        self.stats = StatsRollup(db)
+        self.analytics = OrderAnalytics(db)
+        self.order_numbers = BlockCounter(db, "order_number", order_number_block, seed=self._last_order_number)
     def create_order(self, data):
-        order_number = f"DH{self.collection.count_documents({}) + 1:06d}"
+        order_number = f"DH{self.order_numbers.next():06d}"
         order_doc = {
             "order_number": order_number,
             "customer_name": data.get("customer_name"),
@@ -17,17 +40,65 @@ class Order:
             "payment_method": data.get("payment_method", "cod"),
             "created_at": datetime.utcnow()
         }
-        return str(self.collection.insert_one(order_doc).inserted_id)
-    def get_all_orders(self):
-        orders = list(self.collection.find().sort("created_at", -1))
+        order_id = str(self.collection.insert_one(order_doc).inserted_id)
+        self.stats.order_created(order_doc)
+        self.analytics.order_created(order_doc)
+        return order_id
+    def _last_order_number(self):
+        """Highest number issued before the counter existed (one-off, when the counter is created)"""
+        last = self.collection.count_documents({})
+        for order in self.collection.find({"order_number": {"$regex": "^DH"}}, {"order_number": 1}):
+            match = re.match(r"^DH(\d+)$", order.get("order_number") or "")
+            if match:
+                last = max(last, int(match.group(1)))
+        return last
+    def build_query(self, status=None, date_from=None, date_to=None, customer_id=None):
+        query = {}
+        if customer_id:
+            query["customer_id"] = customer_id
+        if status:
+            query["status"] = status
+        if date_from or date_to:
+            query["created_at"] = {}
+            if date_from:
+                query["created_at"]["$gte"] = date_from
+            if date_to:
+                query["created_at"]["$lte"] = date_to
+        return query
+    def get_all_orders(self, limit=50, cursor=None, status=None, date_from=None, date_to=None):
+        query = self.build_query(status, date_from, date_to)
+        orders, next_cursor = keyset_page(self.collection, query, limit, cursor)
         for order in orders:
             order["id"] = str(order.pop("_id"))
-            user = None
-            if order.get("customer_id"):
-                try:
-                    user = self.users.find_one({"_id": ObjectId(order["customer_id"])})
-                except Exception:
-                    user = None
+        self._attach_customers(orders)
+        return {"orders": orders, "next_cursor": next_cursor, "has_more": next_cursor is not None}
+    def export_orders(self, status=None, date_from=None, date_to=None, batch_size=1000):
+        """Every matching order, newest first, from one cursor: customers are resolved per batch"""
+        query = self.build_query(status, date_from, date_to)
+        with self.collection.find(query).sort([("created_at", -1), ("_id", -1)]).batch_size(batch_size) as cursor:
+            for orders in batched(cursor, batch_size):
+                for order in orders:
+                    order["id"] = str(order.pop("_id"))
+                yield from self._attach_customers(orders)
+    def get_customer_orders(self, customer_id, limit=50, cursor=None, status=None, date_from=None, date_to=None):
+        query = self.build_query(status, date_from, date_to, customer_id=customer_id)
+        orders, next_cursor = keyset_page(self.collection, query, limit, cursor)
+        for order in orders:
+            order["id"] = str(order.pop("_id"))
+            order["items"] = order.get("items", [])
+        return {"orders": orders, "next_cursor": next_cursor, "has_more": next_cursor is not None}
+    def _attach_customers(self, orders):
+        """Resolve customer name/phone/email for a page of orders with a single $in query"""
+        customer_ids = set()
+        for order in orders:
+            if ObjectId.is_valid(order.get("customer_id") or ""):
+                customer_ids.add(ObjectId(order["customer_id"]))
+        users = {}
+        if customer_ids:
+            cursor = self.users.find({"_id": {"$in": list(customer_ids)}}, {"full_name": 1, "phone": 1, "email": 1})
+            users = {str(u["_id"]): u for u in cursor}
+        for order in orders:
+            user = users.get(order.get("customer_id") or "")
             if user:
                 order["user_full_name"] = user.get("full_name", "")
                 order["user_phone"] = user.get("phone", "")
@@ -38,7 +109,79 @@ class Order:
                 order["user_email"] = order.get("customer_email", "")
         return orders
     def update_order_status(self, order_id, new_status):
-        return self.collection.update_one(
-            {"_id": ObjectId(order_id)},
-            {"$set": {"status": new_status, "updated_at": datetime.utcnow()}}
-        ).modified_count > 0
+        """False when the order does not exist or already has `new_status`"""
+        previous = self.collection.find_one_and_update(
+            {"_id": ObjectId(order_id), "status": {"$ne": new_status}},
+            {"$set": {"status": new_status, "updated_at": datetime.utcnow()}},
+            projection={"status": 1, "total_amount": 1, "created_at": 1, "payment_method": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            return False
+        self.stats.order_status_changed(previous.get("status"), new_status, previous.get("total_amount"))
+        self.analytics.order_status_changed(previous, new_status)
+        return True
+    def bulk_update_status(self, new_status, order_ids=None, query=None, from_status=None, batch_size=500, max_errors=1000):
+        """Move many orders to `new_status`, by id list or by filter (a build_query dict).
+
+        Orders are read and updated in batches of `batch_size`: one unordered
+        bulk_write per batch, each update guarded by the status it was read
+        with, so a concurrent change wins and is not double counted in the
+        dashboard rollup or the analytics buckets. `from_status` restricts the move (e.g. pending only).
+        Returns counts plus per-id errors (id list mode).
+        """
+        result = {"matched": 0, "updated": 0, "skipped": 0, "errors": []}
+        def error(order_id, message):
+            if len(result["errors"]) < max_errors:
+                result["errors"].append({"id": str(order_id), "error": message})
+        fields = {"status": 1, "total_amount": 1, "created_at": 1, "payment_method": 1}
+        if order_ids is not None:
+            ids = []
+            for order_id in order_ids:
+                if ObjectId.is_valid(str(order_id)):
+                    ids.append(ObjectId(str(order_id)))
+                else:
+                    error(order_id, "Invalid order id")
+            for batch in batched(dict.fromkeys(ids), batch_size):
+                orders = list(self.collection.find({"_id": {"$in": batch}}, fields))
+                found = {order["_id"] for order in orders}
+                for order_id in batch:
+                    if order_id not in found:
+                        error(order_id, "Order not found")
+                self._update_status_batch(orders, new_status, from_status, result, error)
+        else:
+            query = dict(query or {})
+            if from_status:
+                query["status"] = from_status
+            query.setdefault("status", {"$ne": new_status})
+            for orders in batched(self.collection.find(query, fields).batch_size(batch_size), batch_size):
+                self._update_status_batch(orders, new_status, from_status, result, error)
+        return result
+    def _update_status_batch(self, orders, new_status, from_status, result, error):
+        result["matched"] += len(orders)
+        candidates = []
+        for order in orders:
+            status = order.get("status")
+            if status == new_status:
+                result["skipped"] += 1
+            elif from_status and status != from_status:
+                result["skipped"] += 1
+                error(order["_id"], f"Order is {status}, not {from_status}")
+            else:
+                candidates.append(order)
+        if not candidates:
+            return
+        now = datetime.utcnow()
+        operations = [UpdateOne({"_id": o["_id"], "status": o.get("status")}, {"$set": {"status": new_status, "updated_at": now}}) for o in candidates]
+        modified = self.collection.bulk_write(operations, ordered=False).modified_count
+        if modified < len(candidates):
+            # Some orders changed status in the meantime: keep only those this batch moved
+            moved = {o["_id"] for o in self.collection.find({"_id": {"$in": [o["_id"] for o in candidates]}, "status": new_status, "updated_at": now}, {"_id": 1})}
+            for order in candidates:
+                if order["_id"] not in moved:
+                    result["skipped"] += 1
+                    error(order["_id"], "Order status changed concurrently")
+            candidates = [o for o in candidates if o["_id"] in moved]
+        result["updated"] += len(candidates)
+        self.stats.order_statuses_changed(new_status, [(o.get("status"), o.get("total_amount")) for o in candidates])
+        self.analytics.orders_status_changed(new_status, candidates)
@@ -13,12 +13,22 @@ def get_cart(current_user):
 @cart_bp.route('/api/cart', methods=['POST'])
 @token_required
 def add_to_cart(current_user):
-    return jsonify(get_model('cart').add_to_cart(current_user['_id'], request.json))
+    data = request.json or {}
+    try:
+        if 'items' in data:
+            # Whole-cart sync from the client store
+            return jsonify(get_model('cart').update_cart(current_user['_id'], data['items']))
+        return jsonify(get_model('cart').add_to_cart(current_user['_id'], data))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
 
 @cart_bp.route('/api/cart/<product_id>', methods=['PUT'])
 @token_required
 def update_cart_item(current_user, product_id):
-    return jsonify(get_model('cart').update_cart_item(current_user['_id'], product_id, request.json))
+    try:
+        return jsonify(get_model('cart').update_cart_item(current_user['_id'], product_id, request.json))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
 
 @cart_bp.route('/api/cart/<product_id>', methods=['DELETE'])
 @token_required
@@ -1,3 +1,4 @@
 from .product import Product
+from .async_product import AsyncProduct
  
-__all__ = ['Product'] 
\ No newline at end of file
+__all__ = ['Product', 'AsyncProduct'] 
\ No newline at end of file
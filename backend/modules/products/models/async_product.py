@@ -0,0 +1,31 @@
+from bson import ObjectId
+from shared.utils.aio import keyset_page, cached_count, ranked_search
+from shared.utils.search import SEARCH_PROJECTION
+from .product import Product
+
+class AsyncProduct(Product):
+    """Read API of Product on a motor database (queries, views and responses are shared)"""
+    def __init__(self, db, read_preference=None):
+        # Reads follow MONGO_CATALOG_READ_PREFERENCE (primary unless configured), writes always go to the primary
+        self.collection = db.get_collection(self.COLLECTION, read_preference=read_preference)
+    async def get_all_products(self, skip=0, limit=100, search="", category="", with_total=True, projection=None):
+        projection = projection or SEARCH_PROJECTION
+        query = self.build_query(search, category)
+        total = await cached_count(self.collection, query) if with_total else None
+        if search:
+            docs = await ranked_search(self.collection, query, search, skip, limit, projection)
+        else:
+            docs = await self.collection.find(query, projection).skip(skip).limit(limit).to_list(None)
+        return self._page_response(docs, skip, limit, total)
+    async def get_products_page(self, cursor=None, limit=20, search="", category="", with_total=False, projection=None):
+        """Keyset page sorted on (created_at, _id), newest first"""
+        query = self.build_query(search, category)
+        docs, next_cursor = await keyset_page(self.collection, query, limit, cursor, projection=projection or SEARCH_PROJECTION)
+        total = await cached_count(self.collection, query) if with_total else None
+        return self._cursor_response(docs, limit, next_cursor, total)
+    async def get_product_by_id(self, product_id, projection=None):
+        product = await self.collection.find_one({"_id": ObjectId(product_id)}, projection or SEARCH_PROJECTION)
+        if product:
+            product["id"] = str(product.pop("_id"))
+            return {"success": True, "data": product}
+        return {"success": False, "error": "Product not found"}
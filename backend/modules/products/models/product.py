@@ -1,9 +1,39 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import IndexModel, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from shared.utils.pagination import keyset_page, cached_count, cursor_pagination
+from shared.utils.search import search_fields, build_search_query, ranked_search, SEARCH_PROJECTION, SEARCH_SORT, SEARCH_CANDIDATES
+from shared.utils.projections import resolve_projection
+from shared.utils.bulk import BulkReport, batched
 
 class Product:
-    def __init__(self, db):
-        self.collection = db.products
+    FIELDS = ("name", "description", "price", "category", "images", "image_variants", "is_active", "created_at", "updated_at")
+    # image_variants[i] holds the resized variant URLs of images[i] (None until generated or when it failed)
+    VIEWS = {
+        "card": {"name": 1, "price": 1, "category": 1, "images": {"$slice": 1}, "image_variants": {"$slice": 1}},
+        # Default of GET /api/products: the shop listing filters and previews on the description
+        "list": {"name": 1, "price": 1, "category": 1, "description": 1, "images": {"$slice": 1}, "image_variants": {"$slice": 1}, "is_active": 1, "created_at": 1},
+        "detail": SEARCH_PROJECTION
+    }
+    COLLECTION = "products"
+    INDEXES = [
+        IndexModel([("created_at", -1), ("_id", -1)]),
+        IndexModel([("category", 1), ("created_at", -1), ("_id", -1)]),
+        IndexModel("search_tokens")
+    ]
+    # Queries the routes run, explained by scripts/index_report.py: name -> (filter, sort[, limit])
+    QUERIES = {
+        "newest": ({}, [("created_at", -1), ("_id", -1)]),
+        "by_category": ({"category": "hoa-cuoi"}, [("created_at", -1), ("_id", -1)]),
+        # Candidate window of ranked search, for a word matching most of the catalog
+        "search": (build_search_query("hoa"), SEARCH_SORT, SEARCH_CANDIDATES)
+    }
+    def __init__(self, db, read_preference=None, images=None):
+        # Reads follow MONGO_CATALOG_READ_PREFERENCE (primary unless configured), writes always go to the primary
+        self.collection = db.get_collection(self.COLLECTION, read_preference=read_preference)
+        # ImagePipeline pre-generating resized variants after writes (None: not generated)
+        self.images = images
     def create_product(self, data):
         product = {
             "name": data.get("name"),
@@ -15,29 +45,148 @@ class Product:
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
-        return str(self.collection.insert_one(product).inserted_id)
-    def get_all_products(self, skip=0, limit=100, search="", category=""):
+        product.update(search_fields(product["name"], product["description"]))
+        product_id = str(self.collection.insert_one(product).inserted_id)
+        self._generate_variants(product_id, product["images"])
+        return product_id
+    def _generate_variants(self, product_id, images):
+        if self.images is not None and images:
+            self.images.submit(self.collection, product_id, images)
+    def parse_import_row(self, row):
+        """(product id or None, fields to write) from one CSV/NDJSON row, raises ValueError"""
+        name = str(row.get("name") or "").strip()
+        if not name:
+            raise ValueError("name is required")
+        try:
+            price = float(row.get("price"))
+        except (TypeError, ValueError):
+            raise ValueError("price must be a number")
+        if price < 0:
+            raise ValueError("price must not be negative")
+        images = row.get("images") or []
+        if isinstance(images, str):
+            # CSV: URLs separated by |
+            images = [image.strip() for image in images.split("|") if image.strip()]
+        elif not isinstance(images, list) or not all(isinstance(image, str) for image in images):
+            raise ValueError("images must be a list of URLs")
+        is_active = row.get("is_active", True)
+        if isinstance(is_active, str):
+            if is_active.strip().lower() not in ("", "true", "1", "yes", "false", "0", "no"):
+                raise ValueError("is_active must be true or false")
+            is_active = is_active.strip().lower() not in ("false", "0", "no")
+        product_id = str(row.get("id") or "").strip()
+        if product_id and not ObjectId.is_valid(product_id):
+            raise ValueError("id is not a valid product id")
+        product = {
+            "name": name,
+            "description": str(row.get("description") or ""),
+            "price": price,
+            "category": str(row.get("category") or "").strip(),
+            "images": images,
+            "is_active": bool(is_active)
+        }
+        product.update(search_fields(product["name"], product["description"]))
+        return (ObjectId(product_id) if product_id else None), product
+    def import_products(self, rows, batch_size=500, report=None, dry_run=False):
+        """Bulk create (rows without id) or update (rows with id) from (line, row) pairs.
+
+        Rows are validated one by one and written with one unordered bulk_write
+        per `batch_size` rows, so a bad row only fails itself. With `dry_run`
+        nothing is written and the counts say what would have been.
+        """
+        report = report or BulkReport()
+        for batch in batched(rows, batch_size):
+            now = datetime.utcnow()
+            # operations[i] comes from lines[i] and updates targets[i] (None for inserts)
+            operations, lines, targets = [], [], []
+            for line, row in batch:
+                report.counts["rows"] += 1
+                try:
+                    if isinstance(row, Exception):
+                        raise row
+                    product_id, product = self.parse_import_row(row)
+                except ValueError as e:
+                    report.fail(line, e)
+                    continue
+                product["updated_at"] = now
+                if product_id is None:
+                    product["created_at"] = now
+                    operations.append(InsertOne(product))
+                else:
+                    operations.append(UpdateOne({"_id": product_id}, {"$set": product}))
+                lines.append(line)
+                targets.append(product_id)
+            if dry_run:
+                updates = sum(1 for product_id in targets if product_id)
+                report.counts["inserted"] += len(operations) - updates
+                report.counts["updated"] += updates
+            elif operations:
+                self._write_import_batch(operations, lines, targets, report)
+        return report
+    def _write_import_batch(self, operations, lines, targets, report):
+        try:
+            result = self.collection.bulk_write(operations, ordered=False).bulk_api_result
+        except BulkWriteError as e:
+            result = e.details
+        failed = set()
+        for error in result.get("writeErrors", []):
+            failed.add(error["index"])
+            report.fail(lines[error["index"]], error.get("errmsg", "write failed"))
+        report.counts["inserted"] += result.get("nInserted", 0)
+        report.counts["updated"] += result.get("nMatched", 0)
+        updates = {i: product_id for i, product_id in enumerate(targets) if product_id and i not in failed}
+        if len(updates) > result.get("nMatched", 0):
+            # Some ids matched nothing: one lookup to tell which
+            found = {doc["_id"] for doc in self.collection.find({"_id": {"$in": list(updates.values())}}, {"_id": 1})}
+            for i, product_id in updates.items():
+                if product_id not in found:
+                    report.fail(lines[i], "Product not found")
+    def projection(self, view=None, fields=None, default="detail"):
+        """Projection for ?view=card|list|detail or ?fields=a,b, `default` without either (raises ValueError)"""
+        return resolve_projection(self.VIEWS, self.FIELDS, view, fields, default)
+    def build_query(self, search="", category=""):
         query = {}
         if search:
-            query["name"] = {"$regex": search, "$options": "i"}
+            query.update(build_search_query(search))
         if category:
             query["category"] = category
-        total = self.collection.count_documents(query)
-        products = [{**p, "id": str(p.pop("_id"))} for p in self.collection.find(query).skip(skip).limit(limit)]
+        return query
+    def get_all_products(self, skip=0, limit=100, search="", category="", with_total=True, projection=None):
+        projection = projection or SEARCH_PROJECTION
+        query = self.build_query(search, category)
+        total = cached_count(self.collection, query) if with_total else None
+        if search:
+            docs = ranked_search(self.collection, query, search, skip, limit, projection)
+        else:
+            docs = self.collection.find(query, projection).skip(skip).limit(limit)
+        return self._page_response(docs, skip, limit, total)
+    def get_products_page(self, cursor=None, limit=20, search="", category="", with_total=False, projection=None):
+        """Keyset page sorted on (created_at, _id), newest first"""
+        query = self.build_query(search, category)
+        docs, next_cursor = keyset_page(self.collection, query, limit, cursor, projection=projection or SEARCH_PROJECTION)
+        total = cached_count(self.collection, query) if with_total else None
+        return self._cursor_response(docs, limit, next_cursor, total)
+    def _page_response(self, docs, skip, limit, total=None):
+        pagination = {"current_page": skip // limit + 1, "per_page": limit}
+        if total is not None:
+            pagination.update({"total": total, "total_pages": (total + limit - 1) // limit})
+        return {
+            "success": True,
+            "data": {
+                "products": [{"id": str(p.pop("_id")), **p} for p in docs],
+                "pagination": pagination
+            }
+        }
+    def _cursor_response(self, docs, limit, next_cursor, total=None):
         return {
             "success": True,
             "data": {
-                "products": products,
-                "pagination": {
-                    "current_page": skip // limit + 1,
-                    "per_page": limit,
-                    "total": total,
-                    "total_pages": (total + limit - 1) // limit
-                }
+                "products": [{"id": str(p.pop("_id")), **p} for p in docs],
+                "pagination": cursor_pagination(limit, next_cursor, total)
             }
         }
-    def get_product_by_id(self, product_id):
-        product = self.collection.find_one({"_id": ObjectId(product_id)})
+    def get_product_by_id(self, product_id, projection=None):
+        product = self.collection.find_one({"_id": ObjectId(product_id)}, projection or SEARCH_PROJECTION)
         if product:
             product["id"] = str(product.pop("_id"))
             return {"success": True, "data": product}
@@ -51,8 +200,22 @@ class Product:
             "images": data.get("images", []),
             "updated_at": datetime.utcnow()
         }
-        result = self.collection.update_one({"_id": ObjectId(product_id)}, {"$set": update_data})
-        if result.modified_count:
+        update_data.update(search_fields(update_data["name"], update_data["description"]))
+        result = None
+        for _ in range(3):
+            current = self.collection.find_one({"_id": ObjectId(product_id)}, {"image_variants": 1})
+            if current is None:
+                break
+            # Variants of images still listed are kept (aligned with the new images), the others are None
+            # until _generate_variants replaces them; the filter makes a concurrent variants write retry
+            known = {entry["source"]: entry for entry in current.get("image_variants") or [] if entry}
+            update_data["image_variants"] = [known.get(url) for url in update_data["images"]]
+            result = self.collection.update_one({"_id": ObjectId(product_id), "image_variants": current.get("image_variants")},
+                                                {"$set": update_data})
+            if result.matched_count:
+                break
+        if result is not None and result.modified_count:
+            self._generate_variants(product_id, update_data["images"])
             return {"success": True, "data": "Product updated successfully"}
         return {"success": False, "error": "Product not found"}
     def delete_product(self, product_id):
@@ -1,33 +1,136 @@
-from flask import Blueprint, request, jsonify, current_app
+import csv
+import io
+import os
+from flask import Blueprint, request, jsonify, current_app, send_file
+from PIL import UnidentifiedImageError
+from pymongo.errors import PyMongoError
+from core.config.config import Config
 from modules.auth.routes.admin import admin_required
+from shared.utils.bulk import BulkReport, RowLimitExceeded, detect_format, iter_rows
+from shared.utils.helpers import log_user_activity, get_client_ip
+from shared.utils.images import image_pipeline, VARIANTS, FORMATS, DIGEST_RE
+from shared.utils.pagination import parse_limit, wants_total
+from shared.decorators.cache import cached_response, response_cache
 
 product_bp = Blueprint('product', __name__)
 
 def get_model(name): return getattr(current_app, f"{name}_model")
 
 @product_bp.route('/api/products', methods=['GET'])
+@cached_response('products:list')
 def get_products():
     args = request.args
-    page, per_page = int(args.get('page', 1)), int(args.get('per_page', 100))
     search, category = args.get('search', ''), args.get('category', '')
+    try:
+        projection = get_model('product').projection(args.get('view'), args.get('fields'), 'list')
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    if 'cursor' in args:
+        # Cursor mode: ?cursor= (empty) for the first page, then next_cursor
+        try:
+            return jsonify(get_model('product').get_products_page(
+                args.get('cursor') or None, parse_limit(args.get('per_page'), 20), search, category, wants_total(args, False), projection))
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid cursor"}), 400
+    page, per_page = int(args.get('page', 1)), int(args.get('per_page', 100))
     skip = (page - 1) * per_page
-    return jsonify(get_model('product').get_all_products(skip, per_page, search, category))
+    return jsonify(get_model('product').get_all_products(skip, per_page, search, category, wants_total(args, True), projection))
 
 @product_bp.route('/api/products/<product_id>', methods=['GET'])
+@cached_response('products:{product_id}')
 def get_product(product_id):
-    return jsonify(get_model('product').get_product_by_id(product_id))
+    try:
+        projection = get_model('product').projection(request.args.get('view'), request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify(get_model('product').get_product_by_id(product_id, projection))
+
+@product_bp.route('/api/images/<digest>/<variant>.<ext>', methods=['GET'])
+def get_image_variant(digest, variant, ext):
+    """Resized product image (card/detail/zoom, .webp or .jpg), cacheable forever: the URL changes with the content"""
+    if not DIGEST_RE.match(digest) or variant not in VARIANTS or ext not in FORMATS:
+        return jsonify({"success": False, "error": "Image not found"}), 404
+    path = image_pipeline.variant_path(digest, variant, ext)
+    if not os.path.exists(path):
+        # Variant cache cleared or never finished: rebuild it from the cached source
+        try:
+            image_pipeline.render(digest)
+        except FileNotFoundError:
+            return jsonify({"success": False, "error": "Image not found"}), 404
+        except (OSError, ValueError, UnidentifiedImageError) as e:
+            current_app.logger.error(f"Image variant {digest}/{variant}.{ext} failed: {e}")
+            return jsonify({"success": False, "error": "Image could not be rendered"}), 500
+    # Sent through the server's wsgi.file_wrapper (sendfile under gunicorn), not read into memory
+    response = send_file(path, mimetype=FORMATS[ext][1], max_age=365 * 24 * 3600, conditional=True)
+    response.cache_control.immutable = True
+    return response
 
 @product_bp.route('/api/admin/products', methods=['POST'])
 @admin_required
 def create_product(current_user):
-    return jsonify(get_model('product').create_product(request.json))
+    result = get_model('product').create_product(request.json)
+    response_cache.invalidate('products:list')
+    return jsonify(result)
 
 @product_bp.route('/api/admin/products/<product_id>', methods=['PUT'])
 @admin_required
 def update_product(current_user, product_id):
-    return jsonify(get_model('product').update_product(product_id, request.json))
+    result = get_model('product').update_product(product_id, request.json)
+    response_cache.invalidate('products:list', f'products:{product_id}')
+    return jsonify(result)
 
 @product_bp.route('/api/admin/products/<product_id>', methods=['DELETE'])
 @admin_required
 def delete_product(current_user, product_id):
-    return jsonify(get_model('product').delete_product(product_id)) 
\ No newline at end of file
+    result = get_model('product').delete_product(product_id)
+    response_cache.invalidate('products:list', f'products:{product_id}')
+    return jsonify(result) 
+
+@product_bp.route('/api/admin/products/import', methods=['POST'])
+@admin_required
+def import_products(current_user):
+    """Bulk create/update products from a CSV or NDJSON upload, streamed row by row.
+
+    Send the file as multipart "file" or as the raw request body. Rows with an
+    "id" update that product, the others are created. ?dry_run=1 validates only.
+    """
+    upload = request.files.get('file')
+    if upload is not None:
+        stream, content_type, filename = upload.stream, upload.mimetype, upload.filename
+    else:
+        stream, content_type, filename = request.stream, request.mimetype, ''
+    try:
+        fmt = detect_format(request.args.get('format'), content_type, filename)
+        batch_size = min(max(int(request.args.get('batch_size', Config.BULK_BATCH_SIZE)), 1), 5000)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    if not hasattr(stream, 'read1'):
+        stream = io.BufferedReader(stream)
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    report = BulkReport(Config.BULK_MAX_ERRORS)
+    try:
+        get_model('product').import_products(iter_rows(stream, fmt, Config.BULK_MAX_ROWS), batch_size, report, dry_run)
+    except RowLimitExceeded as e:
+        # Row cap reached: the rows before it are written, the rest of the upload is ignored
+        status, error = 413, str(e)
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Unreadable from here on (not UTF-8, broken quoting): same, the rows before it are written
+        status, error = 400, f'Could not read the upload: {e}'
+    except PyMongoError as e:
+        current_app.logger.error(f'Product import stopped by a database error: {e}')
+        status, error = 500, 'Database error, the import stopped'
+    else:
+        status, error = 200, None
+    finally:
+        if report.counts['inserted'] and not dry_run:
+            response_cache.invalidate('products:list')
+        if report.counts['updated'] and not dry_run:
+            response_cache.clear()
+    if not dry_run and (report.counts['inserted'] or report.counts['updated']):
+        log_user_activity(current_user['_id'], 'products_imported',
+                          {'inserted': report.counts['inserted'], 'updated': report.counts['updated'], 'failed': report.counts['failed']},
+                          get_client_ip(request), current_user.get('full_name'))
+    result = {"success": error is None and report.counts['failed'] == 0, "dry_run": dry_run, "data": report.to_dict()}
+    if error:
+        result["error"] = error
+    return jsonify(result), status
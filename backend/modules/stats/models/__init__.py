@@ -0,0 +1,5 @@
+from .rollup import StatsRollup
+from .activity import ActivityEvents
+from .analytics import OrderAnalytics
+ 
+__all__ = ['StatsRollup', 'ActivityEvents', 'OrderAnalytics']
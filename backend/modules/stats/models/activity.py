@@ -0,0 +1,33 @@
+from pymongo import IndexModel
+from pymongo.errors import CollectionInvalid
+
+class ActivityEvents:
+    """User and order events in the capped `activity_log` collection.
+
+    Written in batches by shared.utils.activity.ActivityLog; the collection is
+    capped by size, so the oldest events disappear on their own. One document:
+    {user_id, user_name, action, details, ip_address, timestamp}.
+    """
+    COLLECTION = "activity_log"
+    INDEXES = [IndexModel([("timestamp", -1), ("_id", -1)])]
+    # Queries the routes run, explained by scripts/index_report.py: name -> (filter, sort)
+    QUERIES = {
+        "newest": ({}, [("timestamp", -1), ("_id", -1)])
+    }
+    def __init__(self, db):
+        self.db = db
+        self.collection = db[self.COLLECTION]
+    def ensure_capped(self, size_mb=64, max_docs=0):
+        """Create the capped collection, converting a plain one (e.g. created by an index build first)"""
+        options = {"capped": True, "size": size_mb * 1024 * 1024}
+        if max_docs:
+            options["max"] = max_docs
+        try:
+            self.db.create_collection(self.COLLECTION, **options)
+        except CollectionInvalid:
+            if not self.collection.options().get("capped"):
+                self.db.command("convertToCapped", self.COLLECTION, size=options["size"])
+    def recent(self, limit=15, action=None):
+        """Newest events first, one query on the timestamp index"""
+        query = {"action": action} if action else {}
+        return list(self.collection.find(query).sort([("timestamp", -1), ("_id", -1)]).limit(limit))
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+from pymongo import IndexModel, UpdateOne
+
+GRANULARITIES = {"day": "%Y-%m-%d", "week": "%G-W%V", "month": "%Y-%m"}
+# Amounts of these statuses are left out of revenue (still counted in orders and amount)
+NON_REVENUE_STATUSES = ("cancelled",)
+
+def hour_of(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def bucket_id(hour, status, payment_method):
+    return f"{hour.strftime('%Y-%m-%dT%H')}|{status}|{payment_method}"
+
+class OrderAnalytics:
+    """Hourly order buckets in `order_buckets`, read by /api/admin/analytics.
+
+    One document per (UTC hour of creation, status, payment method) holds the
+    order count and total amount: {hour, status, payment_method, orders, amount}.
+    Order writes keep them current with $inc (a status change moves the order
+    between the buckets of its creation hour); `rebuild` recomputes them from
+    the raw orders. A year is at most 8760 hours times a few status/payment
+    pairs, grouped by the server into days, ISO weeks or months.
+    """
+
+    COLLECTION = "order_buckets"
+    INDEXES = [IndexModel([("hour", 1)])]
+    # Queries the routes run, explained by scripts/index_report.py: name -> (filter, sort)
+    QUERIES = {
+        "range": ({"hour": {"$gte": datetime(2025, 1, 1), "$lt": datetime(2026, 1, 1)}}, None)
+    }
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db[self.COLLECTION]
+
+    def _inc(self, order, status, orders, amount):
+        hour = hour_of(order["created_at"])
+        payment_method = order.get("payment_method") or "unknown"
+        return UpdateOne(
+            {"_id": bucket_id(hour, status, payment_method)},
+            {"$inc": {"orders": orders, "amount": amount},
+             "$setOnInsert": {"hour": hour, "status": status, "payment_method": payment_method}},
+            upsert=True
+        )
+
+    def _write(self, operations):
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def order_created(self, order_doc):
+        self._write([self._inc(order_doc, order_doc["status"], 1, order_doc.get("total_amount") or 0)])
+
+    def order_status_changed(self, previous, new_status):
+        """`previous` is the order before the change (status, total_amount, created_at, payment_method)"""
+        self.orders_status_changed(new_status, [previous])
+
+    def orders_status_changed(self, new_status, orders):
+        """Move orders (as they were before the change) to `new_status`, one bulk_write for all of them"""
+        changes = {}
+        for order in orders:
+            if order.get("status") == new_status or not isinstance(order.get("created_at"), datetime):
+                continue
+            amount = order.get("total_amount") or 0
+            for status, sign in ((order.get("status"), -1), (new_status, 1)):
+                key = (hour_of(order["created_at"]), status, order.get("payment_method") or "unknown")
+                count, total = changes.get(key, (0, 0))
+                changes[key] = (count + sign, total + sign * amount)
+        self._write([
+            self._inc({"created_at": hour, "payment_method": payment_method}, status, count, total)
+            for (hour, status, payment_method), (count, total) in changes.items() if count or total
+        ])
+
+    def series(self, granularity, start, end, utc_offset=0):
+        """Per period totals, by status and by payment method, for orders created in [start, end) (UTC).
+
+        Periods are days, ISO weeks or months of local time at `utc_offset`
+        hours, every period of the range included (zeros when empty).
+        """
+        shift = timedelta(hours=utc_offset)
+        timezone = f"{'-' if utc_offset < 0 else '+'}{abs(utc_offset):02d}:00"
+        period = {"$dateToString": {"format": GRANULARITIES[granularity], "date": "$hour", "timezone": timezone}}
+        rows = self.collection.aggregate([
+            {"$match": {"hour": {"$gte": start, "$lt": end}}},
+            {"$group": {
+                "_id": {"period": period, "status": "$status", "payment_method": "$payment_method"},
+                "orders": {"$sum": "$orders"}, "amount": {"$sum": "$amount"}
+            }}
+        ])
+        periods = {key: empty_period(key) for key in period_keys(granularity, start + shift, end + shift)}
+        totals = empty_period(None)
+        for row in rows:
+            if not row["orders"]:
+                continue
+            key = row["_id"]
+            for target in (periods.setdefault(key["period"], empty_period(key["period"])), totals):
+                add_row(target, key["status"], key["payment_method"], row["orders"], row["amount"])
+        series = [finish_period(periods[key]) for key in sorted(periods)]
+        totals = finish_period(totals)
+        del totals["period"]
+        return {"series": series, "totals": totals}
+
+    def rebuild(self, since=None):
+        """Recompute buckets from the orders collection, all of them or from `since` (UTC) on.
+
+        A full rebuild fills a staging collection and renames it over the live
+        one, so readers never see it half done; a partial one replaces the
+        buckets of the range. Orders written while it runs may be missed:
+        run it when the shop is quiet. Returns the number of buckets written.
+        """
+        match = {"created_at": {"$type": "date"}}
+        if since:
+            since = hour_of(since)
+            match["created_at"] = {"$gte": since}
+        rows = self.db.orders.aggregate([
+            {"$match": match},
+            {"$group": {
+                "_id": {"hour": {"$dateToString": {"format": "%Y-%m-%dT%H", "date": "$created_at"}},
+                        "status": "$status", "payment_method": {"$ifNull": ["$payment_method", "unknown"]}},
+                "orders": {"$sum": 1}, "amount": {"$sum": {"$ifNull": ["$total_amount", 0]}}
+            }}
+        ], allowDiskUse=True)
+        buckets = []
+        for row in rows:
+            hour = datetime.strptime(row["_id"]["hour"], "%Y-%m-%dT%H")
+            status, payment_method = row["_id"]["status"], row["_id"]["payment_method"]
+            buckets.append({"_id": bucket_id(hour, status, payment_method), "hour": hour, "status": status,
+                            "payment_method": payment_method, "orders": row["orders"], "amount": row["amount"]})
+        if since:
+            self.collection.delete_many({"hour": {"$gte": since}})
+            target = self.collection
+        else:
+            target = self.db[f"{self.COLLECTION}_rebuild"]
+            target.drop()
+            target.create_indexes(self.INDEXES)
+        for i in range(0, len(buckets), 1000):
+            target.insert_many(buckets[i:i + 1000], ordered=False)
+        if not since:
+            if buckets:
+                target.rename(self.COLLECTION, dropTarget=True)
+            else:
+                self.collection.delete_many({})
+        return len(buckets)
+
+def period_keys(granularity, start, end):
+    """Keys of every period touching [start, end), in local time"""
+    keys, day = [], start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        key = day.strftime(GRANULARITIES[granularity])
+        if not keys or keys[-1] != key:
+            keys.append(key)
+        day += timedelta(days=1)
+    return keys
+
+def empty_period(key):
+    return {"period": key, "orders": 0, "amount": 0, "revenue": 0, "by_status": {}, "by_payment_method": {}}
+
+def add_row(target, status, payment_method, orders, amount):
+    target["orders"] += orders
+    target["amount"] += amount
+    if status not in NON_REVENUE_STATUSES:
+        target["revenue"] += amount
+    for group, name in (("by_status", status), ("by_payment_method", payment_method)):
+        entry = target[group].setdefault(name, {"orders": 0, "amount": 0})
+        entry["orders"] += orders
+        entry["amount"] += amount
+
+def finish_period(period):
+    period["average_order_value"] = round(period["amount"] / period["orders"], 2) if period["orders"] else 0
+    return period
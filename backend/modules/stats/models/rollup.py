@@ -0,0 +1,221 @@
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+TOTALS_ID = "totals"
+
+def day_id(moment):
+    return f"day:{moment.strftime('%Y-%m-%d')}"
+
+class StatsRollup:
+    """Dashboard counters kept in the stats_rollup collection.
+
+    One `totals` document holds running user/order/revenue figures and one
+    `day:YYYY-MM-DD` document per UTC day holds registrations, logins, orders and
+    the number of users whose latest login fell on that day. Writers update them
+    with $inc as users and orders change; `recompute` rebuilds them from the raw
+    collections to reconcile drift. A day document also keeps a `snapshot` of the
+    totals, taken by the first dashboard load or recompute of that day; user and
+    order growth compare the totals with the snapshot of a window ago.
+    """
+
+    def __init__(self, db):
+        self.collection = db.stats_rollup
+        self.db = db
+
+    def _inc(self, doc_id, inc, moment=None):
+        update = {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}}
+        if moment is not None:
+            update["$setOnInsert"] = {"date": moment.replace(hour=0, minute=0, second=0, microsecond=0)}
+        self.collection.update_one({"_id": doc_id}, update, upsert=True)
+
+    def user_created(self, user_doc):
+        inc = {"users_total": 1}
+        if user_doc.get("is_active"):
+            inc["users_active"] = 1
+        if user_doc.get("role") == "admin":
+            inc["users_admin"] = 1
+        self._inc(TOTALS_ID, inc)
+        self._inc(day_id(user_doc["created_at"]), {"registrations": 1}, user_doc["created_at"])
+
+    def user_removed(self, user_doc):
+        inc = {"users_total": -1}
+        if user_doc.get("is_active", True):
+            inc["users_active"] = -1
+        if user_doc.get("role") == "admin":
+            inc["users_admin"] = -1
+        self._inc(TOTALS_ID, inc)
+        if user_doc.get("last_login"):
+            self._inc(day_id(user_doc["last_login"]), {"last_logins": -1}, user_doc["last_login"])
+
+    def user_active_changed(self, is_active):
+        self._inc(TOTALS_ID, {"users_active": 1 if is_active else -1})
+
+    def user_logged_in(self, previous_login, now):
+        """Move the user from the bucket of their previous login to today's"""
+        if previous_login and day_id(previous_login) == day_id(now):
+            self._inc(day_id(now), {"logins": 1}, now)
+            return
+        if previous_login:
+            self._inc(day_id(previous_login), {"last_logins": -1}, previous_login)
+        self._inc(day_id(now), {"logins": 1, "last_logins": 1}, now)
+
+    def order_created(self, order_doc):
+        status, amount = order_doc["status"], order_doc.get("total_amount") or 0
+        self._inc(TOTALS_ID, {"orders_total": 1, f"orders_by_status.{status}": 1, f"revenue_by_status.{status}": amount})
+        self._inc(day_id(order_doc["created_at"]), {"orders": 1, "order_amount": amount}, order_doc["created_at"])
+
+    def order_status_changed(self, old_status, new_status, amount):
+        if old_status == new_status:
+            return
+        amount = amount or 0
+        self._inc(TOTALS_ID, {
+            f"orders_by_status.{old_status}": -1, f"revenue_by_status.{old_status}": -amount,
+            f"orders_by_status.{new_status}": 1, f"revenue_by_status.{new_status}": amount
+        })
+
+    def order_statuses_changed(self, new_status, previous):
+        """order_status_changed for many orders in one update: `previous` is [(old status, amount)]"""
+        inc = {}
+        for old_status, amount in previous:
+            if old_status == new_status:
+                continue
+            amount = amount or 0
+            for status, sign in ((old_status, -1), (new_status, 1)):
+                inc[f"orders_by_status.{status}"] = inc.get(f"orders_by_status.{status}", 0) + sign
+                inc[f"revenue_by_status.{status}"] = inc.get(f"revenue_by_status.{status}", 0) + sign * amount
+        if inc:
+            self._inc(TOTALS_ID, inc)
+
+    def get_dashboard(self, now=None, window_days=7):
+        """Totals plus the last two windows of daily snapshots, in a single query"""
+        now = now or datetime.utcnow()
+        days = [now - timedelta(days=i) for i in range(window_days * 2)]
+        docs = {d["_id"]: d for d in self.collection.find({"_id": {"$in": [TOTALS_ID] + [day_id(d) for d in days]}})}
+        if TOTALS_ID not in docs:
+            # First load on a database that predates the rollup
+            self.recompute()
+            return self.get_dashboard(now, window_days)
+        totals = docs[TOTALS_ID]
+        current = [docs.get(day_id(d), {}) for d in days[:window_days]]
+        previous = [docs.get(day_id(d), {}) for d in days[window_days:]]
+        if "snapshot" not in current[0]:
+            self.record_snapshot(totals, now)
+        # Totals a window ago: the newest snapshot from then or before, else totals minus the window's buckets
+        baseline = next((b["snapshot"] for b in previous if "snapshot" in b), None)
+
+        def window_sum(buckets, field):
+            return sum(b.get(field, 0) for b in buckets)
+
+        registrations = window_sum(current, "registrations")
+        users_total = totals.get("users_total", 0)
+        orders_total = totals.get("orders_total", 0)
+        if baseline is None:
+            baseline = {"users_total": users_total - registrations, "orders_total": orders_total - window_sum(current, "orders")}
+        return {
+            "total_users": users_total,
+            "admin_users": totals.get("users_admin", 0),
+            "active_users": totals.get("users_active", 0),
+            "today_registrations": current[0].get("registrations", 0),
+            "recent_logins": window_sum(current, "last_logins"),
+            "revenue": totals.get("revenue_by_status", {}).get("completed", 0),
+            "pending_revenue": totals.get("revenue_by_status", {}).get("pending", 0),
+            "growth": {
+                "users_growth": growth(users_total, baseline.get("users_total", 0)),
+                "orders_growth": growth(orders_total, baseline.get("orders_total", 0)),
+                "activity_growth": growth(window_sum(current, "logins"), window_sum(previous, "logins")),
+                "registrations_growth": growth(registrations, window_sum(previous, "registrations"))
+            }
+        }
+
+    def recompute(self):
+        """Rebuild totals and per-day user/order buckets from the raw collections ($facet)"""
+        now = datetime.utcnow()
+
+        def by_day(field):
+            return [
+                {"$match": {field: {"$type": "date"}}},
+                {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$" + field}}, "count": {"$sum": 1}}}
+            ]
+
+        users = next(self.db.users.aggregate([{"$facet": {
+            "total": [{"$count": "n"}],
+            "active": [{"$match": {"is_active": True}}, {"$count": "n"}],
+            "admin": [{"$match": {"role": "admin"}}, {"$count": "n"}],
+            "registrations": by_day("created_at"),
+            "last_logins": by_day("last_login")
+        }}]), {})
+        orders = next(self.db.orders.aggregate([{"$facet": {
+            "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}, "amount": {"$sum": "$total_amount"}}}],
+            "by_day": [
+                {"$match": {"created_at": {"$type": "date"}}},
+                {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                            "count": {"$sum": 1}, "amount": {"$sum": "$total_amount"}}}
+            ]
+        }}]), {})
+
+        def first_count(facet):
+            return facet[0]["n"] if facet else 0
+
+        totals = {
+            "users_total": first_count(users.get("total")),
+            "users_active": first_count(users.get("active")),
+            "users_admin": first_count(users.get("admin")),
+            "orders_total": sum(s["count"] for s in orders.get("by_status", [])),
+            "orders_by_status": {str(s["_id"]): s["count"] for s in orders.get("by_status", [])},
+            "revenue_by_status": {str(s["_id"]): s["amount"] for s in orders.get("by_status", [])},
+            "updated_at": now,
+            "recomputed_at": now
+        }
+        self.collection.replace_one({"_id": TOTALS_ID}, {"_id": TOTALS_ID, **totals}, upsert=True)
+
+        # Rebuilt fields per day; login events are not stored anywhere else and are kept
+        days = {}
+        for row in users.get("registrations", []):
+            days.setdefault(row["_id"], {})["registrations"] = row["count"]
+        for row in users.get("last_logins", []):
+            days.setdefault(row["_id"], {})["last_logins"] = row["count"]
+        for row in orders.get("by_day", []):
+            days.setdefault(row["_id"], {}).update({"orders": row["count"], "order_amount": row["amount"]})
+        self.collection.update_many(
+            {"_id": {"$regex": "^day:", "$nin": [f"day:{day}" for day in days]}},
+            {"$set": {"registrations": 0, "last_logins": 0, "orders": 0, "order_amount": 0}}
+        )
+        ops = [UpdateOne(
+            {"_id": f"day:{day}"},
+            {"$set": {"registrations": 0, "last_logins": 0, "orders": 0, "order_amount": 0, **fields, "updated_at": now},
+             "$setOnInsert": {"date": datetime.strptime(day, "%Y-%m-%d")}},
+            upsert=True
+        ) for day, fields in days.items()]
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
+        # Daily snapshot of the reconciled totals, replacing one taken from drifted counters
+        self.collection.update_one(
+            {"_id": day_id(now)},
+            {"$set": {"snapshot": snapshot_of(totals)},
+             "$setOnInsert": {"date": now.replace(hour=0, minute=0, second=0, microsecond=0)}},
+            upsert=True
+        )
+        return totals
+
+    def record_snapshot(self, totals, now):
+        """Store `totals` as the snapshot of `now`'s day, unless the day already has one"""
+        try:
+            self.collection.update_one(
+                {"_id": day_id(now), "snapshot": {"$exists": False}},
+                {"$set": {"snapshot": snapshot_of(totals)},
+                 "$setOnInsert": {"date": now.replace(hour=0, minute=0, second=0, microsecond=0)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another request stored it first
+            pass
+
+def snapshot_of(totals):
+    return {k: v for k, v in totals.items() if k not in ("_id", "updated_at", "recomputed_at")}
+
+def growth(current, previous):
+    """Percentage change, rounded to one decimal (100 when starting from zero)"""
+    if not previous:
+        return 100.0 if current else 0.0
+    return round((current - previous) * 100.0 / previous, 1)
@@ -1,14 +1,37 @@
 from pymongo import MongoClient
 from datetime import datetime
-import bcrypt
 from bson.objectid import ObjectId
 import re
+from shared.utils.cache import TTLCache
+from shared.utils.passwords import PasswordHasher
+from pymongo import ReturnDocument, IndexModel
+from modules.stats.models.rollup import StatsRollup
+from shared.utils.search import search_fields, build_search_query, SEARCH_PROJECTION, SEARCH_SORT, SEARCH_CANDIDATES
+
+# Fields token_required/admin_required hand to the routes, never the password hash
+SESSION_FIELDS = {'full_name': 1, 'email': 1, 'phone': 1, 'role': 1, 'is_active': 1}
 
 class User:
-    def __init__(self, db):
-        self.collection = db.users
-        self.collection.create_index("email", unique=True)
-        self.collection.create_index("phone")
+    COLLECTION = 'users'
+    INDEXES = [
+        IndexModel('email', unique=True),
+        IndexModel('phone'),
+        IndexModel([('created_at', -1), ('_id', -1)]),
+        IndexModel('search_tokens')
+    ]
+    # Queries the routes run, explained by scripts/index_report.py: name -> (filter, sort[, limit])
+    QUERIES = {
+        'by_email': ({'email': 'admin@example.com'}, None),
+        'by_phone': ({'phone': '0900000000'}, None),
+        'newest': ({}, [('created_at', -1), ('_id', -1)]),
+        # Candidate window of the admin users ranked search, for a common family name
+        'search': (build_search_query('nguyen'), SEARCH_SORT, SEARCH_CANDIDATES)
+    }
+    def __init__(self, db, cache_size=10000, cache_ttl=60, hasher=None):
+        self.collection = db[self.COLLECTION]
+        self.hasher = hasher or PasswordHasher(workers=0)
+        self.session_cache = TTLCache(cache_size, cache_ttl)
+        self.stats = StatsRollup(db)
         
     def create_user(self, user_data):
         if not self._is_valid_email(user_data['email']):
@@ -17,8 +40,7 @@ class User:
             raise ValueError("Số điện thoại không hợp lệ")
         if self.find_by_email(user_data['email']):
             raise ValueError("Email đã được sử dụng")
-        password = user_data['password'].encode('utf-8')
-        hashed = bcrypt.hashpw(password, bcrypt.gensalt())
+        hashed = self.hasher.hash(user_data['password'])
         user_doc = {
             'full_name': user_data['full_name'].strip(),
             'email': user_data['email'].lower().strip(),
@@ -33,7 +55,10 @@ class User:
             'last_login': None,
             'login_count': 0
         }
-        return str(self.collection.insert_one(user_doc).inserted_id)
+        user_doc.update(search_fields(user_doc['full_name'], user_doc['email'], user_doc['phone']))
+        user_id = str(self.collection.insert_one(user_doc).inserted_id)
+        self.stats.user_created(user_doc)
+        return user_id
     
     def find_by_email(self, email):
         return self.collection.find_one({'email': email.lower().strip()})
@@ -41,36 +66,80 @@ class User:
     def find_by_id(self, user_id):
         return self.collection.find_one({'_id': ObjectId(user_id)})
     
+    def find_session_user(self, user_id):
+        """Lookup used on every authenticated request, served from the in-process cache"""
+        user = self.session_cache.get(user_id)
+        if user is None:
+            user = self.collection.find_one({'_id': ObjectId(user_id)}, SESSION_FIELDS)
+            if user is None:
+                return None
+            self.session_cache.set(user_id, user)
+        return dict(user)
+    
+    def invalidate_cached_user(self, user_id):
+        self.session_cache.pop(str(user_id))
+    
     def find_by_phone(self, phone):
         return self.collection.find_one({'phone': phone.strip()})
     
     def verify_password(self, password, hashed):
-        return bcrypt.checkpw(password.encode('utf-8'), hashed)
+        return self.hasher.verify(password, hashed)
+    
+    def rehash_if_needed(self, user_id, password, hashed):
+        """Upgrade a hash made with an old cost factor, on login while the password is known"""
+        if not self.hasher.needs_rehash(hashed):
+            return False
+        new_hash = self.hasher.hash(password)
+        self.collection.update_one({'_id': ObjectId(user_id), 'password_hash': hashed}, {'$set': {'password_hash': new_hash}})
+        return True
     
     def update_last_login(self, user_id):
-        return self.collection.update_one({'_id': ObjectId(user_id)}, {'$set': {'last_login': datetime.utcnow(), 'login_count': 1}})
+        now = datetime.utcnow()
+        previous = self.collection.find_one_and_update(
+            {'_id': ObjectId(user_id)},
+            {'$set': {'last_login': now, 'login_count': 1}},
+            projection={'last_login': 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous:
+            self.stats.user_logged_in(previous.get('last_login'), now)
+        return previous
     
     def update_user(self, user_id, update_data):
         update_data['updated_at'] = datetime.utcnow()
-        return self.collection.update_one({'_id': ObjectId(user_id)}, {'$set': update_data})
+        if any(field in update_data for field in ('full_name', 'email', 'phone')):
+            current = self.collection.find_one({'_id': ObjectId(user_id)}, {'full_name': 1, 'email': 1, 'phone': 1}) or {}
+            merged = {**current, **update_data}
+            update_data.update(search_fields(merged.get('full_name'), merged.get('email'), merged.get('phone')))
+        result = self.collection.update_one({'_id': ObjectId(user_id)}, {'$set': update_data})
+        self.invalidate_cached_user(user_id)
+        return result
     
     def change_password(self, user_id, new_password):
-        hashed = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
-        return self.collection.update_one({'_id': ObjectId(user_id)}, {'$set': {'password_hash': hashed, 'updated_at': datetime.utcnow()}})
+        hashed = self.hasher.hash(new_password)
+        result = self.collection.update_one({'_id': ObjectId(user_id)}, {'$set': {'password_hash': hashed, 'updated_at': datetime.utcnow()}})
+        self.invalidate_cached_user(user_id)
+        return result
     
     def deactivate_user(self, user_id):
-        return self.collection.update_one({'_id': ObjectId(user_id)}, {'$set': {'is_active': False, 'updated_at': datetime.utcnow()}})
+        previous = self.collection.find_one_and_update(
+            {'_id': ObjectId(user_id)},
+            {'$set': {'is_active': False, 'updated_at': datetime.utcnow()}},
+            projection={'is_active': 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        self.invalidate_cached_user(user_id)
+        if previous and previous.get('is_active'):
+            self.stats.user_active_changed(False)
+        return previous is not None
     
     def get_all_users(self, skip=0, limit=50, search=None):
-        query = {}
-        if search:
-            regex = re.compile(re.escape(search), re.IGNORECASE)
-            query['$or'] = [
-                {'full_name': regex},
-                {'email': regex},
-                {'phone': regex}
-            ]
-        return list(self.collection.find(query).skip(skip).limit(limit))
+        query = self.search_query(search) if search else {}
+        return list(self.collection.find(query, SEARCH_PROJECTION).skip(skip).limit(limit))
+    
+    def search_query(self, search):
+        """Token match on full name, email and phone (diacritics folded, last word as prefix)"""
+        return build_search_query(search)
     
     def get_user_stats(self):
         total = self.collection.count_documents({})
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Side-by-side benchmark of the public read routes: WSGI (app.py) vs ASGI (asgi.py).
+
+Start both servers against the same database first, e.g.
+  gunicorn -w 4 --threads 8 -b :5003 app:app
+  uvicorn asgi:app --workers 4 --port 5004
+then fire the same request mix at each with the same client concurrency and
+compare throughput and latency percentiles. Response caching would hide the
+data layer, so every request carries a unique `_` query argument.
+
+Usage (from backend/): python scripts/bench_asgi.py [--wsgi URL] [--asgi URL] [--concurrency N] [--requests N]
+"""
+
+import argparse
+import itertools
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+PATHS = [
+    '/api/products?view=card&per_page=20',
+    '/api/products?cursor=&per_page=20&view=list',
+    '/api/products?search=hoa&per_page=20',
+    '/api/blogs?view=card',
+    '/api/blogs/featured',
+    '/api/health'
+]
+
+def run(base_url, concurrency, total):
+    """Issue `total` GETs over `concurrency` threads, returns (seconds, latencies ms, errors)"""
+    local = threading.local()
+    counter = itertools.count()
+
+    def fetch(i):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        path = PATHS[i % len(PATHS)]
+        url = f"{base_url}{path}{'&' if '?' in path else '?'}_={next(counter)}"
+        started = time.perf_counter()
+        try:
+            ok = session.get(url, timeout=30).status_code == 200
+        except requests.RequestException:
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, range(total)))
+    elapsed = time.perf_counter() - started
+    return elapsed, [ms for ms, _ in results], sum(1 for _, ok in results if not ok)
+
+def report(name, elapsed, latencies, errors):
+    latencies = sorted(latencies)
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+    print(f"{name:5} {len(latencies) / elapsed:8.1f} req/s  p50 {pct(0.50):7.1f} ms  "
+          f"p95 {pct(0.95):7.1f} ms  p99 {pct(0.99):7.1f} ms  mean {statistics.mean(latencies):7.1f} ms  errors {errors}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--wsgi', default='http://localhost:5003')
+    parser.add_argument('--asgi', default='http://localhost:5004')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=3000)
+    args = parser.parse_args()
+
+    print(f"🌸 {args.requests} requests, {args.concurrency} concurrent clients, {len(PATHS)} routes")
+    for name, url in (('wsgi', args.wsgi), ('asgi', args.asgi)):
+        run(url, args.concurrency, min(200, args.requests))  # warm up connections and pools
+        report(name, *run(url, args.concurrency, args.requests))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON encoding of list responses: previous path vs MongoJSONProvider.
+
+Previous path: clean_dict_for_json-style recursive walk (ObjectId -> str,
+datetime -> isoformat) followed by Flask's default stdlib json provider.
+New path: documents handed straight to the orjson-backed provider.
+
+Usage (from backend/): python scripts/bench_json.py [documents] [rounds]
+"""
+
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from shared.utils.json_provider import MongoJSONProvider
+
+def make_documents(count):
+    now = datetime.utcnow()
+    return [{
+        '_id': ObjectId(),
+        'name': f'Bó hoa hồng {i}',
+        'description': 'Hoa tươi nhập khẩu, giao trong ngày. ' * 4,
+        'price': 350000 + i,
+        'sale_price': Decimal128(f'{300000 + i}.50'),
+        'category': 'bo-hoa',
+        'images': [f'/images/sanpham/sanpham{i % 10}.png', f'/images/sanpham/sanpham{(i + 1) % 10}.png'],
+        'tags': ['hoa', 'hong', 'sinh-nhat'],
+        'is_active': True,
+        'created_at': now - timedelta(minutes=i),
+        'updated_at': now,
+        'variants': [{'size': s, 'price': 350000 + 50000 * n, 'created_at': now} for n, s in enumerate('SML')]
+    } for i in range(count)]
+
+def legacy_clean(data):
+    """The recursive walk clean_dict_for_json used before the provider existed"""
+    if isinstance(data, dict):
+        cleaned = {}
+        for key, value in data.items():
+            if isinstance(value, ObjectId):
+                cleaned[key] = str(value)
+            elif isinstance(value, datetime):
+                cleaned[key] = value.isoformat()
+            elif isinstance(value, Decimal128):
+                cleaned[key] = float(value.to_decimal())
+            elif isinstance(value, (dict, list)):
+                cleaned[key] = legacy_clean(value)
+            else:
+                cleaned[key] = value
+        return cleaned
+    if isinstance(data, list):
+        return [legacy_clean(item) for item in data]
+    return data
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    docs = make_documents(count)
+
+    legacy_app, new_app = Flask('legacy'), Flask('new')
+    legacy_app.json = DefaultJSONProvider(legacy_app)
+    new_app.json = MongoJSONProvider(new_app)
+
+    def legacy():
+        products = [{'id': str(d['_id']), **{k: v for k, v in d.items() if k != '_id'}} for d in docs]
+        with legacy_app.app_context():
+            return legacy_app.json.response({'success': True, 'data': {'products': legacy_clean(products)}}).get_data()
+
+    def provider():
+        products = [{'id': str(d['_id']), **{k: v for k, v in d.items() if k != '_id'}} for d in docs]
+        with new_app.app_context():
+            return new_app.json.response({'success': True, 'data': {'products': products}}).get_data()
+
+    print(f"🧪 {count} documents, {rounds} rounds")
+    results = {}
+    for name, fn in (('legacy (walk + stdlib json)', legacy), ('MongoJSONProvider (orjson)', provider)):
+        best = min(timeit.repeat(fn, number=rounds, repeat=3)) / rounds
+        results[name] = best
+        print(f"   {name:30s} {best * 1000:8.2f} ms/response  {len(fn()) / 1024:8.1f} KiB")
+    legacy_time, new_time = results.values()
+    print(f"⚡ Speedup: {legacy_time / new_time:.1f}x")
+
+if __name__ == '__main__':
+    main()
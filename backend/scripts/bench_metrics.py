@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Measure what request metrics cost per request in each METRICS_MODE.
+
+Times the before/after request hooks that register_metrics installs with
+metrics off, light and full (`off` still stamps the start time). Also times the
+MongoDB command listener (started + succeeded) per command, which only `full`
+installs.
+
+Usage (from backend/): python scripts/bench_metrics.py [requests]
+"""
+
+import os
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from pymongo import monitoring
+from core.config.config import Config
+from shared.utils.metrics import CommandMetrics
+import app as backend
+
+def per_request_us(mode, requests, rounds=5):
+    """Cost of the metrics request hooks alone (best of `rounds`), measured inside one request context"""
+    Config.METRICS_MODE = mode
+    app = Flask(__name__)
+    backend.register_metrics(app)
+    app.add_url_rule('/ping', 'ping', lambda: 'ok')
+    before = app.before_request_funcs.get(None, [])
+    after = app.after_request_funcs.get(None, [])
+    best = float('inf')
+    with app.test_request_context('/ping'):
+        response = app.make_response('ok')
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(requests):
+                for hook in before:
+                    hook()
+                for hook in after:
+                    hook(response)
+            best = min(best, (time.perf_counter() - started) / requests * 1e6)
+    return best
+
+def per_command_us(commands):
+    listener = CommandMetrics()
+    address = ('localhost', 27017)
+    started_event = monitoring.CommandStartedEvent({'find': 'products', 'filter': {}}, 'flower_shop', 1, address, None)
+    succeeded_event = monitoring.CommandSucceededEvent(timedelta(microseconds=1500), {'ok': 1}, 'find', 1, address, None)
+    started = time.perf_counter()
+    for _ in range(commands):
+        listener.started(started_event)
+        listener.succeeded(succeeded_event)
+    return (time.perf_counter() - started) / commands * 1e6
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    mode = Config.METRICS_MODE
+    for name in ('off', 'light', 'full'):
+        print(f"⏱️  {name:5} {per_request_us(name, requests):6.2f} µs/request")
+    print(f"🗄️  command listener {per_command_us(requests * 5):.2f} µs/command (full only)")
+    Config.METRICS_MODE = mode
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Backfill slugs and pre-rendered content for blog posts.
+
+Posts written before slugs existed have no `slug`, `content_html`, `toc`,
+`reading_time` or generated excerpt; they are still readable by id but not by
+slug. This computes those fields the way Blog.create_blog does. Existing slugs
+are kept, so links stay valid.
+
+Usage (from backend/): python scripts/build_blog_content.py [--all]
+  --all  re-render every post (default: only posts without a slug or content_html)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+from core.config.config import Config
+from modules.blog.models.blog import Blog
+from shared.utils.indexes import ensure_indexes
+from shared.utils.richtext import slugify
+
+def main(args):
+    client = MongoClient(Config.MONGODB_URI)
+    db = client[Config.DATABASE_NAME]
+    blog_model = Blog(db)
+    query = {} if '--all' in args else {'$or': [{'slug': {'$exists': False}}, {'content_html': {'$exists': False}}]}
+    print(f"📝 Rendering blog content in {Config.DATABASE_NAME}")
+    updated = 0
+    for blog in blog_model.collection.find(query, {'title': 1, 'slug': 1, 'content': 1, 'excerpt': 1}):
+        # Excerpts cut from the raw HTML (mid-tag) are replaced by generated ones, plain text ones are kept
+        excerpt = blog.get('excerpt') or ''
+        fields = blog_model.rendered_fields(blog.get('content'), '' if '<' in excerpt else excerpt)
+        if not blog.get('slug'):
+            fields['slug'] = blog_model.unique_slug(slugify(blog.get('title')) or 'bai-viet', blog['_id'])
+        blog_model.collection.update_one({'_id': blog['_id']}, {'$set': fields})
+        updated += 1
+    for name, created in ensure_indexes(db, {Blog.COLLECTION: Blog.INDEXES}).items():
+        print(f"🛠️  {name}: {', '.join(created)}")
+    print(f"✅ {updated} posts updated")
+    client.close()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Backfill search tokens for products, blogs and users.
+
+Documents created before search indexing existed have no `search_tokens`
+and are invisible to searches until this runs once.
+
+Usage (from backend/): python scripts/build_search_index.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+from core.config.config import Config
+from shared.utils.search import reindex
+
+# collection -> (title field used for ranking, other searchable fields)
+SEARCHABLE = {
+    'products': ('name', ['description']),
+    'blogs': ('title', ['excerpt', 'content', 'tags']),
+    'users': ('full_name', ['email', 'phone']),
+}
+
+def main():
+    client = MongoClient(Config.MONGODB_URI)
+    db = client[Config.DATABASE_NAME]
+    print(f"🔎 Building search tokens in {Config.DATABASE_NAME}")
+    for name, (title_field, other_fields) in SEARCHABLE.items():
+        db[name].create_index('search_tokens')
+        updated = reindex(db[name], title_field, other_fields)
+        print(f"✅ {name}: {updated} documents updated")
+    client.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Generate the resized image variants of existing products.
+
+Products created or updated through the API get their variants in the
+background; this covers products that predate the pipeline, came in through
+the bulk import, or whose variants failed. Sources and variants already in
+IMAGE_CACHE_DIR are reused, so re-running it is cheap.
+
+Usage (from backend/): python scripts/generate_image_variants.py [--all]
+  --all  every product with images (default: only those missing variants)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+from core.config.config import Config
+from shared.utils.images import image_pipeline
+
+def main(args):
+    client = MongoClient(Config.MONGODB_URI)
+    collection = client[Config.DATABASE_NAME].products
+    image_pipeline.configure(Config.IMAGE_CACHE_DIR, Config.IMAGE_SOURCE_ROOT, Config.IMAGE_URL_PREFIX, Config.IMAGE_WORKERS,
+                             max_source_bytes=Config.IMAGE_MAX_SOURCE_MB * 1024 * 1024,
+                             fetch_timeout=Config.IMAGE_FETCH_TIMEOUT, quality=Config.IMAGE_QUALITY,
+                             allowed_hosts=Config.IMAGE_ALLOWED_HOSTS)
+    query = {'images.0': {'$exists': True}}
+    if '--all' not in args:
+        # Matches a missing field as well as an array with a failed (None) entry
+        query['image_variants'] = None
+    print(f"🖼️  Generating image variants in {Config.IMAGE_CACHE_DIR}")
+    products = failed = 0
+    for product in collection.find(query, {'images': 1}).batch_size(100):
+        entries = image_pipeline.generate(collection, product['_id'], product['images'])
+        products += 1
+        failed += entries.count(None)
+    print(f"✅ {products} products, {failed} images failed (see warnings above)")
+    image_pipeline.shutdown()
+    client.close()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Explain every model's canonical queries and flag collection scans.
+
+Each model declares the queries its routes run (QUERIES: filter, sort and
+optionally limit) next to its indexes (INDEXES). This lists declared indexes missing on the server, then runs
+explain() on every query and prints the plan, the indexes used and how many
+keys/documents were examined. Run it against a staging copy before deploying;
+with --strict it exits 1 when a query scans a collection or an index is missing.
+
+Usage (from backend/): python scripts/index_report.py [--ensure] [--strict]
+  --ensure  create the declared indexes first
+  --strict  non-zero exit code on COLLSCAN or missing indexes (for CI)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+from core.config.config import Config
+from core.database.registry import index_registry, canonical_queries
+from shared.utils.indexes import ensure_indexes, missing_indexes, explain_query
+
+def main(args):
+    client = MongoClient(Config.MONGODB_URI)
+    db = client[Config.DATABASE_NAME]
+    registry = index_registry()
+    print(f"🔎 Index report for {Config.DATABASE_NAME}")
+
+    if '--ensure' in args:
+        for name, created in ensure_indexes(db, registry).items():
+            print(f"🛠️  {name}: {', '.join(created)}")
+
+    missing = missing_indexes(db, registry)
+    for name, keys in missing.items():
+        print(f"⚠️  {name}: missing {keys}")
+
+    scans = 0
+    for collection, name, query, sort, limit in canonical_queries():
+        plan = explain_query(db[collection], query, sort, limit)
+        if plan['collscan']:
+            scans += 1
+            mark = '❌ COLLSCAN'
+        elif plan['in_memory_sort']:
+            mark = '⚠️  SORT'
+        else:
+            mark = '✅'
+        print(f"{mark} {collection}.{name}: {' <- '.join(plan['stages'])} "
+              f"indexes={plan['indexes'] or '-'} keys={plan['keys_examined']} "
+              f"docs={plan['docs_examined']} returned={plan['returned']} ms={plan['millis']}")
+
+    print(f"📊 {scans} collection scans, {sum(len(k) for k in missing.values())} missing indexes")
+    client.close()
+    if '--strict' in args and (scans or missing):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
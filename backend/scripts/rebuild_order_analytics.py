@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Rebuild the hourly order analytics buckets (order_buckets) from the orders collection.
+
+The buckets are updated incrementally when orders are created or change status;
+run this once to backfill existing orders, and whenever orders were written
+outside the models (imports, manual fixes). --since only rebuilds the buckets
+from that UTC date on, leaving older ones untouched.
+
+Usage (from backend/): python scripts/rebuild_order_analytics.py [--since YYYY-MM-DD]
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+from core.config.config import Config
+from modules.stats.models.analytics import OrderAnalytics
+
+def main(args):
+    since = datetime.fromisoformat(args[args.index('--since') + 1]) if '--since' in args else None
+    client = MongoClient(Config.MONGODB_URI)
+    print(f"📈 Rebuilding order analytics in {Config.DATABASE_NAME}" + (f" from {since:%Y-%m-%d}" if since else ""))
+    buckets = OrderAnalytics(client[Config.DATABASE_NAME]).rebuild(since)
+    print(f"✅ {buckets} hourly buckets written")
+    client.close()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
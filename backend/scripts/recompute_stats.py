@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Reconcile the dashboard rollup (stats_rollup) with the users and orders collections.
+
+The rollup is maintained incrementally on every write; run this from cron (e.g. nightly)
+to correct drift from writes made outside the models. It also stores today's snapshot.
+
+Usage (from backend/): python scripts/recompute_stats.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+from core.config.config import Config
+from modules.stats.models.rollup import StatsRollup
+
+def main():
+    client = MongoClient(Config.MONGODB_URI)
+    totals = StatsRollup(client[Config.DATABASE_NAME]).recompute()
+    print(f"📊 Users: {totals['users_total']} (active {totals['users_active']}, admin {totals['users_admin']})")
+    print(f"📦 Orders: {totals['orders_total']} {totals['orders_by_status']}")
+    print(f"💰 Revenue: {totals['revenue_by_status']}")
+    client.close()
+
+if __name__ == '__main__':
+    main()
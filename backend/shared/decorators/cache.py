@@ -0,0 +1,37 @@
+from functools import wraps
+import hashlib
+from flask import request, current_app
+from core.config.config import Config
+from shared.utils.cache import TaggedCache
+
+# Public catalog responses, per process. Admin writes invalidate by tag; other
+# workers converge within RESPONSE_CACHE_TTL seconds.
+response_cache = TaggedCache(Config.RESPONSE_CACHE_SIZE, Config.RESPONSE_CACHE_TTL)
+
+def cached_response(*tags):
+    """Cache a GET JSON response by path and query string, with a strong ETag.
+
+    `tags` are format strings filled from the view arguments, e.g. 'products:{product_id}'.
+    Conditional requests (If-None-Match) are answered with 304 from the cache.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            entry = response_cache.get(key)
+            if entry is None:
+                entry_tags = [tag.format(**kwargs) for tag in tags]
+                snapshot = response_cache.snapshot(entry_tags)
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                entry = (body, response.mimetype, hashlib.sha1(body).hexdigest())
+                response_cache.set(key, entry, entry_tags, snapshot)
+            body, mimetype, etag = entry
+            response = current_app.response_class(body, mimetype=mimetype)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = f'public, max-age={Config.RESPONSE_CACHE_MAX_AGE}'
+            return response.make_conditional(request)
+        return decorated
+    return decorator
@@ -0,0 +1,55 @@
+from functools import wraps
+import math
+from flask import request, jsonify, current_app
+from core.config.config import Config
+from shared.utils.ratelimit import RateLimiter, TokenBuckets, SharedTokenBuckets
+
+def create_backend():
+    """Bucket store from RATE_LIMIT_BACKEND: per process (memory) or per host (shared)"""
+    if Config.RATE_LIMIT_BACKEND == 'shared':
+        return SharedTokenBuckets(Config.RATE_LIMIT_SHARED_NAME, Config.RATE_LIMIT_SHARED_SLOTS)
+    return TokenBuckets(Config.RATE_LIMIT_MAX_KEYS)
+
+# Rules for the CPU-heavy auth routes (bcrypt / JWT), "count/seconds" each
+rate_limiter = RateLimiter(create_backend(), {
+    'login_ip': Config.RATE_LIMIT_LOGIN_IP,
+    'login_account': Config.RATE_LIMIT_LOGIN_ACCOUNT,
+    'register_ip': Config.RATE_LIMIT_REGISTER_IP,
+    'change_password_ip': Config.RATE_LIMIT_CHANGE_PASSWORD_IP,
+    'change_password_account': Config.RATE_LIMIT_CHANGE_PASSWORD_ACCOUNT,
+    'refresh_token_ip': Config.RATE_LIMIT_REFRESH_TOKEN_IP
+}, enabled=Config.RATE_LIMIT_ENABLED)
+
+def client_ip(*args, **kwargs):
+    """REMOTE_ADDR, set from X-Forwarded-For by ProxyFix only for TRUSTED_PROXY_COUNT hops (a client can send any XFF)"""
+    return request.remote_addr
+
+def json_email(*args, **kwargs):
+    """Account named in the request body (login), folded like stored emails"""
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+def current_user_id(current_user, *args, **kwargs):
+    """Account of the authenticated user (below token_required)"""
+    return str(current_user['_id'])
+
+def rate_limited(*rules):
+    """Reject with 429 and Retry-After once any (rule, key function) pair runs out of tokens.
+
+    Key functions receive the view's arguments and return the bucket key (None
+    skips the rule). Rules are checked in order and every allowed check spends
+    a token, so put the cheapest, broadest key first.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            for rule, key in rules:
+                retry_after = rate_limiter.check(rule, key(*args, **kwargs))
+                if retry_after:
+                    current_app.logger.warning(f'Rate limited {request.path} ({rule}) for {request.remote_addr}')
+                    response = jsonify({'message': 'Bạn đã thử quá nhiều lần, vui lòng thử lại sau', 'success': False})
+                    return response, 429, {'Retry-After': str(max(1, math.ceil(retry_after)))}
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
@@ -0,0 +1,120 @@
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from pymongo.errors import PyMongoError
+
+class ActivityLog:
+    """Activity events buffered in memory and written to MongoDB in batches.
+
+    `record` appends to a bounded ring buffer and returns without I/O; a daemon
+    thread drains it with one `insert_many` per batch, every `flush_interval`
+    seconds or as soon as a batch is full. When the buffer is full, `record`
+    waits up to `block_timeout` seconds for the writer (backpressure) and then
+    drops the event rather than stall the request. Events recorded before
+    `start` (no collection yet) are kept and written once it is called.
+    """
+
+    def __init__(self, capacity=10000, batch_size=500, flush_interval=1.0, block_timeout=0.05, logger=None):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.logger = logger
+        self.collection = None
+        self._reset()
+        # The writer thread does not survive a fork, and the parent's events are the parent's to write
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._thread = None
+        self._pid = os.getpid()
+        self._counts = {'recorded': 0, 'written': 0, 'dropped': 0, 'flushes': 0, 'failed_flushes': 0}
+
+    def configure(self, capacity=None, batch_size=None, flush_interval=None, block_timeout=None, logger=None):
+        with self._lock:
+            self.capacity = capacity or self.capacity
+            self.batch_size = batch_size or self.batch_size
+            self.flush_interval = flush_interval or self.flush_interval
+            self.block_timeout = self.block_timeout if block_timeout is None else block_timeout
+            self.logger = logger or self.logger
+
+    def start(self, collection):
+        """Write to `collection` from a writer thread (once per process)"""
+        with self._lock:
+            self.collection = collection
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name='activity-log-writer', daemon=True)
+            self._thread.start()
+        # What is still buffered at interpreter exit is written on the way out
+        atexit.register(self.flush)
+
+    def record(self, event):
+        """Queue one event, returns False when it was dropped because the buffer stayed full"""
+        with self._lock:
+            if len(self._buffer) >= self.capacity:
+                self._not_empty.notify()
+                deadline = time.monotonic() + self.block_timeout
+                while len(self._buffer) >= self.capacity:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._not_full.wait(remaining):
+                        self._counts['dropped'] += 1
+                        return False
+            self._buffer.append(event)
+            self._counts['recorded'] += 1
+            if len(self._buffer) >= self.batch_size:
+                self._not_empty.notify()
+            return True
+
+    def _take(self, wait):
+        with self._lock:
+            if wait and len(self._buffer) < self.batch_size:
+                self._not_empty.wait(self.flush_interval)
+            if self.collection is None:
+                return []
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            if batch:
+                self._not_full.notify_all()
+            return batch
+
+    def _write(self, batch):
+        try:
+            self.collection.insert_many(batch, ordered=False)
+        except PyMongoError as e:
+            # A failed batch is dropped: the log must not grow without bound while MongoDB is down
+            with self._lock:
+                self._counts['failed_flushes'] += 1
+                self._counts['dropped'] += len(batch)
+            if self.logger:
+                self.logger.warning(f'Activity log flush failed, {len(batch)} events dropped: {e}')
+            return
+        with self._lock:
+            self._counts['flushes'] += 1
+            self._counts['written'] += len(batch)
+
+    def _run(self):
+        while True:
+            batch = self._take(wait=True)
+            if batch:
+                self._write(batch)
+
+    def flush(self):
+        """Write everything buffered now, on the calling thread (tests, shutdown)"""
+        while True:
+            batch = self._take(wait=False)
+            if not batch:
+                return
+            self._write(batch)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts, buffered=len(self._buffer), capacity=self.capacity)
+
+# Shared by the whole process, started by the app once MongoDB is connected
+activity_log = ActivityLog()
@@ -0,0 +1,28 @@
+"""Async (motor) counterparts of the query helpers in pagination.py and search.py.
+
+Query construction is shared with the sync helpers; only the round trips differ.
+"""
+
+from shared.utils.pagination import keyset_query, split_page, count_cache_key, _count_cache
+from shared.utils.search import ranked_search_pipeline, SEARCH_CANDIDATES
+
+async def keyset_page(collection, query, limit, cursor=None, field='created_at', projection=None):
+    """Fetch one page sorted on (field, _id) descending, returns (docs, next_cursor)"""
+    query, projection = keyset_query(query, cursor, field, projection)
+    docs = await collection.find(query, projection).sort([(field, -1), ('_id', -1)]).limit(limit + 1).to_list(None)
+    return split_page(docs, limit, field)
+
+async def cached_count(collection, query):
+    """Total for a listing: metadata estimate when unfiltered, otherwise a briefly cached count"""
+    if not query:
+        return await collection.estimated_document_count()
+    key = count_cache_key(collection, query)
+    total = _count_cache.get(key)
+    if total is None:
+        total = await collection.count_documents(query)
+        _count_cache.set(key, total)
+    return total
+
+async def ranked_search(collection, query, term, skip=0, limit=20, projection=None, candidates=SEARCH_CANDIDATES):
+    """Matches sorted by relevance (query words found in the title), newest first on ties, of the newest `candidates`"""
+    return await collection.aggregate(ranked_search_pipeline(query, term, skip, limit, projection, candidates)).to_list(None)
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+from itertools import islice
+
+FORMATS = ('csv', 'ndjson')
+
+class RowLimitExceeded(Exception):
+    """Raised by iter_rows when an upload has more than `max_rows` rows, callers answer 413"""
+
+def detect_format(requested=None, content_type='', filename=''):
+    """'csv' or 'ndjson' from ?format=, the upload's file name or its content type (raises ValueError)"""
+    fmt = (requested or '').lower()
+    if not fmt:
+        name, mimetype = (filename or '').lower(), (content_type or '').lower()
+        if name.endswith('.csv') or 'csv' in mimetype:
+            fmt = 'csv'
+        elif name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in mimetype or 'jsonl' in mimetype:
+            fmt = 'ndjson'
+    if fmt not in FORMATS:
+        raise ValueError('Unknown upload format, use ?format=csv or ?format=ndjson')
+    return fmt
+
+def iter_rows(stream, fmt, max_rows=None):
+    """Yield (line, row dict or ValueError) from a binary stream, reading it incrementally.
+
+    `line` is the 1-based data line (the CSV header is line 0). A malformed
+    line is yielded as its error instead of stopping the import; more than
+    `max_rows` rows raises RowLimitExceeded. An upload that is not UTF-8 raises
+    UnicodeDecodeError and a broken CSV (unterminated quote, NUL byte) csv.Error.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='' if fmt == 'csv' else None)
+    rows = _csv_rows(text) if fmt == 'csv' else _ndjson_rows(text)
+    for count, (line, row) in enumerate(rows, 1):
+        if max_rows and count > max_rows:
+            raise RowLimitExceeded(f'Upload has more than {max_rows} rows')
+        yield line, row
+
+def _csv_rows(text):
+    reader = csv.DictReader(text)
+    for line, row in enumerate(reader, 1):
+        if None in row:
+            yield line, ValueError('Too many columns')
+        else:
+            yield line, {key.strip(): (value or '').strip() for key, value in row.items() if key}
+
+def _ndjson_rows(text):
+    line = 0
+    for raw in text:
+        if not raw.strip():
+            continue
+        line += 1
+        try:
+            row = json.loads(raw)
+        except ValueError as e:
+            yield line, ValueError(f'Invalid JSON: {e}')
+            continue
+        yield line, row if isinstance(row, dict) else ValueError('Each line must be a JSON object')
+
+def batched(iterable, size):
+    """Lists of up to `size` items; if the iterable raises, the items read before it come first"""
+    iterator = iter(iterable)
+    while True:
+        batch = []
+        try:
+            batch.extend(islice(iterator, size))
+        except Exception as e:
+            if batch:
+                yield batch
+            raise e
+        if not batch:
+            return
+        yield batch
+
+class BulkReport:
+    """Per-row outcome of a bulk operation, keeping at most `max_errors` error details"""
+
+    def __init__(self, max_errors=1000):
+        self.max_errors = max_errors
+        self.counts = {'rows': 0, 'inserted': 0, 'updated': 0, 'failed': 0}
+        self.errors = []
+
+    def fail(self, line, error):
+        self.counts['failed'] += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'error': str(error)})
+
+    def to_dict(self):
+        return dict(self.counts, errors=self.errors, errors_truncated=self.counts['failed'] > len(self.errors))
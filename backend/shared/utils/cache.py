@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[1] if entry else None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+class TaggedCache:
+    """TTLCache whose entries carry tags, so writers can drop exactly the entries they affect.
+
+    Each tag has a generation number bumped by `invalidate`. A reader takes a
+    `snapshot` of its tags before computing a value and passes it to `set`; if any
+    tag was invalidated meanwhile the stale value is not stored.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self._cache = TTLCache(maxsize, ttl)
+        self._tags = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def snapshot(self, tags):
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def set(self, key, value, tags, snapshot=None):
+        with self._lock:
+            if snapshot is not None and snapshot != tuple(self._generations.get(tag, 0) for tag in tags):
+                return False
+            for tag in tags:
+                keys = self._tags.setdefault(tag, set())
+                keys.add(key)
+                if len(keys) > self._cache.maxsize:
+                    # Forget keys the LRU already evicted
+                    self._tags[tag] = {k for k in keys if k in self._cache}
+            self._cache.set(key, value)
+        return True
+
+    def invalidate(self, *tags):
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                keys.update(self._tags.pop(tag, ()))
+        for key in keys:
+            self._cache.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._tags.clear()
+            self._generations.clear()
+        self._cache.clear()
+
+    def stats(self):
+        return dict(self._cache.stats(), tags=len(self._tags))
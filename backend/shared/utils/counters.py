@@ -0,0 +1,58 @@
+import os
+import threading
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+class BlockCounter:
+    """Unique, increasing sequence backed by the `counters` collection (hi/lo allocation).
+
+    Each process reserves `block_size` numbers with a single atomic `$inc` and hands
+    them out from memory, so only one call in `block_size` touches MongoDB. Numbers are
+    unique across threads and processes; a process that exits with part of its block
+    unused leaves a gap in the sequence.
+    """
+
+    def __init__(self, db, name, block_size=20, seed=None):
+        self.collection = db.counters
+        self.name = name
+        self.block_size = max(1, int(block_size))
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = 1
+        self._high = 0
+        self._seeded = False
+
+    def next(self):
+        """Return the next number of the sequence"""
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked worker must never reuse the block reserved by its parent
+                self._pid = os.getpid()
+                self._next, self._high = 1, 0
+            if self._next > self._high:
+                self._reserve()
+            value = self._next
+            self._next += 1
+            return value
+
+    def _reserve(self):
+        if not self._seeded:
+            self._ensure_seed()
+        doc = self.collection.find_one_and_update(
+            {'_id': self.name},
+            {'$inc': {'seq': self.block_size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._high = doc['seq']
+        self._next = self._high - self.block_size + 1
+
+    def _ensure_seed(self):
+        """Start the sequence after existing data the first time the counter is created"""
+        if self.seed and self.collection.find_one({'_id': self.name}, {'_id': 1}) is None:
+            try:
+                self.collection.update_one({'_id': self.name}, {'$setOnInsert': {'seq': int(self.seed())}}, upsert=True)
+            except DuplicateKeyError:
+                pass  # another process created it first
+        self._seeded = True
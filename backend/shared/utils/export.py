@@ -0,0 +1,71 @@
+import csv
+import io
+from datetime import datetime
+from flask import Response, current_app, stream_with_context
+from shared.utils.json_provider import dumps_bytes
+
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+# Rows are written to the client in chunks of about this many bytes
+CHUNK_SIZE = 64 * 1024
+
+def csv_value(value):
+    """One CSV cell: ISO dates, lists joined with | (as the product import reads them), no formulas"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, tuple)):
+        return '|'.join(str(csv_value(item)) for item in value)
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        # Spreadsheets would evaluate the cell as a formula
+        return "'" + value
+    return value
+
+def ndjson_chunks(rows):
+    buffer = bytearray()
+    for row in rows:
+        buffer += dumps_bytes(row)
+        buffer += b'\n'
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+def csv_chunks(rows, columns):
+    # The BOM lets Excel read the Vietnamese text as UTF-8
+    text = io.StringIO()
+    text.write('\ufeff')
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([csv_value(row.get(column)) for column in columns])
+        if text.tell() >= CHUNK_SIZE:
+            yield text.getvalue().encode('utf-8')
+            text.seek(0)
+            text.truncate()
+    yield text.getvalue().encode('utf-8')
+
+def export_response(rows, fmt, columns, name):
+    """Stream `rows` (an iterator, typically over a Mongo cursor) as an NDJSON or CSV download.
+
+    Memory stays at one cursor batch plus one chunk whatever the export size.
+    NDJSON writes every field of each row, CSV only `columns`. A failure
+    mid-export can only truncate the body, so it is logged here.
+    """
+    chunks = ndjson_chunks(rows) if fmt == 'ndjson' else csv_chunks(rows, columns)
+    def generate():
+        try:
+            yield from chunks
+        except Exception as e:
+            current_app.logger.error(f'Export {name} failed mid-stream: {e}')
+            raise
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    return Response(stream_with_context(generate()), mimetype=EXPORT_FORMATS[fmt], headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store',
+        # Let nginx pass chunks through instead of buffering the whole export
+        'X-Accel-Buffering': 'no'
+    })
@@ -0,0 +1,82 @@
+import platform
+import threading
+import time
+from datetime import datetime
+from pymongo.errors import PyMongoError
+
+class DependencyStatus:
+    """Last known MongoDB state, refreshed off the request path so probes never wait on the database.
+
+    A status older than three refresh intervals counts as stale: the monitor is
+    stuck behind a slow ping, which readiness treats like a failure.
+    """
+
+    def __init__(self, interval=5):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._state = {
+            'status': 'unknown', 'latency_ms': None, 'checked_at': None,
+            'last_error': None, 'last_error_at': None, 'consecutive_failures': 0
+        }
+        self._checked = None
+
+    def record_success(self, latency_ms):
+        with self._lock:
+            self._state.update(status='up', latency_ms=round(latency_ms, 2), checked_at=datetime.utcnow(), consecutive_failures=0)
+            self._checked = time.monotonic()
+
+    def record_failure(self, error):
+        with self._lock:
+            now = datetime.utcnow()
+            self._state.update(status='down', latency_ms=None, checked_at=now, last_error=str(error)[:500], last_error_at=now)
+            self._state['consecutive_failures'] += 1
+            self._checked = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            state = dict(self._state)
+            checked = self._checked
+        state['age_seconds'] = round(time.monotonic() - checked, 1) if checked is not None else None
+        state['stale'] = checked is None or state['age_seconds'] > 3 * self.interval
+        return state
+
+    def ready(self):
+        state = self.snapshot()
+        return state['status'] == 'up' and not state['stale']
+
+def ping(client):
+    """Round trip to the server in milliseconds"""
+    started = time.perf_counter()
+    client.admin.command('ping')
+    return (time.perf_counter() - started) * 1000
+
+def start_monitor(client, status, logger=None):
+    """Ping on a daemon thread every `status.interval` seconds (one per process, started after connecting)"""
+    def run():
+        while True:
+            try:
+                status.record_success(ping(client))
+            except PyMongoError as e:
+                if logger and status.snapshot()['consecutive_failures'] == 0:
+                    logger.warning(f'MongoDB health check failed: {e}')
+                status.record_failure(e)
+            time.sleep(status.interval)
+
+    thread = threading.Thread(target=run, name='dependency-monitor', daemon=True)
+    thread.start()
+    return thread
+
+def build_info(version, commit='', built_at='', build_file=None):
+    """Version and build of the running code, the commit falls back to the first line of `build_file`"""
+    if not commit and build_file:
+        try:
+            with open(build_file) as f:
+                commit = f.readline().strip()
+        except OSError:
+            commit = ''
+    return {
+        'version': version,
+        'commit': commit or 'unknown',
+        'built_at': built_at or None,
+        'python': platform.python_version()
+    }
@@ -2,6 +2,9 @@ import re
 from datetime import datetime, timezone
 from bson import ObjectId
 import json
+from shared.utils.search import build_search_query
+from shared.utils.json_provider import to_jsonable
+from shared.utils.activity import activity_log
 
 def is_valid_email(email):
     """Validate email format"""
@@ -28,24 +31,8 @@ def serialize_objectid(obj):
 
 def clean_dict_for_json(data):
     """Clean dictionary for JSON serialization"""
-    if isinstance(data, dict):
-        cleaned = {}
-        for key, value in data.items():
-            if isinstance(value, ObjectId):
-                cleaned[key] = str(value)
-            elif isinstance(value, datetime):
-                cleaned[key] = value.isoformat()
-            elif isinstance(value, dict):
-                cleaned[key] = clean_dict_for_json(value)
-            elif isinstance(value, list):
-                cleaned[key] = [clean_dict_for_json(item) if isinstance(item, dict) else serialize_objectid(serialize_datetime(item)) for item in value]
-            else:
-                cleaned[key] = value
-        return cleaned
-    elif isinstance(data, list):
-        return [clean_dict_for_json(item) if isinstance(item, dict) else serialize_objectid(serialize_datetime(item)) for item in data]
-    else:
-        return serialize_objectid(serialize_datetime(data))
+    # One native pass through the app's JSON encoder instead of a recursive Python walk
+    return to_jsonable(data)
 
 def validate_password_strength(password):
     """Validate password strength"""
@@ -153,48 +140,34 @@ def paginate_query(collection, query, page=1, per_page=20, sort_field='created_a
             'error': str(e)
         }
 
-def create_search_query(search_term, fields):
-    """Create MongoDB search query for multiple fields"""
-    if not search_term or not fields:
+def create_search_query(search_term, fields=None):
+    """Create MongoDB search query for multiple fields
+    
+    Matches the maintained `search_tokens` index (diacritic-folded words of the
+    searchable fields, see shared.utils.search) instead of one regex per field.
+    `fields` is kept for compatibility, the fields are chosen when tokens are written.
+    """
+    if not search_term:
         return {}
     
-    search_conditions = []
-    for field in fields:
-        search_conditions.append({
-            field: {
-                '$regex': search_term,
-                '$options': 'i'  # Case insensitive
-            }
-        })
-    
-    return {'$or': search_conditions}
+    return build_search_query(search_term)
 
 def get_client_ip(request):
-    """Get client IP address from request"""
-    # Check for forwarded IP (when behind proxy)
-    forwarded_ip = request.headers.get('X-Forwarded-For')
-    if forwarded_ip:
-        return forwarded_ip.split(',')[0].strip()
-    
-    # Check for real IP
-    real_ip = request.headers.get('X-Real-IP')
-    if real_ip:
-        return real_ip
-    
-    # Fallback to remote address
+    """Get client IP address from request (X-Forwarded-For is applied by ProxyFix for TRUSTED_PROXY_COUNT hops only)"""
     return request.remote_addr
 
-def log_user_activity(user_id, action, details=None, ip_address=None):
-    """Log user activity (placeholder for future implementation)"""
-    activity_log = {
-        'user_id': user_id,
+def log_user_activity(user_id, action, details=None, ip_address=None, user_name=None):
+    """Record a user activity event (buffered, written to the activity_log collection in batches)"""
+    activity_log_entry = {
+        'user_id': str(user_id) if user_id else None,
+        'user_name': user_name,
         'action': action,
         'details': details,
         'ip_address': ip_address,
         'timestamp': datetime.utcnow()
     }
     
-    # TODO: Implement activity logging to database
-    print(f"User Activity: {activity_log}")
+    # A copy: insert_many adds _id to the documents it writes, on the writer thread
+    activity_log.record(dict(activity_log_entry))
     
-    return activity_log 
\ No newline at end of file
+    return activity_log_entry 
\ No newline at end of file
@@ -0,0 +1,255 @@
+import hashlib
+import ipaddress
+import logging
+import os
+import re
+import socket
+import tempfile
+import threading
+from urllib.parse import urljoin, urlsplit
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from bson import ObjectId
+from pymongo import ReadPreference
+from PIL import Image, ImageOps, UnidentifiedImageError
+import requests
+
+# Variant name -> longest side in pixels (never upscaled)
+VARIANTS = {'card': 400, 'detail': 1000, 'zoom': 2000}
+# Extension -> (Pillow format, mimetype, save options besides quality)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'optimize': True, 'progressive': True})
+}
+DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+# Redirects are followed by hand, each target checked like the original URL
+MAX_REDIRECTS = 3
+
+def _render(source, targets, quality):
+    """Process pool job: decode `source` once, write each (path, size, ext) target, largest first"""
+    with Image.open(source) as image:
+        largest = max(size for _, size, _ in targets)
+        # JPEG sources decode at a reduced scale when the variants allow it, much cheaper than full size
+        image.draft('RGB', (largest, largest))
+        current = ImageOps.exif_transpose(image)
+        for path, size, ext in sorted(targets, key=lambda target: -target[1]):
+            if max(current.size) > size:
+                # Each variant is resized from the previous, larger one
+                current = current.copy()
+                current.thumbnail((size, size), Image.Resampling.LANCZOS)
+            variant = current
+            if ext == 'jpg' and variant.mode != 'RGB':
+                variant = _flatten(variant)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as out:
+                variant.save(out, FORMATS[ext][0], quality=quality, **FORMATS[ext][2])
+            os.replace(tmp, path)
+
+def _flatten(image):
+    """RGB for JPEG: transparent areas become white"""
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+class ImagePipeline:
+    """Resized WebP/JPEG variants of product images in a content-addressed disk cache.
+
+    Sources (http(s) URLs, or site paths such as /images/x.jpg read from
+    `source_root`) are stored under their SHA-256 and every variant file is
+    named after that hash, its variant and format, so a file never changes once
+    written and can be cached by clients forever. Resizing runs in a pool of
+    `workers` processes (created lazily per process; 0 renders inline);
+    `submit` queues a product's images on a background thread, at most
+    `max_pending` products at a time.
+
+    Remote sources are fetched server-side, so only http(s) URLs whose host
+    resolves to public addresses are fetched (and only `allowed_hosts`, when
+    set; the allowlist also rules out DNS rebinding between the check and
+    the request).
+    """
+
+    def __init__(self, cache_dir='image_cache', source_root='', url_prefix='/api/images', workers=2, max_pending=256,
+                 max_source_bytes=20 * 1024 * 1024, fetch_timeout=10, quality=80, render_timeout=60, logger=None,
+                 allowed_hosts=()):
+        self.configure(cache_dir, source_root, url_prefix, workers, max_pending, max_source_bytes, fetch_timeout,
+                       quality, render_timeout, logger, allowed_hosts)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._pool = self._jobs = None
+        self._pending = 0
+
+    def configure(self, cache_dir, source_root='', url_prefix='/api/images', workers=2, max_pending=256,
+                  max_source_bytes=20 * 1024 * 1024, fetch_timeout=10, quality=80, render_timeout=60, logger=None,
+                  allowed_hosts=()):
+        self.cache_dir = cache_dir
+        self.source_root = source_root
+        self.url_prefix = url_prefix.rstrip('/')
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_source_bytes = max_source_bytes
+        self.fetch_timeout = fetch_timeout
+        self.quality = quality
+        self.render_timeout = render_timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self.allowed_hosts = {host.strip().lower() for host in allowed_hosts if host.strip()}
+
+    def _executors(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked child: the parent's pools and counters are not ours
+                self._pool = self._jobs = None
+                self._pending, self._pid = 0, os.getpid()
+            if self._jobs is None:
+                self._jobs = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-pipeline')
+            if self._pool is None and self.workers:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool, self._jobs
+
+    def source_path(self, digest):
+        return os.path.join(self.cache_dir, 'sources', digest[:2], digest)
+
+    def variant_path(self, digest, variant, ext):
+        return os.path.join(self.cache_dir, 'variants', digest[:2], f'{digest}-{VARIANTS[variant]}.{ext}')
+
+    def variant_urls(self, digest, ext='webp'):
+        return {variant: f'{self.url_prefix}/{digest}/{variant}.{ext}' for variant in VARIANTS}
+
+    def check_url(self, url):
+        """Raise ValueError unless `url` is http(s) on an allowed host that resolves to public addresses only"""
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        if parts.scheme not in ('http', 'https') or not host:
+            raise ValueError(f'Unsupported image URL: {url}')
+        if self.allowed_hosts and host not in self.allowed_hosts:
+            raise ValueError(f'{host} is not an allowed image host')
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        for *_, address in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP):
+            ip = ipaddress.ip_address(address[0].split('%')[0])
+            if not ip.is_global or ip.is_multicast:
+                raise ValueError(f'{host} resolves to a non-public address ({ip})')
+
+    def _download(self, url):
+        for _ in range(MAX_REDIRECTS + 1):
+            self.check_url(url)
+            with requests.get(url, stream=True, timeout=self.fetch_timeout, allow_redirects=False) as response:
+                if response.is_redirect:
+                    url = urljoin(url, response.headers['Location'])
+                    continue
+                response.raise_for_status()
+                data = bytearray()
+                for chunk in response.iter_content(64 * 1024):
+                    data += chunk
+                    if len(data) > self.max_source_bytes:
+                        raise ValueError(f'{url} is larger than {self.max_source_bytes} bytes')
+                return data
+        raise ValueError(f'Too many redirects for {url}')
+
+    def fetch(self, url):
+        """Store the source image in the cache, returns its SHA-256 (raises ValueError, OSError, RequestException)"""
+        if url.startswith(('http://', 'https://')):
+            data = self._download(url)
+        elif url.startswith('/') and self.source_root:
+            root = os.path.realpath(self.source_root)
+            path = os.path.realpath(os.path.join(root, url.lstrip('/')))
+            if not path.startswith(root + os.sep):
+                raise ValueError(f'{url} is outside the image source root')
+            if os.path.getsize(path) > self.max_source_bytes:
+                raise ValueError(f'{url} is larger than {self.max_source_bytes} bytes')
+            with open(path, 'rb') as f:
+                data = f.read()
+        else:
+            raise ValueError(f'Unsupported image URL: {url}')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.source_path(digest)
+        if not os.path.exists(path):
+            self._write(path, data)
+        return digest
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as out:
+            out.write(data)
+        os.replace(tmp, path)
+
+    def has_variants(self, digest):
+        return all(os.path.exists(self.variant_path(digest, variant, ext)) for variant in VARIANTS for ext in FORMATS)
+
+    def render(self, digest):
+        """Write the missing variants of a cached source, in the process pool (raises OSError, ValueError)"""
+        source = self.source_path(digest)
+        if not os.path.exists(source):
+            raise FileNotFoundError(f'No cached source for {digest}')
+        targets = [(self.variant_path(digest, variant, ext), size, ext)
+                   for variant, size in VARIANTS.items() for ext in FORMATS
+                   if not os.path.exists(self.variant_path(digest, variant, ext))]
+        if not targets:
+            return
+        os.makedirs(os.path.dirname(targets[0][0]), exist_ok=True)
+        pool, _ = self._executors()
+        if pool is None:
+            return _render(source, targets, self.quality)
+        try:
+            return pool.submit(_render, source, targets, self.quality).result(timeout=self.render_timeout)
+        except BrokenProcessPool:
+            with self._lock:
+                self._pool = None
+            raise OSError('Image pool restarted')
+
+    def entry(self, url, digest):
+        """What a product stores per image: source URL, content hash and the variant URLs"""
+        return {'source': url, 'hash': digest, **self.variant_urls(digest)}
+
+    def generate(self, collection, product_id, images):
+        """Variants for each of a product's images, stored as its `image_variants` (aligned with `images`).
+
+        Images whose source and variants are already cached are not fetched
+        again; one that cannot be fetched or decoded gets None. The result is
+        only saved if the product's images are still `images`, so a slow job
+        never overwrites a newer update.
+        """
+        collection = collection.with_options(read_preference=ReadPreference.PRIMARY)
+        product = collection.find_one({'_id': ObjectId(product_id)}, {'image_variants': 1}) or {}
+        known = {entry['source']: entry for entry in product.get('image_variants') or [] if entry}
+        entries = []
+        for url in images:
+            entry = known.get(url)
+            if entry is None or not self.has_variants(entry['hash']):
+                try:
+                    entry = self.entry(url, self.fetch(url))
+                    self.render(entry['hash'])
+                except (ValueError, OSError, requests.RequestException, UnidentifiedImageError, Image.DecompressionBombError) as e:
+                    self.logger.warning(f'Image variants failed for product {product_id} ({url}): {e}')
+                    entry = None
+            entries.append(entry)
+        collection.update_one({'_id': ObjectId(product_id), 'images': images}, {'$set': {'image_variants': entries}})
+        return entries
+
+    def submit(self, collection, product_id, images):
+        """Generate a product's variants in the background, returns False when the queue is full"""
+        _, jobs = self._executors()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.logger.warning(f'Image pipeline busy, variants for product {product_id} skipped')
+                return False
+            self._pending += 1
+        jobs.submit(self.generate, collection, product_id, list(images)).add_done_callback(self._done)
+        return True
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
+        if future.exception() is not None:
+            self.logger.error(f'Image pipeline job failed: {future.exception()}')
+
+    def pending(self):
+        return self._pending
+
+    def shutdown(self):
+        for executor in (self._jobs, self._pool):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self._pool = self._jobs = None
+
+image_pipeline = ImagePipeline()
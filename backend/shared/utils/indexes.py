@@ -0,0 +1,116 @@
+import threading
+from pymongo.errors import OperationFailure, PyMongoError
+
+def index_key(index):
+    """Key pattern of an IndexModel or an index_information() entry as a tuple of (field, direction)"""
+    key = index.document['key'] if hasattr(index, 'document') else index['key']
+    return tuple((field, direction) for field, direction in dict(key).items())
+
+def index_options(index):
+    """Options that change what an index enforces or covers: {unique, partialFilterExpression} when set"""
+    info = index.document if hasattr(index, 'document') else index
+    options = {}
+    if info.get('unique'):
+        options['unique'] = True
+    if info.get('partialFilterExpression'):
+        options['partialFilterExpression'] = _plain(info['partialFilterExpression'])
+    return options
+
+def _plain(value):
+    # index_information() returns SON, which compares by order against another SON
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+def ensure_indexes(db, registry):
+    """Create every declared index, returns {collection: [index names]}.
+
+    An index that conflicts with an existing one (same key, other options)
+    fails on its own: the rest of its collection is built index by index and
+    the conflict shows up in missing_indexes.
+    """
+    created = {}
+    for name, indexes in registry.items():
+        if not indexes:
+            continue
+        try:
+            created[name] = db[name].create_indexes(list(indexes))
+        except OperationFailure:
+            created[name] = []
+            for index in indexes:
+                try:
+                    created[name] += db[name].create_indexes([index])
+                except OperationFailure:
+                    pass
+    return created
+
+def missing_indexes(db, registry):
+    """Declared indexes not on the server with the same key, unique flag and partial filter.
+
+    Returns {collection: [key, or (key, options) for indexes declared with options]}.
+    """
+    missing = {}
+    for name, indexes in registry.items():
+        existing = [(index_key(info), index_options(info)) for info in db[name].index_information().values()]
+        entries = []
+        for index in indexes:
+            key, options = index_key(index), index_options(index)
+            if (key, options) not in existing:
+                entries.append((key, options) if options else key)
+        if entries:
+            missing[name] = entries
+    return missing
+
+def ensure_indexes_in_background(db, registry, logger):
+    """Build indexes on a daemon thread so startup does not wait, then log anything still missing"""
+    def run():
+        try:
+            ensure_indexes(db, registry)
+            missing = missing_indexes(db, registry)
+        except PyMongoError as e:
+            logger.error(f'Index build failed: {e}')
+            return
+        for name, keys in missing.items():
+            logger.warning(f'Missing indexes on {name}: {keys}')
+        if not missing:
+            logger.info(f'Indexes verified on {len(registry)} collections')
+
+    thread = threading.Thread(target=run, name='ensure-indexes', daemon=True)
+    thread.start()
+    return thread
+
+def explain_query(collection, query, sort=None, limit=None):
+    """Summarise the winning plan of a find(): stages, indexes used and how much was scanned"""
+    cursor = collection.find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    explain = cursor.explain()
+    stages = list(_plan_stages(explain.get('queryPlanner', {}).get('winningPlan', {})))
+    stats = explain.get('executionStats', {})
+    return {
+        'stages': [stage.get('stage') for stage in stages],
+        'indexes': sorted({stage['indexName'] for stage in stages if stage.get('indexName')}),
+        'collscan': any(stage.get('stage') == 'COLLSCAN' for stage in stages),
+        'in_memory_sort': any(stage.get('stage') == 'SORT' for stage in stages),
+        'docs_examined': stats.get('totalDocsExamined'),
+        'keys_examined': stats.get('totalKeysExamined'),
+        'returned': stats.get('nReturned'),
+        'millis': stats.get('executionTimeMillis')
+    }
+
+def _plan_stages(plan):
+    # Classic plans nest through inputStage(s), slot-based ones wrap the tree in queryPlan
+    if not plan:
+        return
+    if 'queryPlan' in plan:
+        yield from _plan_stages(plan['queryPlan'])
+        return
+    yield plan
+    if 'inputStage' in plan:
+        yield from _plan_stages(plan['inputStage'])
+    for child in plan.get('inputStages', ()):
+        yield from _plan_stages(child)
@@ -0,0 +1,44 @@
+from decimal import Decimal
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from flask.json.provider import JSONProvider
+import orjson
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+def _default(obj):
+    """Types orjson does not serialize natively: ObjectId -> str, Decimal128/Decimal -> float"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return float(obj.to_decimal())
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode('utf-8', 'replace')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps_bytes(obj):
+    """Serialize Mongo documents straight to JSON bytes (datetimes as ISO 8601)"""
+    return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+def to_jsonable(obj):
+    """Plain JSON types only (str ids, ISO dates), for callers that need a dict rather than bytes"""
+    return orjson.loads(dumps_bytes(obj))
+
+class MongoJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson that understands ObjectId, datetime and Decimal128"""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
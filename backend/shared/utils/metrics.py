@@ -0,0 +1,94 @@
+import threading
+from bisect import bisect_left
+from pymongo import monitoring
+
+# Seconds, Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Labelled latency histogram rendered in Prometheus text format.
+
+    With `buckets=None` only count and sum are kept (rendered as a summary), which
+    is what the low-overhead metrics mode uses.
+    """
+
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets) if buckets else None
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, seconds):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1) if self.buckets else None, 0.0, 0]
+            if self.buckets:
+                series[0][bisect_left(self.buckets, seconds)] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self):
+        kind = 'histogram' if self.buckets else 'summary'
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {kind}']
+        with self._lock:
+            series = [(labels, list(counts or ()), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in sorted(series):
+            label_text = _labels(self.label_names, labels)
+            if self.buckets:
+                cumulative = 0
+                for bound, bucket in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{self.name}_bucket{{{label_text}{"," if label_text else ""}le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+def gauge(name, help_text, label_names, values, kind='gauge'):
+    """Prometheus gauge lines for {labels tuple: value}"""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    for labels, value in sorted(values.items()):
+        label_text = _labels(label_names, labels)
+        lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+    return lines
+
+def counter(name, help_text, label_names, values):
+    """Prometheus counter lines for {labels tuple: value}, `name` ending in _total"""
+    return gauge(name, help_text, label_names, values, kind='counter')
+
+def _labels(names, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class CommandMetrics(monitoring.CommandListener):
+    """Duration and count of every MongoDB command by collection, command and outcome"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.histogram = Histogram('mongodb_command_duration_seconds', 'MongoDB command latency (per process)',
+                                   ('collection', 'command', 'outcome'), buckets)
+        self._pending = {}
+
+    def started(self, event):
+        # Succeeded/failed events do not carry the command, remember its collection until then
+        target = event.command.get(event.command_name)
+        if event.command_name == 'getMore':
+            target = event.command.get('collection')
+        self._pending[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ''
+
+    def _finished(self, event, outcome):
+        collection = self._pending.pop((event.connection_id, event.request_id), '')
+        self.histogram.observe((collection, event.command_name, outcome), event.duration_micros / 1e6)
+
+    def succeeded(self, event):
+        self._finished(event, 'success')
+
+    def failed(self, event):
+        self._finished(event, 'failure')
+
+    def render(self):
+        return self.histogram.render()
@@ -0,0 +1,101 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
+from shared.utils.cache import TTLCache
+from shared.utils.projections import is_inclusion
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Totals are shown as "about N results", a short-lived cache is accurate enough
+_count_cache = TTLCache(maxsize=1024, ttl=30)
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """Clamp a user supplied page size to [1, maximum]"""
+    try:
+        limit = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+def encode_cursor(doc, field='created_at'):
+    """Build an opaque cursor from the sort key of the last document in a page"""
+    value = doc.get(field)
+    payload = [value.isoformat() if isinstance(value, datetime) else None, str(doc['_id'])]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, field='created_at'):
+    """Turn a cursor back into a filter selecting documents after it (descending order)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        last_id = ObjectId(last_id)
+        value = datetime.fromisoformat(value) if value is not None else None
+    except (ValueError, TypeError, InvalidId):
+        raise ValueError('Invalid cursor')
+    if value is None:
+        # Documents without a sort value sort last, only the _id tie-break remains
+        return {field: None, '_id': {'$lt': last_id}}
+    return {'$or': [
+        {field: {'$lt': value}},
+        {field: value, '_id': {'$lt': last_id}},
+        {field: None}
+    ]}
+
+def keyset_page(collection, query, limit, cursor=None, field='created_at', projection=None):
+    """Fetch one page sorted on (field, _id) descending, returns (docs, next_cursor)"""
+    query, projection = keyset_query(query, cursor, field, projection)
+    docs = list(collection.find(query, projection).sort([(field, -1), ('_id', -1)]).limit(limit + 1))
+    return split_page(docs, limit, field)
+
+def keyset_query(query, cursor=None, field='created_at', projection=None):
+    """Filter and projection for the page after `cursor` (shared by the sync and async paths)"""
+    if cursor:
+        after = decode_cursor(cursor, field)
+        query = {'$and': [query, after]} if query else after
+    if is_inclusion(projection) and field not in projection:
+        # The cursor is built from the sort key, inclusion projections must carry it
+        projection = {**projection, field: 1}
+    return query, projection
+
+def split_page(docs, limit, field='created_at'):
+    """Trim the one-extra lookahead document fetched with limit + 1 into (docs, next_cursor)"""
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1], field) if has_more else None
+
+def parse_date(value, end_of_day=False):
+    """Parse an ISO date/datetime query argument, date-only upper bounds include the whole day"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end_of_day and len(value) <= 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return parsed
+
+def cached_count(collection, query):
+    """Total for a listing: metadata estimate when unfiltered, otherwise a briefly cached count"""
+    if not query:
+        return collection.estimated_document_count()
+    key = count_cache_key(collection, query)
+    total = _count_cache.get(key)
+    if total is None:
+        total = collection.count_documents(query)
+        _count_cache.set(key, total)
+    return total
+
+def count_cache_key(collection, query):
+    return (collection.full_name, json_util.dumps(query, sort_keys=True))
+
+def cursor_pagination(limit, next_cursor, total=None):
+    """Pagination block for cursor mode responses"""
+    pagination = {"per_page": limit, "next_cursor": next_cursor, "has_more": next_cursor is not None}
+    if total is not None:
+        pagination["total"] = total
+    return pagination
+
+def wants_total(args, default):
+    value = args.get('include_total')
+    return default if value is None else value.lower() in ('1', 'true', 'yes')
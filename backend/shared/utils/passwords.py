@@ -0,0 +1,94 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash/verify calls are already queued, callers answer 503"""
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+def _checkpw(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+class PasswordHasher:
+    """bcrypt hashing/verification off the request thread.
+
+    Calls run in a process pool of `workers` processes (created lazily in each
+    process, so forked servers get their own pool). At most `max_pending` calls may
+    be queued or running; beyond that `PasswordHasherBusy` is raised immediately
+    instead of letting requests pile up behind the CPU-bound work. `workers=0`
+    runs inline, which is what tests and one-off scripts want.
+    """
+
+    def __init__(self, rounds=12, workers=2, max_pending=32, timeout=10):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pending = 0
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked child: the parent's pool and counters are not ours
+                self._pool, self._pending, self._pid = None, 0, os.getpid()
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        pool = self._executor()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusy('Password hashing queue is full')
+            self._pending += 1
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._release()
+            self._pool = None
+            raise PasswordHasherBusy('Password hashing pool restarted')
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise PasswordHasherBusy('Password hashing timed out')
+        except BrokenProcessPool:
+            self._pool = None
+            raise PasswordHasherBusy('Password hashing pool restarted')
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def hash(self, password):
+        return self._run(_hashpw, password.encode('utf-8'), self.rounds)
+
+    def verify(self, password, hashed):
+        return self._run(_checkpw, password.encode('utf-8'), hashed)
+
+    def needs_rehash(self, hashed):
+        """True when the stored hash was made with a different cost factor"""
+        try:
+            return int(hashed.split(b'$')[2]) != self.rounds
+        except (IndexError, ValueError, AttributeError):
+            return False
+
+    def pending(self):
+        return self._pending
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import deque
+from pymongo import monitoring
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool (CMAP) figures for one MongoClient, per server address.
+
+    Checkout latency is measured from check-out-started to checked-out on the
+    requesting thread; `waiting` is the number of checkouts in progress (the wait
+    queue), `in_use` the connections checked out and `open` those created and
+    not yet closed. Counters are per process, like the pool itself.
+    """
+
+    def __init__(self, samples=2048):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._samples = samples
+        self._servers = {}
+
+    def _server(self, address):
+        server = self._servers.get(address)
+        if server is None:
+            server = self._servers[address] = {
+                'open': 0, 'in_use': 0, 'waiting': 0, 'max_waiting': 0,
+                'checkouts': 0, 'failed_checkouts': 0, 'timeouts': 0, 'cleared': 0,
+                'latencies': deque(maxlen=self._samples), 'max_checkout_ms': 0.0
+            }
+        return server
+
+    def _checkout_done(self, event, checked_out):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        elapsed = (time.perf_counter() - started) * 1000 if started is not None else None
+        with self._lock:
+            server = self._server(event.address)
+            server['waiting'] = max(0, server['waiting'] - 1)
+            if checked_out:
+                server['checkouts'] += 1
+                server['in_use'] += 1
+                if elapsed is not None:
+                    server['latencies'].append(elapsed)
+                    server['max_checkout_ms'] = max(server['max_checkout_ms'], elapsed)
+            else:
+                server['failed_checkouts'] += 1
+                if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                    server['timeouts'] += 1
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        with self._lock:
+            server = self._server(event.address)
+            server['waiting'] += 1
+            server['max_waiting'] = max(server['max_waiting'], server['waiting'])
+
+    def connection_checked_out(self, event):
+        self._checkout_done(event, True)
+
+    def connection_check_out_failed(self, event):
+        self._checkout_done(event, False)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server['in_use'] = max(0, server['in_use'] - 1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self._server(event.address)['open'] += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server['open'] = max(0, server['open'] - 1)
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._server(event.address)['cleared'] += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop(event.address, None)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def stats(self):
+        """{'host:port': {...counters, checkout_ms: {p50, p95, p99, max}}}"""
+        with self._lock:
+            servers = {address: dict(server, latencies=sorted(server['latencies'])) for address, server in self._servers.items()}
+        result = {}
+        for address, server in servers.items():
+            latencies = server.pop('latencies')
+            pct = lambda p: round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 3) if latencies else 0.0
+            server['checkout_ms'] = {'p50': pct(0.50), 'p95': pct(0.95), 'p99': pct(0.99), 'max': round(server.pop('max_checkout_ms'), 3)}
+            result[f'{address[0]}:{address[1]}'] = server
+        return result
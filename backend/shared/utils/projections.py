@@ -0,0 +1,25 @@
+def resolve_projection(views, allowed_fields, view=None, fields=None, default='detail'):
+    """Mongo projection for a named view (?view=card) or an explicit field list (?fields=name,price).
+
+    `fields` wins over `view`. Unknown views or fields raise ValueError.
+    """
+    if fields:
+        names = [name.strip() for name in fields.split(',') if name.strip()]
+        unknown = [name for name in names if name not in allowed_fields]
+        if unknown or not names:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return {name: 1 for name in names}
+    view = view or default
+    if view not in views:
+        raise ValueError(f"Unknown view: {view}")
+    return dict(views[view])
+
+def is_inclusion(projection):
+    return bool(projection) and any(v for k, v in projection.items() if k != '_id')
+
+def to_aggregation(projection):
+    """Rewrite find() projection operators for a $project stage ({'$slice': n} needs the field path there)"""
+    return {
+        field: {'$slice': ['$' + field, spec['$slice']]} if isinstance(spec, dict) and '$slice' in spec else spec
+        for field, spec in projection.items()
+    }
@@ -0,0 +1,173 @@
+import hashlib
+from collections import OrderedDict
+import os
+import struct
+import tempfile
+import threading
+import time
+
+def parse_rate(text):
+    """'10/60' -> (capacity 10, refill 10/60 tokens per second); '' or '0' disables the rule"""
+    if not text or text.strip() in ('0', 'off'):
+        return None
+    count, _, seconds = text.partition('/')
+    count, seconds = int(count), float(seconds or 1)
+    if count <= 0 or seconds <= 0:
+        raise ValueError(f'Invalid rate: {text!r} (expected "count/seconds")')
+    return count, count / seconds
+
+def _refill(tokens, updated, now, capacity, rate):
+    return min(capacity, tokens + (now - updated) * rate)
+
+class TokenBuckets:
+    """Token buckets in this process only, one per key.
+
+    Every worker enforces its own share, so with N workers a client gets up to
+    N times the rate; use SharedTokenBuckets to count across workers. Buckets
+    are kept in least recently used order: each new key first drops up to two
+    of the oldest if they have refilled completely (they carry no state), and
+    at `max_keys` the least recently used one is forgotten. Both are O(1).
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now=None):
+        """Spend one token: 0.0 when allowed, else the seconds until a token is available"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = capacity if bucket is None else _refill(bucket[0], bucket[1], now, capacity, rate)
+            if tokens < 1:
+                return (1 - tokens) / rate
+            if bucket is None:
+                self._evict(now)
+            else:
+                self._buckets.move_to_end(key)
+            # [tokens, updated, moment the bucket is full again and can be forgotten]
+            self._buckets[key] = [tokens - 1, now, now + (capacity - tokens + 1) / rate]
+            return 0.0
+
+    def _evict(self, now):
+        for _ in range(2):
+            if not self._buckets or next(iter(self._buckets.values()))[2] > now:
+                break
+            self._buckets.popitem(last=False)
+        if len(self._buckets) >= self.max_keys:
+            # Full of active clients: forget the least recently used rather than grow
+            self._buckets.popitem(last=False)
+
+    def __len__(self):
+        return len(self._buckets)
+
+class SharedTokenBuckets:
+    """Token buckets in a named shared memory segment, shared by every worker on the host.
+
+    The segment is a fixed table of `slots` records (key hash, tokens, last
+    update) in groups of GROUP; a key lives in the group its hash selects and
+    takes the stalest record there when the group is full. Each group is
+    guarded by an fcntl byte-range lock (between processes) and the table by a
+    thread lock (fcntl locks do not exclude threads of one process). Linux and
+    macOS only; the segment outlives the workers and is reused by name.
+    """
+    GROUP = 8
+    RECORD = struct.Struct('Qdd')
+
+    def __init__(self, name='flower_shop_ratelimit', slots=65536):
+        import fcntl
+        from multiprocessing import shared_memory, resource_tracker
+        self._fcntl = fcntl
+        self.groups = max(1, slots // self.GROUP)
+        size = self.groups * self.GROUP * self.RECORD.size
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+        # Creating or attaching registers the segment for removal when the resource tracker exits,
+        # which would drop it under the workers still using it: its lifetime is the host's
+        resource_tracker.unregister(self._shm._name, 'shared_memory')
+        if self._shm.size < size:
+            raise ValueError(f'Shared memory segment {name} is smaller than {slots} slots, unlink it or change the name')
+        self._buf = self._shm.buf
+        self._lock_fd = os.open(os.path.join(tempfile.gettempdir(), f'{name}.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        self._lock = threading.Lock()
+
+    def _locate(self, key):
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+        return digest, digest % self.groups
+
+    def take(self, key, capacity, rate, now=None):
+        now = time.monotonic() if now is None else now
+        digest, group = self._locate(key)
+        base = group * self.GROUP * self.RECORD.size
+        with self._lock:
+            self._fcntl.lockf(self._lock_fd, self._fcntl.LOCK_EX, 1, group)
+            try:
+                slot, stalest, stalest_at = None, None, float('inf')
+                for i in range(self.GROUP):
+                    offset = base + i * self.RECORD.size
+                    stored, tokens, updated = self.RECORD.unpack_from(self._buf, offset)
+                    if stored == digest:
+                        slot = offset
+                        break
+                    if stored == 0:
+                        # Records are never cleared, so the key is not further along
+                        stalest = offset
+                        break
+                    if updated < stalest_at:
+                        stalest, stalest_at = offset, updated
+                if slot is None:
+                    slot, tokens = stalest, float(capacity)
+                else:
+                    tokens = _refill(tokens, updated, now, capacity, rate)
+                if tokens < 1:
+                    self.RECORD.pack_into(self._buf, slot, digest, tokens, now)
+                    return (1 - tokens) / rate
+                self.RECORD.pack_into(self._buf, slot, digest, tokens - 1, now)
+                return 0.0
+            finally:
+                self._fcntl.lockf(self._lock_fd, self._fcntl.LOCK_UN, 1, group)
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+        os.close(self._lock_fd)
+
+    def unlink(self):
+        """Remove the segment and its lock file (every process must close it too)"""
+        from multiprocessing import resource_tracker
+        # unlink() unregisters the segment from the resource tracker: balance the unregister done on attach
+        resource_tracker.register(self._shm._name, 'shared_memory')
+        self._shm.unlink()
+        os.unlink(os.path.join(tempfile.gettempdir(), f'{self._shm.name}.lock'))
+
+class RateLimiter:
+    """Named rules ({name: 'count/seconds'}) over one bucket backend, with per-rule counters"""
+
+    def __init__(self, backend, rules, enabled=True):
+        self.backend = backend
+        self.enabled = enabled
+        self.rules = {name: parse_rate(rate) for name, rate in rules.items()}
+        self._counts = {name: [0, 0] for name in self.rules}
+
+    def check(self, rule, key):
+        """0.0 when the request may proceed, else the Retry-After delay in seconds"""
+        limit = self.rules.get(rule)
+        if not self.enabled or limit is None or not key:
+            return 0.0
+        retry_after = self.backend.take(f'{rule}:{key}', *limit)
+        # Unlocked increments: approximate counters are fine for stats
+        self._counts[rule][1 if retry_after else 0] += 1
+        return retry_after
+
+    def stats(self):
+        return {name: {'allowed': allowed, 'limited': limited, 'rate': rate_text(self.rules[name])}
+                for name, (allowed, limited) in self._counts.items()}
+
+def rate_text(limit):
+    if limit is None:
+        return 'off'
+    capacity, rate = limit
+    return f'{capacity}/{capacity / rate:g}s'
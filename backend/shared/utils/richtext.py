@@ -0,0 +1,205 @@
+import math
+import re
+from html import escape
+from html.parser import HTMLParser
+from shared.utils.search import tokenize
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 160
+# Headings listed in the table of contents (and given an id to link to)
+TOC_LEVELS = {'h2': 2, 'h3': 3}
+VOID_TAGS = {'area', 'br', 'col', 'embed', 'hr', 'img', 'input', 'source', 'track', 'wbr'}
+# Allowlist: any other tag is removed (its text kept), any other attribute dropped
+ALLOWED_TAGS = {'a', 'abbr', 'article', 'b', 'blockquote', 'br', 'caption', 'cite', 'code', 'dd', 'del', 'div', 'dl', 'dt',
+                'em', 'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'ins', 'li', 'mark',
+                'ol', 'p', 'pre', 'q', 's', 'section', 'small', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td',
+                'tfoot', 'th', 'thead', 'tr', 'u', 'ul'}
+GLOBAL_ATTRIBUTES = {'class', 'id', 'title', 'lang', 'dir'}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'target', 'rel'},
+    'img': {'src', 'alt', 'width', 'height', 'loading'},
+    'blockquote': {'cite'}, 'q': {'cite'},
+    'ol': {'start', 'type'},
+    'td': {'colspan', 'rowspan'}, 'th': {'colspan', 'rowspan', 'scope'}
+}
+URL_ATTRIBUTES = {'href', 'src', 'cite'}
+# Relative URLs (no scheme) are allowed as well
+URL_SCHEMES = {'http', 'https', 'mailto', 'tel'}
+# Removed together with their content
+DROPPED_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'template', 'noscript', 'textarea', 'select', 'svg', 'math',
+                'title', 'head'}
+_SCHEME = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*):')
+# Tags that separate words in the collected text
+BLOCK_TAGS = {'address', 'article', 'blockquote', 'br', 'dd', 'div', 'dt', 'figcaption', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+              'hr', 'li', 'ol', 'p', 'pre', 'section', 'td', 'th', 'tr', 'ul'}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+_TAG = re.compile(r'<[a-zA-Z/!][^>]*>')
+
+def safe_url(value):
+    """`value` if it is relative or uses an allowed scheme, else None.
+
+    Browsers ignore ASCII whitespace and control characters inside a URL
+    (java&#x09;script: runs), so they are removed before the scheme is read.
+    """
+    url = ''.join(ch for ch in value or '' if ch > ' ' and ch != '\x7f')
+    match = _SCHEME.match(url)
+    if match and match.group(1).lower() not in URL_SCHEMES:
+        return None
+    return value.strip()
+
+def clean_attributes(tag, attrs):
+    allowed = GLOBAL_ATTRIBUTES | ALLOWED_ATTRIBUTES.get(tag, set())
+    cleaned = []
+    for name, value in attrs:
+        if name not in allowed:
+            continue
+        if name in URL_ATTRIBUTES:
+            value = safe_url(value)
+            if value is None:
+                continue
+        cleaned.append((name, value))
+    if tag == 'a' and any(name == 'target' for name, _ in cleaned):
+        # The opened page must not get a handle on this one
+        cleaned = [(name, value) for name, value in cleaned if name != 'rel'] + [('rel', 'noopener noreferrer')]
+    return cleaned
+
+def slugify(text, max_length=80):
+    """URL slug from Vietnamese text: 'Hoa Cưới Đẹp!' -> 'hoa-cuoi-dep'"""
+    slug = ''
+    for word in tokenize(text):
+        if len(slug) + len(word) + 1 > max_length:
+            break
+        slug = f'{slug}-{word}' if slug else word
+    return slug
+
+class _Renderer(HTMLParser):
+    """Re-serializes content HTML through an allowlist, adds ids to h2/h3 and collects the text.
+
+    Tags outside ALLOWED_TAGS are removed (their text kept, or dropped with
+    them for DROPPED_TAGS), attributes outside the allowlist are dropped and
+    URLs must be relative or http(s)/mailto/tel.
+
+    `text` is all the readable text, `prose` the same without headings (for the excerpt).
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.text = []
+        self.prose = []
+        self.toc = []
+        self.ids = set()
+        self._skip = 0
+        self._headings = 0
+        self._heading = None
+
+    def handle_starttag(self, tag, attrs, closed=False):
+        if tag in DROPPED_TAGS:
+            self._skip += not closed and tag not in VOID_TAGS
+            return
+        if self._skip:
+            return
+        self._break(tag)
+        if tag not in ALLOWED_TAGS:
+            return
+        attrs = clean_attributes(tag, attrs)
+        if tag in TOC_LEVELS and not closed:
+            # The id depends on the heading text: the tag is written at its end tag
+            self._heading = (tag, attrs, len(self.out), len(self.text))
+            self._headings += 1
+            self.out.append(None)
+            return
+        if tag in HEADING_TAGS and not closed:
+            self._headings += 1
+        self.out.append(self._tag(tag, attrs, closed))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, closed=True)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self._skip = max(0, self._skip - 1)
+            return
+        if self._skip or tag in VOID_TAGS:
+            return
+        if tag not in ALLOWED_TAGS:
+            self._break(tag)
+            return
+        if tag in HEADING_TAGS:
+            self._headings = max(0, self._headings - 1)
+        if self._heading and self._heading[0] == tag:
+            name, attrs, position, text_start = self._heading
+            title = ' '.join(''.join(self.text[text_start:]).split())
+            anchor = dict(attrs).get('id') or self._unique_id(slugify(title) or 'muc')
+            self.ids.add(anchor)
+            self.out[position] = self._tag(name, [(k, v) for k, v in attrs if k != 'id'] + [('id', anchor)])
+            self.toc.append({'level': TOC_LEVELS[name], 'id': anchor, 'text': title})
+            self._heading = None
+        self.out.append(f'</{tag}>')
+        self._break(tag)
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.out.append(escape(data, quote=False))
+            self.text.append(data)
+            if not self._headings:
+                self.prose.append(data)
+
+    def _break(self, tag):
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+            self.prose.append(' ')
+
+    def handle_comment(self, data):
+        pass
+
+    def close(self):
+        super().close()
+        if self._heading:
+            # Heading left open by malformed HTML: keep its tag, without an anchor
+            name, attrs, position, _ = self._heading
+            self.out[position] = self._tag(name, attrs)
+            self._heading = None
+
+    def _unique_id(self, base):
+        anchor, n = base, 2
+        while anchor in self.ids:
+            anchor, n = f'{base}-{n}', n + 1
+        return anchor
+
+    @staticmethod
+    def _tag(tag, attrs, closed=False):
+        rendered = ''.join(f' {name}' if value is None else f' {name}="{escape(value)}"' for name, value in attrs)
+        return f'<{tag}{rendered}{" /" if closed and tag not in VOID_TAGS else ""}>'
+
+def plain_to_html(text):
+    """Text typed without markup: blank lines separate paragraphs, single newlines become <br>"""
+    paragraphs = [p.strip() for p in re.split(r'\n\s*\n', text.replace('\r\n', '\n')) if p.strip()]
+    return ''.join('<p>' + '<br>'.join(escape(line) for line in p.split('\n')) + '</p>' for p in paragraphs)
+
+def excerpt(text, length=EXCERPT_LENGTH):
+    """First `length` characters of plain text, cut at a word boundary"""
+    text = ' '.join(text.split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(' ', 1)[0].rstrip(',.;:') + '…'
+
+def render_content(content):
+    """Fields derived from a post's content, stored at write time so readers get them ready to serve:
+    content_html, toc ([{level, id, text}]), word_count, reading_time (minutes) and text_excerpt.
+    """
+    content = content or ''
+    if not _TAG.search(content):
+        content = plain_to_html(content)
+    renderer = _Renderer()
+    renderer.feed(content)
+    renderer.close()
+    text = ''.join(renderer.text)
+    words = len(text.split())
+    return {
+        'content_html': ''.join(part for part in renderer.out if part is not None),
+        'toc': renderer.toc,
+        'word_count': words,
+        'reading_time': max(1, math.ceil(words / WORDS_PER_MINUTE)) if words else 0,
+        'text_excerpt': excerpt(''.join(renderer.prose))
+    }
@@ -0,0 +1,87 @@
+import re
+import unicodedata
+from pymongo import UpdateOne
+from shared.utils.projections import is_inclusion, to_aggregation
+
+# Maintained on every searchable document: folded words of all searchable fields,
+# plus the words of the title-like field used for ranking
+TOKENS_FIELD = 'search_tokens'
+TITLE_FIELD = 'search_title'
+SEARCH_PROJECTION = {TOKENS_FIELD: 0, TITLE_FIELD: 0}
+
+# Ranked search scores only the newest matches, read in this index order (created_at, _id exist on every
+# searchable collection): a common word matching most documents costs a bounded top-k sort, not a full one
+SEARCH_SORT = [('created_at', -1), ('_id', -1)]
+SEARCH_CANDIDATES = 1000
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+def fold(text):
+    """Lowercase and strip Vietnamese diacritics: 'Hoa Hồng Đỏ' -> 'hoa hong do'"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFD', str(text).replace('đ', 'd').replace('Đ', 'D'))
+    return ''.join(c for c in text if unicodedata.category(c) != 'Mn').lower()
+
+def tokenize(text):
+    return _WORD.findall(fold(text))
+
+def search_fields(title, *others):
+    """Token fields to store alongside a document, recomputed whenever its text changes"""
+    title_tokens = set(tokenize(title))
+    tokens = set(title_tokens)
+    for value in others:
+        if isinstance(value, (list, tuple)):
+            value = ' '.join(str(v) for v in value)
+        tokens.update(tokenize(value))
+    return {TITLE_FIELD: sorted(title_tokens), TOKENS_FIELD: sorted(tokens)}
+
+def build_search_query(term):
+    """Index-backed match: every word must be present, the last one may be a prefix (search-as-you-type)"""
+    tokens = tokenize(term)
+    if not tokens:
+        return {}
+    conditions = [{TOKENS_FIELD: token} for token in tokens[:-1]]
+    conditions.append({TOKENS_FIELD: {'$regex': '^' + re.escape(tokens[-1])}})
+    return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
+def ranked_search(collection, query, term, skip=0, limit=20, projection=None, candidates=SEARCH_CANDIDATES):
+    """Matches sorted by relevance (query words found in the title), newest first on ties.
+
+    Only the newest `candidates` matches (or skip + limit, if more) are ranked.
+    """
+    return list(collection.aggregate(ranked_search_pipeline(query, term, skip, limit, projection, candidates)))
+
+def ranked_search_pipeline(query, term, skip=0, limit=20, projection=None, candidates=SEARCH_CANDIDATES):
+    return [
+        {'$match': query},
+        {'$sort': dict(SEARCH_SORT)},
+        {'$limit': max(candidates, skip + limit)},
+        {'$addFields': {'_score': {'$size': {'$filter': {
+            'input': {'$ifNull': ['$' + TITLE_FIELD, []]}, 'as': 'token', 'cond': {'$in': ['$$token', tokenize(term)]}
+        }}}}},
+        {'$sort': {'_score': -1, **dict(SEARCH_SORT)}},
+        {'$skip': skip},
+        {'$limit': limit},
+        {'$project': _without_score(projection or SEARCH_PROJECTION)}
+    ]
+
+def _without_score(projection):
+    # Inclusion projections already drop _score, exclusion ones must name it
+    if is_inclusion(projection):
+        return to_aggregation(projection)
+    return dict(projection, _score=0)
+
+def reindex(collection, title_field, other_fields, batch_size=500):
+    """Backfill token fields for documents written before search indexing existed"""
+    fields = {title_field: 1, **{f: 1 for f in other_fields}}
+    ops, updated = [], 0
+    for doc in collection.find({}, fields).batch_size(batch_size):
+        values = [doc.get(f) for f in other_fields]
+        ops.append(UpdateOne({'_id': doc['_id']}, {'$set': search_fields(doc.get(title_field), *values)}))
+        if len(ops) >= batch_size:
+            updated += collection.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += collection.bulk_write(ops, ordered=False).modified_count
+    return updated
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Concurrency test for order number generation.
+
+Creates thousands of orders from several processes (each with several threads)
+against a scratch database and checks every order_number is unique.
+
+Usage: python test_order_numbers.py [processes] [threads] [orders_per_thread]
+Requires a running MongoDB at MONGODB_URI.
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+from pymongo import MongoClient
+from core.config.config import Config
+from modules.orders.models.order import Order
+
+TEST_DATABASE = f"{Config.DATABASE_NAME}_order_number_test"
+
+def create_orders(args):
+    """Worker process: create orders from a thread pool, return the order numbers"""
+    threads, per_thread, block_size = args
+    client = MongoClient(Config.MONGODB_URI)
+    order_model = Order(client[TEST_DATABASE], order_number_block=block_size)
+
+    def run(_):
+        ids = [order_model.create_order({'customer_name': 'Load Test', 'total_amount': 1}) for _ in range(per_thread)]
+        return len(ids)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        created = sum(pool.map(run, range(threads)))
+    client.close()
+    return created
+
+def test_concurrent_order_numbers(processes=4, threads=8, per_thread=100, block_size=20):
+    """Test order numbers stay unique under parallel checkouts"""
+    client = MongoClient(Config.MONGODB_URI, serverSelectionTimeoutMS=2000)
+    client.drop_database(TEST_DATABASE)
+    try:
+        with Pool(processes) as pool:
+            created = sum(pool.map(create_orders, [(threads, per_thread, block_size)] * processes))
+
+        orders = client[TEST_DATABASE].orders
+        duplicates = list(orders.aggregate([
+            {'$group': {'_id': '$order_number', 'count': {'$sum': 1}}},
+            {'$match': {'count': {'$gt': 1}}}
+        ]))
+        counter = client[TEST_DATABASE].counters.find_one({'_id': 'order_number'})
+
+        print(f"📦 Orders created: {created}")
+        print(f"🔢 Counter round trips: {counter['seq'] // block_size}")
+        assert created == processes * threads * per_thread
+        assert orders.count_documents({}) == created
+        assert not duplicates, f"Duplicate order numbers: {duplicates[:5]}"
+        print("✅ All order numbers are unique")
+    finally:
+        client.drop_database(TEST_DATABASE)
+        client.close()
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:4]]
+    test_concurrent_order_numbers(*args)
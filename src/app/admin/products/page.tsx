@@ -89,7 +89,8 @@ export default function AdminProductsPage() {
       const axios = (await import("axios")).default;
       console.log('Fetching products from:', `${API_URL}/api/products`);
       const res = await axios.get<ProductResponse>(`${API_URL}/api/products`, {
-        params: { search },
+        // The edit form needs every image and the full description, not the listing view
+        params: { search, view: 'detail' },
       });
       console.log('Products API response:', res.data);
       
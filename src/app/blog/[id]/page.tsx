@@ -8,10 +8,19 @@ import { Calendar, ArrowLeft, Share2, FileText, User, Clock, ArrowRight, Eye } f
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:5003";
 
+interface TocEntry {
+  level: number;
+  id: string;
+  text: string;
+}
+
 interface Blog {
   id: string;
   title: string;
-  content: string;
+  content?: string;
+  content_html?: string;
+  toc?: TocEntry[];
+  reading_time?: number;
   excerpt: string;
   featured_image: string;
   published: boolean;
@@ -40,24 +49,16 @@ export default function BlogDetailPage() {
   const [relatedBlogs, setRelatedBlogs] = useState<Blog[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string>("");
-  const [readingTime, setReadingTime] = useState(0);
 
   const blogId = params.id as string;
 
-  // Calculate reading time (average 200 words per minute)
-  const calculateReadingTime = (content: string) => {
-    const textContent = content.replace(/<[^>]*>/g, '');
-    const wordCount = textContent.split(/\s+/).length;
-    return Math.ceil(wordCount / 200);
-  };
-
   // Fetch blog details
   const fetchBlog = async () => {
     try {
       setLoading(true);
       setError("");
       
-      const response = await fetch(`${API_URL}/api/blogs/${blogId}`);
+      const response = await fetch(`${API_URL}/api/blogs/${blogId}?view=article`);
       
       if (!response.ok) {
         if (response.status === 404) {
@@ -73,7 +74,6 @@ export default function BlogDetailPage() {
       if (data.success && data.data.blog) {
         const blogData = data.data.blog;
         setBlog(blogData);
-        setReadingTime(calculateReadingTime(blogData.content));
         
         // Fetch related blogs
         fetchRelatedBlogs();
@@ -230,7 +230,7 @@ export default function BlogDetailPage() {
             </div>
             <div className="flex items-center">
               <Clock className="w-5 h-5 mr-2" />
-              <span>{readingTime} phút đọc</span>
+              <span>{blog.reading_time || 1} phút đọc</span>
             </div>
             <div className="flex items-center">
               <User className="w-5 h-5 mr-2" />
@@ -277,10 +277,26 @@ export default function BlogDetailPage() {
             </div>
           )}
 
-          {/* Content */}
+          {/* Table of Contents */}
+          {blog.toc && blog.toc.length > 1 && (
+            <nav className="mb-8 p-6 bg-rose-50 rounded-lg">
+              <p className="font-semibold text-gray-900 mb-3">Mục lục</p>
+              <ul className="space-y-2">
+                {blog.toc.map((entry) => (
+                  <li key={entry.id} className={entry.level === 3 ? 'ml-4' : ''}>
+                    <a href={`#${entry.id}`} className="text-gray-700 hover:text-rose-600 transition-colors">
+                      {entry.text}
+                    </a>
+                  </li>
+                ))}
+              </ul>
+            </nav>
+          )}
+
+          {/* Content (sanitized and rendered by the API at write time) */}
           <div 
             className="prose prose-lg max-w-none text-gray-700 leading-relaxed"
-            dangerouslySetInnerHTML={{ __html: blog.content }}
+            dangerouslySetInnerHTML={{ __html: blog.content_html || '' }}
           />
 
           {/* Updated Date */}
@@ -323,7 +339,7 @@ export default function BlogDetailPage() {
                         {relatedBlog.title}
                       </h4>
                       <p className="text-sm text-gray-600 mb-3 line-clamp-2">
-                        {relatedBlog.excerpt || truncateContent(relatedBlog.content, 100)}
+                        {relatedBlog.excerpt || truncateContent(relatedBlog.content || '', 100)}
                       </p>
                       <div className="flex items-center justify-between text-xs text-gray-500">
                         <span>{formatDate(relatedBlog.created_at)}</span>
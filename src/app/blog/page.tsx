@@ -10,7 +10,7 @@ const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:5003";
 interface Blog {
   id: string;
   title: string;
-  content: string;
+  content?: string;
   excerpt: string;
   featured_image: string;
   published: boolean;
@@ -272,7 +272,7 @@ export default function BlogPage() {
                     </h2>
                     
                     <p className="text-gray-600 text-sm mb-4 line-clamp-3">
-                      {blog.excerpt || truncateContent(blog.content, 150)}
+                      {blog.excerpt || truncateContent(blog.content || '', 150)}
                     </p>
                     
                     <div className="flex items-center justify-between">
@@ -17,6 +17,13 @@ interface Order {
   payment_method?: string
 }
 
+interface OrdersPage {
+  orders: Order[]
+  nextCursor: string | null
+}
+
+const PAGE_SIZE = 50
+
 interface OrdersListProps {
   status: string
   searchQuery: string
@@ -128,38 +135,52 @@ function OrderDetailsDialog({ order, onClose }: { order: Order | null, onClose:
 export function OrdersList({ status, searchQuery }: OrdersListProps) {
   const [orders, setOrders] = useState<Order[]>([])
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [selectedOrder, setSelectedOrder] = useState<Order | null>(null)
 
   useEffect(() => {
     fetchOrders()
   }, [status, searchQuery])
 
-  const fetchOrders = async () => {
-    setLoading(true)
+  // One page of orders, newest first, filtered by status on the server
+  const fetchPage = async (cursor: string | null, limit: number): Promise<OrdersPage> => {
     const token = localStorage.getItem('access_token')
-    try {
-      const response = await fetch('http://localhost:5003/api/admin/orders', {
-        headers: { 'Authorization': `Bearer ${token}` }
-      })
-      if (response.ok) {
-        const result = await response.json()
-        let filteredOrders = result.data.orders
-
-        // Filter by status if not 'all'
-        if (status !== 'all') {
-          filteredOrders = filteredOrders.filter((order: Order) => order.status === status)
-        }
+    const params = new URLSearchParams({ limit: String(limit) })
+    if (status !== 'all') params.set('status', status)
+    if (cursor) params.set('cursor', cursor)
+    const response = await fetch(`http://localhost:5003/api/admin/orders?${params}`, {
+      headers: { 'Authorization': `Bearer ${token}` }
+    })
+    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`)
+    const result = await response.json()
+    return { orders: result.data.orders, nextCursor: result.data.next_cursor }
+  }
 
-        // Filter by search query
-        if (searchQuery) {
-          const query = searchQuery.toLowerCase()
-          filteredOrders = filteredOrders.filter((order: Order) => 
-            order.order_number.toLowerCase().includes(query) ||
-            order.customer_name.toLowerCase().includes(query)
-          )
-        }
+  const matchesSearch = (order: Order) => {
+    const query = searchQuery.toLowerCase()
+    return order.order_number.toLowerCase().includes(query) ||
+      (order.customer_name || '').toLowerCase().includes(query)
+  }
 
-        setOrders(filteredOrders)
+  const fetchOrders = async () => {
+    setLoading(true)
+    try {
+      if (searchQuery) {
+        // The API has no order search: read every page and match here
+        let matched: Order[] = []
+        let cursor: string | null = null
+        do {
+          const page: OrdersPage = await fetchPage(cursor, 200)
+          matched = matched.concat(page.orders.filter(matchesSearch))
+          cursor = page.nextCursor
+        } while (cursor)
+        setOrders(matched)
+        setNextCursor(null)
+      } else {
+        const page = await fetchPage(null, PAGE_SIZE)
+        setOrders(page.orders)
+        setNextCursor(page.nextCursor)
       }
     } catch (error) {
       console.error('Error:', error)
@@ -168,6 +189,20 @@ export function OrdersList({ status, searchQuery }: OrdersListProps) {
     }
   }
 
+  const loadMore = async () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    try {
+      const page = await fetchPage(nextCursor, PAGE_SIZE)
+      setOrders(previous => [...previous, ...page.orders])
+      setNextCursor(page.nextCursor)
+    } catch (error) {
+      console.error('Error:', error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const handleOrderClick = (order: Order) => {
     setSelectedOrder(order)
   }
@@ -263,6 +298,17 @@ export function OrdersList({ status, searchQuery }: OrdersListProps) {
               ))}
             </tbody>
           </table>
+          {nextCursor && (
+            <div className="mt-4 text-center">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-4 py-2 border rounded-lg text-black hover:bg-gray-50 transition-colors disabled:opacity-50"
+              >
+                {loadingMore ? 'Đang tải...' : 'Tải thêm đơn hàng'}
+              </button>
+            </div>
+          )}
         </div>
       )}
 
@@ -22,6 +22,7 @@ interface Order {
 export function AccountInfoPopup({ isOpen, onClose }: AccountInfoPopupProps) {
   const { user } = useAuth()
   const [orders, setOrders] = useState<Order[]>([])
+  const [hasMoreOrders, setHasMoreOrders] = useState(false)
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
@@ -29,10 +30,13 @@ export function AccountInfoPopup({ isOpen, onClose }: AccountInfoPopupProps) {
       const fetchOrders = async () => {
         try {
           const token = localStorage.getItem('access_token')
+          // Only the count is shown: one page of the largest size, "200+" beyond it
           const response = await axios.get('http://localhost:5003/api/admin/my-orders', {
-            headers: { Authorization: `Bearer ${token}` }
+            headers: { Authorization: `Bearer ${token}` },
+            params: { limit: 200 }
           })
           setOrders(response.data.data.orders)
+          setHasMoreOrders(response.data.data.has_more)
         } catch (error) {
           console.error('Error fetching orders:', error)
         } finally {
@@ -107,7 +111,7 @@ export function AccountInfoPopup({ isOpen, onClose }: AccountInfoPopupProps) {
                 <div>
                   <div className="text-sm text-gray-500">Đơn hàng đã mua</div>
                   <div className="font-medium text-gray-900">
-                    {loading ? 'Đang tải...' : `${orders.length} đơn hàng`}
+                    {loading ? 'Đang tải...' : `${orders.length}${hasMoreOrders ? '+' : ''} đơn hàng`}
                   </div>
                 </div>
               </div>
@@ -18,30 +18,43 @@ interface Order {
   items?: { name: string; quantity: number }[]
 }
 
+const PAGE_SIZE = 20
+
 export function MyOrdersPopup({ isOpen, onClose }: MyOrdersPopupProps) {
   const { user } = useAuth()
   const [orders, setOrders] = useState<Order[]>([])
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+
+  // One page of the user's orders, newest first; `cursor` continues after the previous page
+  const fetchOrders = async (cursor: string | null = null) => {
+    const token = localStorage.getItem('access_token')
+    const response = await axios.get('http://localhost:5003/api/admin/my-orders', {
+      headers: { Authorization: `Bearer ${token}` },
+      params: cursor ? { limit: PAGE_SIZE, cursor } : { limit: PAGE_SIZE }
+    })
+    const page: Order[] = response.data.data.orders
+    setOrders(previous => cursor ? [...previous, ...page] : page)
+    setNextCursor(response.data.data.next_cursor)
+  }
 
   useEffect(() => {
     if (isOpen && user) {
-      const fetchOrders = async () => {
-        try {
-          const token = localStorage.getItem('access_token')
-          const response = await axios.get('http://localhost:5003/api/admin/my-orders', {
-            headers: { Authorization: `Bearer ${token}` }
-          })
-          setOrders(response.data.data.orders)
-        } catch (error) {
-          console.error('Error fetching orders:', error)
-        } finally {
-          setLoading(false)
-        }
-      }
       fetchOrders()
+        .catch(error => console.error('Error fetching orders:', error))
+        .finally(() => setLoading(false))
     }
   }, [isOpen, user])
 
+  const loadMore = () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    fetchOrders(nextCursor)
+      .catch(error => console.error('Error fetching orders:', error))
+      .finally(() => setLoadingMore(false))
+  }
+
   if (!isOpen) return null
 
   return (
@@ -143,6 +156,17 @@ export function MyOrdersPopup({ isOpen, onClose }: MyOrdersPopupProps) {
                   ))}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="mt-4 text-center">
+                  <button
+                    onClick={loadMore}
+                    disabled={loadingMore}
+                    className="px-4 py-2 border rounded-lg text-gray-900 hover:bg-gray-50 transition-colors disabled:opacity-50"
+                  >
+                    {loadingMore ? 'Đang tải...' : 'Xem thêm đơn hàng'}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </div>